@@ -0,0 +1,40 @@
+#coding: utf-8
+
+'''
+Acesso uniforme às arestas de saída e de entrada dos grafos do projeto
+(nx.DiGraph ou CSRGraph), usado pelos algoritmos que não têm laço especializado.
+'''
+
+import networkx as nx
+
+
+def successors(graph):
+    '''
+    Retorna uma função u -> lista de pares (sucessor, peso).
+    '''
+    if isinstance(graph, nx.Graph):
+        adj = graph._adj # pylint: disable=protected-access
+        return lambda u: [(v, edge.get("weight", 1)) for v, edge in adj[u].items()]
+    return graph.weighted_successors
+
+
+def predecessors(graph):
+    '''
+    Retorna uma função v -> lista de pares (antecessor, peso), isto é,
+    as arestas de entrada de v percorridas ao contrário.
+    '''
+    if isinstance(graph, nx.Graph):
+        # em grafos não direcionados _pred não existe e as arestas valem nos dois sentidos
+        pred = graph._pred if graph.is_directed() else graph._adj # pylint: disable=protected-access
+        return lambda v: [(u, edge.get("weight", 1)) for u, edge in pred[v].items()]
+    return graph.weighted_predecessors
+
+
+def reverse(graph):
+    '''
+    Retorna o grafo com as arestas invertidas, sem copiar as arestas do nx.DiGraph
+    (view) e reaproveitando o transposto em cache do CSRGraph.
+    '''
+    if isinstance(graph, nx.Graph):
+        return graph.reverse(copy=False) if graph.is_directed() else graph
+    return graph.reverse()
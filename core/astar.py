@@ -0,0 +1,64 @@
+"""
+Implementação do algoritmo A* para encontrar o caminho mais curto em um grafo direcionado,
+guiada por uma heurística (veja core.heuristics).
+"""
+#coding: utf-8
+import heapq
+from collections.abc import Callable
+
+import networkx as nx
+from core import adjacency
+from core.csr_graph import CSRGraph
+from util import validator
+
+_INF = float('inf')
+
+def astar(digraph: nx.DiGraph | CSRGraph, start: str, end: str,
+          heuristic: Callable | None = None) -> tuple[float|None, list[str]]:
+    """
+    Encontra o caminho mais curto entre os nós start e end com A*.
+    heuristic(node, end) deve retornar um limite inferior da distância de node até end
+    (heurística admissível); sem heurística o A* se comporta como o dijkstra.
+    Retorna uma tupla com a distância total e a lista de nós no caminho.
+    Se não houver caminho, retorna (float('inf'), None).
+    """
+    validator.validate_objects(digraph, start, end)
+    if start == end:
+        return 0, [start]
+    if heuristic is None:
+        heuristic = lambda node, target: 0
+
+    successors = adjacency.successors(digraph)
+    estimate = {} # cache de heuristic(node, end)
+    pred = {start: None}
+    dist = {start: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(heuristic(start, end), 0, start)]
+
+    while unvisited:
+        _, curr_dist, curr_node = pop(unvisited)
+
+        if curr_dist > dist[curr_node]:
+            continue
+        if curr_node == end:
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+
+        for neighbor, weight in successors(curr_node):
+            new_dist = curr_dist + weight
+            # um nó já expandido pode ser reaberto se a heurística não for consistente
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                h = estimate.get(neighbor)
+                if h is None:
+                    h = estimate[neighbor] = heuristic(neighbor, end)
+                if h < _INF:
+                    push(unvisited, (new_dist + h, new_dist, neighbor))
+    return _INF, None # no path of start to end
@@ -4,46 +4,83 @@
 Build a graph from a json
 '''
 
-import json
-import sys
 import os
-import networkx as nx
+from core import graph_file
+from core.csr_graph import CSRGraph
+from core.tracked_graph import TrackedDiGraph
 from util import validator
 
-# Encontra o diretório pai da pasta 'core' (que é a raiz do projeto)
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-def build_graph(path):
+def build_graph(path, compact=False):
     '''
     Abre o arquivo através do seu caminho e transforma o conteudo json em variaveis.
     Tudo vira um dicionario no formato -> 'edges': [['A', 'B', 5], ['B', 'C', 7]].
     O valor da chave é uma lista de listas de tamanho 3 sendo [node, terminal, weight].
+    O arquivo é lido uma única vez: cada aresta é validada e inserida no grafo
+    assim que é lida, sem manter a lista completa de arestas em memória.
+    O grafo é um TrackedDiGraph (nx.DiGraph com contador de versão, usado pelo
+    core.cache para invalidar resultados quando o grafo é alterado).
+    Com compact=True retorna um CSRGraph em vez de um nx.DiGraph; nesse caso,
+    se existir um arquivo compilado (core.graph_file) atualizado ao lado do JSON,
+    ele é aberto com mmap em vez de ler o JSON.
+    Um arquivo compilado também pode ser passado diretamente em path.
+
+    O JSON pode ter a chave opcional 'coordinates': [['A', lat, lon], ...], em graus.
+    As coordenadas viram os atributos 'lat' e 'lon' dos nós (no CSRGraph, o
+    dicionário coordinates) e são usadas pela heurística do A*.
     '''
-    validator.validate_path(path)
-    validator.validate_graph_entry(path)
-    with open(path, encoding='utf-8') as file:
-        data = json.load(file)
+    if graph_file.is_graph_file(path):
+        return graph_file.load_graph(path)
+    extras = {}
+    if compact:
+        compiled = graph_file.find_compiled(path)
+        if compiled is not None:
+            return graph_file.load_graph(compiled)
+        graph = CSRGraph.from_edges(validator.iter_valid_edges(path, extras))
+        for node, lat, lon in validator.validate_coordinates(extras.get("coordinates")):
+            if graph.has_node(node):
+                graph.coordinates[node] = (lat, lon)
+        validator.mark_validated(graph)
+        return graph
 
     # Inicia e constrói o grafo
-    digraph = nx.DiGraph()
-    for node, terminal, w in data["edges"]:
+    digraph = TrackedDiGraph()
+    for node, terminal, w in validator.iter_valid_edges(path, extras):
         digraph.add_edge(node, terminal, weight=w)
+    for node, lat, lon in validator.validate_coordinates(extras.get("coordinates")):
+        if digraph.has_node(node):
+            digraph.nodes[node].update(lat=lat, lon=lon)
 
+    # todas as arestas já passaram pelo validator: as consultas não precisam revalidar
+    validator.mark_validated(digraph)
     return digraph
-# testing
-archive_path = os.path.abspath("data/dataset.json")
-graph = build_graph(archive_path)
 
-# print("Nodes: ", graph.nodes())
-# print("Edges: ", graph.edges(data=True))
 
-assert set(graph.nodes()) == {'A', 'B', 'C', 'D', 'E', 'F'}
+# caminho do dataset de exemplo, relativo ao módulo e não ao diretório atual
+DATASET_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                            '..', 'data', 'dataset.json'))
+
+def self_test():
+    '''
+    Verificação rápida com o dataset de exemplo. Executada apenas sob demanda
+    (python -m core.build_graph ou main.py --self-test), nunca no import.
+    '''
+    graph = build_graph(DATASET_PATH)
+
+    # print("Nodes: ", graph.nodes())
+    # print("Edges: ", graph.edges(data=True))
+
+    assert set(graph.nodes()) == {'A', 'B', 'C', 'D', 'E', 'F'}
+
+    assert graph.number_of_nodes() == 6
+    assert graph.number_of_edges() == 5
+
+    assert graph['A']['B']['weight'] == 5.0
+    assert graph['A']['C']['weight'] == 3.0
+    assert graph['B']['C']['weight'] == 10.0
+    assert graph['C']['D']['weight'] == 1.0
+    assert graph['E']['F']['weight'] == 5.0
 
-assert graph.number_of_nodes() == 6
-assert graph.number_of_edges() == 5
 
-assert graph['A']['B']['weight'] == 5.0
-assert graph['A']['C']['weight'] == 3.0
-assert graph['B']['C']['weight'] == 10.0
-assert graph['C']['D']['weight'] == 1.0
-assert graph['E']['F']['weight'] == 5.0
+if __name__ == '__main__':
+    self_test()
+    print("build_graph: self-test OK")
@@ -0,0 +1,159 @@
+#coding: utf-8
+
+'''
+Cache LRU de resultados de consultas de caminho mínimo.
+
+A chave é a impressão digital do grafo (id + versão) mais (start, end). Grafos
+com atributo version (TrackedDiGraph, devolvido pelo build_graph, e os grafos
+imutáveis CSRGraph e ContractionHierarchy) são invalidados automaticamente
+quando mudam. Grafos sem version (um nx.DiGraph comum) não são guardados:
+a consulta é sempre repassada à busca.
+'''
+
+import sys
+import weakref
+from collections import OrderedDict, namedtuple
+
+from core.dijkstra import dijkstra
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'invalidations',
+                                     'entries', 'bytes'])
+
+
+def _result_size(result) -> int:
+    '''Estimativa dos bytes ocupados por um resultado (dist, path).'''
+    dist, path = result
+    size = sys.getsizeof(result) + sys.getsizeof(dist)
+    if path is not None:
+        size += sys.getsizeof(path)
+    return size
+
+
+def _options(kwargs: dict) -> tuple | None:
+    '''
+    kwargs da busca como parte hasheável da chave, ou None quando a consulta
+    não pode ser guardada (stats é preenchido pela busca; valores não hasheáveis).
+    '''
+    if kwargs.get('stats') is not None:
+        return None
+    options = tuple(sorted(kwargs.items()))
+    try:
+        hash(options)
+    except TypeError:
+        return None
+    return options
+
+
+class QueryCache:
+    '''
+    Cache na frente de uma função de busca search(graph, start, end, **kwargs),
+    por padrão core.dijkstra.dijkstra. Limitado a max_entries resultados e a
+    max_bytes bytes (estimados); ao passar de qualquer limite, os resultados
+    usados há mais tempo são descartados.
+
+    Um acerto custa uma consulta a um dicionário: não há validação nem busca.
+    O resultado devolvido é o mesmo objeto guardado e não deve ser alterado.
+    Erros da busca (ValueError, AttributeError) não são guardados.
+
+    Os kwargs fazem parte da chave (bidirectional=True e a busca comum são
+    resultados diferentes). Consultas com stats=, que a busca preenche, ou com
+    valores não hasheáveis vão sempre para a busca.
+    '''
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 16 * 2 ** 20,
+                 search=dijkstra):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Cache limits must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.search = search
+        self._entries = OrderedDict()   # (id do grafo, versão, start, end, opções) -> (resultado, bytes)
+        self._versions = {}             # id do grafo -> versão vista por último
+        self._refs = {}                 # id do grafo -> weakref, limpa o cache quando o grafo some
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __call__(self, graph, start, end, **kwargs):
+        options = _options(kwargs)
+        if options is None:
+            self.misses += 1
+            return self.search(graph, start, end, **kwargs)
+        result = self.lookup(graph, start, end, options)
+        if result is None:
+            result = self.search(graph, start, end, **kwargs)
+            self.store(graph, start, end, result, options)
+        return result
+
+    def lookup(self, graph, start, end, options: tuple = ()):
+        '''
+        Retorna o resultado guardado para (start, end) na versão atual do grafo,
+        ou None (contado como falta). Para quem executa a busca por conta própria,
+        por exemplo em outro processo, e depois chama store. options são os
+        kwargs da busca, como devolvidos por _options.
+        '''
+        version = getattr(graph, 'version', None)
+        if version is not None:
+            key = (id(graph), version, start, end, options)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        self.misses += 1
+        return None
+
+    def store(self, graph, start, end, result, options: tuple = ()):
+        '''Guarda o resultado da busca de start até end (com options) no grafo.'''
+        version = getattr(graph, 'version', None)
+        if version is not None:
+            self._store(graph, (id(graph), version, start, end, options), result)
+
+    def _store(self, graph, key, result):
+        graph_id, version = key[0], key[1]
+        if self._versions.get(graph_id, version) != version:
+            # o grafo mudou: os resultados das versões anteriores não valem mais
+            self.invalidations += 1
+            self._drop(graph_id)
+        self._versions[graph_id] = version
+        if graph_id not in self._refs:
+            self._refs[graph_id] = weakref.ref(graph, lambda _: self._forget(graph_id))
+
+        size = _result_size(result)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def _drop(self, graph_id):
+        '''Remove todos os resultados do grafo graph_id.'''
+        for key in [key for key in self._entries if key[0] == graph_id]:
+            self._bytes -= self._entries.pop(key)[1]
+
+    def _forget(self, graph_id):
+        '''Chamado quando o grafo é coletado: o id pode ser reaproveitado.'''
+        self._drop(graph_id)
+        self._versions.pop(graph_id, None)
+        self._refs.pop(graph_id, None)
+
+    def cache_info(self) -> CacheInfo:
+        '''Contadores de acertos, faltas, descartes e invalidações, como no functools.'''
+        return CacheInfo(self.hits, self.misses, self.evictions, self.invalidations,
+                         len(self._entries), self._bytes)
+
+    def clear(self):
+        '''Esvazia o cache e zera os contadores.'''
+        self._entries.clear()
+        self._versions.clear()
+        self._refs.clear()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
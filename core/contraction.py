@@ -0,0 +1,333 @@
+#coding: utf-8
+
+'''
+Contraction Hierarchies (CH) para consultas ponto a ponto repetidas.
+
+Pré-processamento (ContractionHierarchy.build):
+    os nós são contraídos um a um, na ordem dada por uma prioridade
+    (diferença de arestas + vizinhos já contraídos, com atualização preguiçosa).
+    Ao contrair v, cada par u -> v -> x sem caminho testemunha mais curto que
+    evite v ganha um atalho u -> x com peso w(u, v) + w(v, x) e nó do meio v.
+
+Consulta (ContractionHierarchy.query):
+    dijkstra bidirecional só por arestas "para cima" (para nós de rank maior),
+    a partir de start nas arestas de saída e de end nas de entrada. Os atalhos
+    do caminho encontrado são desfeitos recursivamente pelo nó do meio, então o
+    resultado é o mesmo (distância, caminho) do core.dijkstra.
+
+Arquivo (save/load), little-endian:
+    cabeçalho   magic, versão, n, m_up (arestas para cima), m_down, tamanho dos nomes
+    name_offsets int64[n + 1], rank int64[n],
+    up:   offsets int64[n + 1], targets int64[m_up], weights float64[m_up], middle int64[m_up]
+    down: offsets int64[n + 1], sources int64[m_down], weights float64[m_down], middle int64[m_down]
+    names       nomes codificados em JSON (utf-8)
+    middle = -1 indica aresta original.
+'''
+
+import heapq
+import json
+import os
+import struct
+import sys
+from array import array
+
+from core import adjacency
+
+MAGIC = b'PIAGRCH\0'
+VERSION = 1
+_HEADER = struct.Struct('<8sIIQQQQ')
+_INF = float('inf')
+
+
+class ContractionHierarchy:
+    '''
+    Hierarquia de contração pronta para consultas. As arestas para cima ficam em
+    dois CSR: up (u -> x com rank[x] > rank[u]) e down (u <- x com rank[x] > rank[u],
+    usado pela busca a partir do destino). Cada aresta guarda o nó do meio do atalho.
+    '''
+
+    version = 0     # imutável: a versão nunca muda (ver core.cache)
+
+    def __init__(self, names, rank, up, down):
+        self._names = names
+        self._index = {name: i for i, name in enumerate(names)}
+        self._rank = rank
+        self._up = up        # (offsets, targets, weights, middle)
+        self._down = down    # (offsets, sources, weights, middle)
+
+    @classmethod
+    def build(cls, graph, settle_limit: int = 500):
+        '''
+        Faz o pré-processamento sobre um grafo do core.build_graph (nx.DiGraph ou CSRGraph).
+        settle_limit limita os nós visitados em cada busca por testemunha; um limite
+        menor deixa o pré-processamento mais rápido e só acrescenta atalhos extras.
+        '''
+        names = list(graph.nodes())
+        index = {name: i for i, name in enumerate(names)}
+        n = len(names)
+        successors = adjacency.successors(graph)
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        for u, name in enumerate(names):
+            for terminal, w in successors(name):
+                x = index[terminal]
+                if x != u:
+                    out_edges[u][x] = w
+                    in_edges[x][u] = w
+        middle = {}
+
+        contractor = _Contractor(out_edges, in_edges, middle, settle_limit)
+        rank = array('q', bytes(8 * n))
+        up_rows = [None] * n
+        down_rows = [None] * n
+        deleted_neighbors = [0] * n
+        queue = [(contractor.priority(v, contractor.shortcuts(v), 0), v) for v in range(n)]
+        heapq.heapify(queue)
+        contracted = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            # atualização preguiçosa: recalcula e só contrai se continuar sendo o menor
+            shortcuts = contractor.shortcuts(v)
+            priority = contractor.priority(v, shortcuts, deleted_neighbors[v])
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, v))
+                continue
+            rank[v] = contracted
+            contracted += 1
+            up_rows[v] = [(x, w, middle.get((v, x), -1)) for x, w in out_edges[v].items()]
+            down_rows[v] = [(u, w, middle.get((u, v), -1)) for u, w in in_edges[v].items()]
+            for neighbor in set(out_edges[v]) | set(in_edges[v]):
+                deleted_neighbors[neighbor] += 1
+            contractor.contract(v, shortcuts)
+
+        return cls(names, rank, _rows_to_csr(up_rows), _rows_to_csr(down_rows))
+
+    # consultas
+
+    def has_node(self, node) -> bool:
+        '''Verifica se o nó existe na hierarquia.'''
+        return node in self._index
+
+    def number_of_nodes(self) -> int:
+        '''Quantidade de nós.'''
+        return len(self._names)
+
+    def query(self, start, end) -> tuple[float|None, list]:
+        '''
+        Caminho mais curto entre start e end, no mesmo formato do core.dijkstra.
+        Se não houver caminho, retorna (float('inf'), None).
+        '''
+        if start is None or end is None:
+            raise AttributeError("Graph and nodes can't be None")
+        if start not in self._index or end not in self._index:
+            raise ValueError("Graph must contain the specified nodes")
+        if start == end:
+            return 0, [start]
+
+        source, target = self._index[start], self._index[end]
+        dist = ({source: 0}, {target: 0})
+        pred = ({source: -1}, {target: -1})
+        queues = ([(0, source)], [(0, target)])
+        rows = (self._up, self._down)
+        best, meeting = _INF, -1
+
+        while queues[0] or queues[1]:
+            # cada lado segue enquanto o seu topo ainda puder melhorar best
+            side = 0 if queues[0] and (not queues[1] or queues[0][0][0] <= queues[1][0][0]) else 1
+            curr_dist, u = heapq.heappop(queues[side])
+            if curr_dist > dist[side][u]:
+                continue
+            if curr_dist >= best:
+                queues[side].clear()
+                continue
+            other = dist[1 - side].get(u)
+            if other is not None and curr_dist + other < best:
+                best, meeting = curr_dist + other, u
+            offsets, targets, weights, _ = rows[side]
+            this_dist, this_pred = dist[side], pred[side]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                new_dist = curr_dist + weights[k]
+                if new_dist < this_dist.get(v, _INF):
+                    this_dist[v] = new_dist
+                    this_pred[v] = u
+                    heapq.heappush(queues[side], (new_dist, v))
+
+        if meeting == -1:
+            return _INF, None
+
+        packed = []
+        node = meeting
+        while node != -1:
+            packed.append(node)
+            node = pred[0][node]
+        packed.reverse()
+        node = pred[1][meeting]
+        while node != -1:
+            packed.append(node)
+            node = pred[1][node]
+
+        path = [packed[0]]
+        for u, v in zip(packed, packed[1:]):
+            self._unpack(u, v, path)
+        return best, [self._names[i] for i in path]
+
+    def _middle(self, u: int, v: int) -> int:
+        '''Nó do meio da aresta u -> v da hierarquia (-1 se for aresta original).'''
+        if self._rank[u] < self._rank[v]:
+            offsets, targets, _, middle = self._up
+            row, other = u, v
+        else:
+            offsets, targets, _, middle = self._down
+            row, other = v, u
+        for k in range(offsets[row], offsets[row + 1]):
+            if targets[k] == other:
+                return middle[k]
+        raise KeyError((u, v))
+
+    def _unpack(self, u: int, v: int, path: list):
+        '''Acrescenta ao path os nós da aresta u -> v sem atalhos (exceto u).'''
+        stack = [(u, v)]
+        while stack:
+            a, b = stack.pop()
+            mid = self._middle(a, b)
+            if mid == -1:
+                path.append(b)
+            else:
+                stack.append((mid, b))
+                stack.append((a, mid))
+
+    # arquivo
+
+    def save(self, path: str):
+        '''Grava a hierarquia no formato binário descrito no módulo.'''
+        encoded = [json.dumps(name, ensure_ascii=False).encode('utf-8') for name in self._names]
+        name_offsets = array('q', [0])
+        for name in encoded:
+            name_offsets.append(name_offsets[-1] + len(name))
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, 0, len(self._names), len(self._up[1]),
+                                    len(self._down[1]), name_offsets[-1]))
+            for values in (name_offsets, self._rank, *self._up, *self._down):
+                if sys.byteorder != 'little':
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(file)
+            for name in encoded:
+                file.write(name)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        '''Carrega uma hierarquia gravada com save.'''
+        with open(path, 'rb') as file:
+            header = file.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f'{path} is not a contraction hierarchy file')
+            _, version, _, n, m_up, m_down, names_size = _HEADER.unpack(header)
+            if version != VERSION:
+                raise ValueError(f'Unsupported hierarchy file version {version} '
+                                 f'(expected {VERSION})')
+
+            def read(typecode, count):
+                values = array(typecode)
+                values.fromfile(file, count)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                return values
+
+            try:
+                name_offsets = read('q', n + 1)
+                rank = read('q', n)
+                up = (read('q', n + 1), read('q', m_up), read('d', m_up), read('q', m_up))
+                down = (read('q', n + 1), read('q', m_down), read('d', m_down), read('q', m_down))
+            except EOFError as exc:
+                raise ValueError(f'{path} is truncated') from exc
+            blob = file.read(names_size)
+        names = [json.loads(blob[name_offsets[i]:name_offsets[i + 1]]) for i in range(n)]
+        return cls(names, rank, up, down)
+
+
+class _Contractor:
+    '''Estado do grafo restante durante o pré-processamento.'''
+
+    def __init__(self, out_edges, in_edges, middle, settle_limit):
+        self.out_edges = out_edges
+        self.in_edges = in_edges
+        self.middle = middle
+        self.settle_limit = settle_limit
+
+    def _witness(self, source, skip, limit) -> dict:
+        '''Dijkstra limitado a partir de source, ignorando o nó skip.'''
+        out_edges = self.out_edges
+        dist = {source: 0}
+        unvisited = [(0, source)]
+        settled = 0
+        while unvisited and settled < self.settle_limit:
+            curr_dist, u = heapq.heappop(unvisited)
+            if curr_dist > dist[u]:
+                continue
+            if curr_dist > limit:
+                break
+            settled += 1
+            for v, w in out_edges[u].items():
+                if v == skip:
+                    continue
+                new_dist = curr_dist + w
+                if new_dist < dist.get(v, _INF):
+                    dist[v] = new_dist
+                    heapq.heappush(unvisited, (new_dist, v))
+        return dist
+
+    def shortcuts(self, v) -> list:
+        '''Atalhos (u, x, peso) necessários para contrair v.'''
+        out_v = self.out_edges[v]
+        shortcuts = []
+        if not out_v:
+            return shortcuts
+        max_out = max(out_v.values())
+        for u, w_in in self.in_edges[v].items():
+            witness = self._witness(u, v, w_in + max_out)
+            for x, w_out in out_v.items():
+                if x == u:
+                    continue
+                candidate = w_in + w_out
+                if witness.get(x, _INF) > candidate:
+                    shortcuts.append((u, x, candidate))
+        return shortcuts
+
+    def priority(self, v, shortcuts, deleted_neighbors) -> int:
+        '''Diferença de arestas (atalhos - arestas removidas) + vizinhos já contraídos.'''
+        removed = len(self.out_edges[v]) + len(self.in_edges[v])
+        return len(shortcuts) - removed + deleted_neighbors
+
+    def contract(self, v, shortcuts):
+        '''Insere os atalhos de v e remove v do grafo restante.'''
+        for u, x, w in shortcuts:
+            if w < self.out_edges[u].get(x, _INF):
+                self.out_edges[u][x] = w
+                self.in_edges[x][u] = w
+                self.middle[(u, x)] = v
+        for x in self.out_edges[v]:
+            del self.in_edges[x][v]
+        for u in self.in_edges[v]:
+            del self.out_edges[u][v]
+        self.out_edges[v] = {}
+        self.in_edges[v] = {}
+
+
+def _rows_to_csr(rows) -> tuple:
+    '''Converte listas de (vizinho, peso, meio) por nó em arrays CSR.'''
+    offsets = array('q', [0])
+    targets = array('q')
+    weights = array('d')
+    middle = array('q')
+    for row in rows:
+        for neighbor, w, mid in row:
+            targets.append(neighbor)
+            weights.append(w)
+            middle.append(mid)
+        offsets.append(len(targets))
+    return offsets, targets, weights, middle
@@ -0,0 +1,222 @@
+#coding: utf-8
+
+'''
+Representação compacta de grafo direcionado em formato CSR (compressed sparse row).
+'''
+
+from array import array
+
+
+class CSRGraph:
+    '''
+    Grafo direcionado imutável com os nomes das cidades internados como ids inteiros.
+    As arestas que saem do nó de id u ficam em targets[offsets[u]:offsets[u + 1]],
+    com os pesos correspondentes em weights, todos em arrays da stdlib.
+    Oferece a parte da interface do nx.DiGraph usada pelo projeto.
+    '''
+
+    version = 0     # imutável: a versão nunca muda (ver core.cache)
+
+    def __init__(self, names, offsets, targets, weights, index=None):
+        self._names = names                 # id -> nome
+        self._offsets = offsets             # array('q') com n + 1 posições
+        self._targets = targets             # array('q') com m posições
+        self._weights = weights             # array('d') com m posições
+        if index is None:
+            index = {name: i for i, name in enumerate(names)}
+        self._index = index                 # nome -> id
+        self._reverse = None                # grafo transposto, construído sob demanda
+        self.coordinates = {}               # nome -> (lat, lon), opcional
+
+    @classmethod
+    def from_edges(cls, edges, nodes=()):
+        '''
+        Constrói o grafo a partir de um iterável de arestas (node, terminal, weight).
+        Nós em nodes entram antes dos nós das arestas, mesmo sem arestas.
+        Arestas repetidas mantêm o último peso, como no nx.DiGraph.
+        '''
+        index = {}
+        names = []
+        for node in nodes:
+            if node not in index:
+                index[node] = len(names)
+                names.append(node)
+
+        sources = array('q')
+        terminals = array('q')
+        weights = array('d')
+        for node, terminal, w in edges:
+            u = index.get(node)
+            if u is None:
+                u = index[node] = len(names)
+                names.append(node)
+            v = index.get(terminal)
+            if v is None:
+                v = index[terminal] = len(names)
+                names.append(terminal)
+            sources.append(u)
+            terminals.append(v)
+            weights.append(w)
+
+        offsets, targets, weights = _to_csr(len(names), sources, terminals, weights)
+        return cls(names, offsets, targets, weights, index)
+
+    @classmethod
+    def from_networkx(cls, digraph):
+        '''
+        Converte um nx.DiGraph, preservando a ordem dos nós e das arestas.
+        '''
+        edges = ((u, v, data.get("weight", 1)) for u, v, data in digraph.edges(data=True))
+        return cls.from_edges(edges, nodes=digraph.nodes())
+
+    # ids internos
+
+    def node_id(self, node) -> int:
+        '''Retorna o id inteiro do nó. Lança KeyError se o nó não existir.'''
+        return self._index[node]
+
+    def node_name(self, node_id: int):
+        '''Retorna o nome do nó de id node_id.'''
+        return self._names[node_id]
+
+    def arrays(self) -> tuple:
+        '''Retorna os arrays (offsets, targets, weights) usados pelas buscas.'''
+        return self._offsets, self._targets, self._weights
+
+    def reverse(self):
+        '''
+        Retorna o grafo transposto (mesmos ids, arestas invertidas).
+        É construído na primeira chamada e reaproveitado depois.
+        '''
+        if self._reverse is None:
+            offsets, targets, weights = self._offsets, self._targets, self._weights
+            sources = array('q')
+            for u in range(len(self._names)):
+                sources.extend(array('q', [u]) * (offsets[u + 1] - offsets[u]))
+            r_offsets, r_targets, r_weights = _to_csr(len(self._names), array('q', targets),
+                                                      sources, array('d', weights))
+            self._reverse = CSRGraph(self._names, r_offsets, r_targets, r_weights, self._index)
+            self._reverse._reverse = self
+            self._reverse.coordinates = self.coordinates
+        return self._reverse
+
+    # interface compatível com nx.DiGraph
+
+    def number_of_nodes(self) -> int:
+        '''Quantidade de nós.'''
+        return len(self._names)
+
+    def number_of_edges(self) -> int:
+        '''Quantidade de arestas.'''
+        return len(self._targets)
+
+    def nodes(self) -> list:
+        '''Lista dos nós na ordem dos ids.'''
+        return list(self._names)
+
+    def has_node(self, node) -> bool:
+        '''Verifica se o nó existe no grafo.'''
+        return node in self._index
+
+    def __contains__(self, node) -> bool:
+        return node in self._index
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __getitem__(self, node) -> dict:
+        return {v: {"weight": w} for v, w in self.weighted_successors(node)}
+
+    def neighbors(self, node):
+        '''Itera sobre os sucessores do nó.'''
+        for v, _ in self.weighted_successors(node):
+            yield v
+
+    successors = neighbors
+
+    def successor_ids(self, node_id: int) -> tuple:
+        '''(targets, weights) das arestas que saem do nó de id node_id.'''
+        start, stop = self._offsets[node_id], self._offsets[node_id + 1]
+        return self._targets[start:stop], self._weights[start:stop]
+
+    def weighted_successors(self, node):
+        '''Itera sobre os pares (sucessor, peso) do nó.'''
+        u = self._index[node]
+        names, targets, weights = self._names, self._targets, self._weights
+        for k in range(self._offsets[u], self._offsets[u + 1]):
+            yield names[targets[k]], weights[k]
+
+    def weighted_predecessors(self, node):
+        '''Itera sobre os pares (antecessor, peso) das arestas que chegam ao nó.'''
+        return self.reverse().weighted_successors(node)
+
+    def predecessors(self, node):
+        '''Itera sobre os antecessores do nó.'''
+        return self.reverse().neighbors(node)
+
+    def has_edge(self, node, terminal) -> bool:
+        '''Verifica se existe a aresta node -> terminal.'''
+        return self.get_edge_data(node, terminal) is not None
+
+    def get_edge_data(self, node, terminal, default=None):
+        '''Retorna {'weight': w} da aresta node -> terminal, ou default.'''
+        if node not in self._index or terminal not in self._index:
+            return default
+        u, v = self._index[node], self._index[terminal]
+        targets = self._targets
+        for k in range(self._offsets[u], self._offsets[u + 1]):
+            if targets[k] == v:
+                return {"weight": self._weights[k]}
+        return default
+
+    def edges(self, data=False):
+        '''Itera sobre as arestas (u, v) ou (u, v, {'weight': w}).'''
+        names, offsets, targets, weights = self._names, self._offsets, self._targets, self._weights
+        for u, name in enumerate(names):
+            for k in range(offsets[u], offsets[u + 1]):
+                if data:
+                    yield name, names[targets[k]], {"weight": weights[k]}
+                else:
+                    yield name, names[targets[k]]
+
+
+def _to_csr(n, sources, terminals, weights):
+    '''
+    Ordena as arestas por origem (counting sort estável) e remove arestas repetidas.
+    '''
+    m = len(sources)
+    offsets = array('q', bytes(8 * (n + 1)))
+    for u in sources:
+        offsets[u + 1] += 1
+    for u in range(n):
+        offsets[u + 1] += offsets[u]
+
+    cursor = array('q', offsets)
+    targets = array('q', bytes(8 * m))
+    ordered = array('d', bytes(8 * m))
+    for k in range(m):
+        u = sources[k]
+        pos = cursor[u]
+        cursor[u] = pos + 1
+        targets[pos] = terminals[k]
+        ordered[pos] = weights[k]
+
+    if all(len(set(targets[offsets[u]:offsets[u + 1]])) == offsets[u + 1] - offsets[u]
+           for u in range(n)):
+        return offsets, targets, ordered
+
+    # arestas repetidas: mantém a primeira posição e o último peso
+    new_offsets = array('q', [0])
+    new_targets = array('q')
+    new_weights = array('d')
+    for u in range(n):
+        row = {}
+        for k in range(offsets[u], offsets[u + 1]):
+            row[targets[k]] = ordered[k]
+        new_targets.extend(row.keys())
+        new_weights.extend(row.values())
+        new_offsets.append(len(new_targets))
+    return new_offsets, new_targets, new_weights
@@ -3,28 +3,242 @@ Implementação do algoritmo de Dijkstra para encontrar o caminho mais curto em
 """
 #coding: utf-8
 import heapq
+import time
 import networkx as nx
+from core import adjacency, frontier as frontiers
+from core.csr_graph import CSRGraph
+from core.lazy_graph import LazyGraph
 from util import validator
 
-def dijkstra(digraph: nx.DiGraph, start: str, end: str) -> tuple[float|None, list[str]]:
+_INF = float('inf')
+
+def dijkstra(digraph: nx.DiGraph | CSRGraph, start: str, end: str,
+             bidirectional: bool = False, frontier: str = 'auto',
+             stats: 'SearchStats | None' = None,
+             landmarks: 'LandmarkTable | None' = None) -> tuple[float|None, list[str]]:
     """
     Encontra o caminho mais curto entre os nós start e end.
     Retorna uma tupla com a distância total e a lista de nós no caminho.
     Se não houver caminho, retorna (float('inf'), None).
+    Aceita tanto um nx.DiGraph quanto um CSRGraph.
+    Com bidirectional=True busca ao mesmo tempo a partir de start (arestas de saída)
+    e de end (arestas de entrada), parando quando as duas fronteiras se encontram.
+    frontier escolhe a fila de prioridade da busca unidirecional ('heap',
+    'indexed', 'dial', 'pairing', ver core.frontier); com 'auto' a escolha é
+    feita por choose_frontier a partir dos pesos do grafo.
+    Com stats (um SearchStats) a busca é feita por um laço instrumentado que
+    preenche os contadores e tempos; sem stats os laços normais não contam nada.
+    Com landmarks (um core.landmarks.LandmarkTable do mesmo grafo) a busca é
+    dirigida ao destino (ALT): os limites inferiores das tabelas ordenam a fila
+    e descartam os nós que não alcançam end.
     """
+    if stats is not None:
+        if bidirectional or frontier not in ('auto', 'heap') or landmarks is not None:
+            raise ValueError("Search stats are only collected by the unidirectional heap search")
+        return _dijkstra_stats(digraph, start, end, stats)
+    if landmarks is not None and (bidirectional or frontier not in ('auto', 'heap')):
+        raise ValueError("The landmark search is unidirectional and uses the heap frontier")
     validator.validate_objects(digraph, start, end)
     if start == end:
         return 0, [start]
+    if landmarks is not None:
+        landmarks.check(digraph)
+        if isinstance(digraph, CSRGraph):
+            return _dijkstra_alt_csr(digraph, start, end, landmarks)
+        return _dijkstra_alt_nx(digraph, start, end, landmarks)
+    if bidirectional:
+        return _bidirectional(adjacency.successors(digraph), adjacency.predecessors(digraph),
+                              start, end)
+    if frontier == 'auto':
+        frontier = choose_frontier(digraph)
+    if frontier == 'dial':
+        integer, max_weight, _ = frontiers.edge_profile(digraph)
+        if not integer:
+            raise ValueError("The dial frontier needs integer weights")
+        if isinstance(digraph, nx.DiGraph):
+            return _dijkstra_dial_nx(digraph, start, end, max_weight)
+        return frontiers.shortest_path(adjacency.successors(digraph), start, end,
+                                       frontiers.make_frontier(frontier, max_weight))
+    if frontier != 'heap':
+        return frontiers.shortest_path(adjacency.successors(digraph), start, end,
+                                       frontiers.make_frontier(frontier))
+    if isinstance(digraph, LazyGraph):
+        return _dijkstra_rows(digraph, start, end)
+    if isinstance(digraph, CSRGraph):
+        return _dijkstra_csr(digraph, start, end)
+
+    return _dijkstra_nx(digraph, start, end)
+
+DIAL_MAX_WEIGHT = 64      # a busca percorre cada distância inteira até a final, mesmo sem nós
+DIAL_WEIGHT_PER_DEGREE = 16 # e o maior peso deve ser pequeno perto do grau médio
+DIAL_MAX_DEGREE = 64      # em grafos densos o heapq volta a ser mais rápido
+
+def choose_frontier(digraph) -> str:
+    """
+    Fila usada por dijkstra(frontier='auto'): 'dial' num nx.DiGraph com versão
+    (o TrackedDiGraph do build_graph) cujos pesos são todos inteiros até
+    DIAL_MAX_WEIGHT e até DIAL_WEIGHT_PER_DEGREE vezes o grau médio, e cujo
+    grau médio não passa de DIAL_MAX_DEGREE; 'heap' nos demais casos. Com
+    pesos maiores a fila de Dial passa a maior parte do tempo em baldes
+    vazios. Os pesos são percorridos uma vez por versão do grafo
+    (core.frontier.edge_profile); grafos sem versão não são percorridos.
+    """
+    if not isinstance(digraph, nx.DiGraph) or getattr(digraph, 'version', None) is None:
+        return 'heap'
+    integer, max_weight, edges = frontiers.edge_profile(digraph)
+    nodes = len(digraph)
+    if not integer or edges > DIAL_MAX_DEGREE * nodes:
+        return 'heap'
+    if max_weight > DIAL_MAX_WEIGHT or max_weight * nodes > DIAL_WEIGHT_PER_DEGREE * edges:
+        return 'heap'
+    return 'dial'
 
+def _dijkstra_nx(digraph: nx.DiGraph, start: str, end: str) -> tuple[float|None, list[str]]:
+    """
+    Laço principal sobre o nx.DiGraph. Percorre vizinhos e atributos da aresta
+    juntos em digraph._adj[u].items(), evitando neighbors() + get_edge_data()
+    (quatro buscas em dicionário por aresta relaxada).
+    """
+    adj = digraph._adj # pylint: disable=protected-access
     pred = {start: None} # keep predecessors nodes
     dist = {start: 0} # keep distance of node to start
-    unvisited = []
-    heapq.heappush(unvisited, (0, start))
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(0, start)]
+
+    while unvisited:
+        curr_dist, curr_node = pop(unvisited)
+
+        if curr_dist > dist[curr_node]:
+            continue
+        if curr_node == end:
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+
+        for neighbor, edge in adj[curr_node].items():
+            new_dist = curr_dist + edge.get("weight", 1)
+
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist, neighbor))
+    return _INF, None # no path of start to end
+
+def _dijkstra_dial_nx(digraph: nx.DiGraph, start: str, end: str,
+                      max_weight: int) -> tuple[float|None, list[str]]:
+    """
+    Laço do _dijkstra_nx com a fila de Dial (core.frontier.BucketQueue) embutida:
+    max_weight + 1 baldes circulares, um por distância inteira, criados quando
+    recebem o primeiro nó. Uma entrada cuja distância já diminuiu é descartada
+    quando o seu balde é esvaziado.
+    """
+    adj = digraph._adj # pylint: disable=protected-access
+    size = int(max_weight) + 1
+    buckets = [None] * size
+    pred = {start: None}
+    dist = {start: 0}
+    dist_get = dist.get
+    buckets[0] = [start]
+    pending = 1 # entradas nos baldes, inclusive as velhas
+    current = 0
+
+    while pending:
+        bucket = buckets[current % size]
+        if not bucket:
+            current += 1
+            continue
+        curr_node = bucket.pop()
+        pending -= 1
+        curr_dist = dist[curr_node]
+        if curr_dist != current:
+            continue
+        if curr_node == end:
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+
+        for neighbor, edge in adj[curr_node].items():
+            new_dist = curr_dist + edge.get("weight", 1)
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                slot = int(new_dist) % size
+                bucket = buckets[slot]
+                if bucket is None:
+                    buckets[slot] = [neighbor]
+                else:
+                    bucket.append(neighbor)
+                pending += 1
+    return _INF, None
+
+def _dijkstra_csr(digraph: CSRGraph, start: str, end: str) -> tuple[float|None, list[str]]:
+    """
+    Mesma busca sobre os arrays do CSRGraph, usando ids inteiros no lugar dos nomes.
+    """
+    offsets, targets, weights = digraph.arrays()
+    source = digraph.node_id(start)
+    target = digraph.node_id(end)
+
+    pred = {source: -1}
+    dist = {source: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(0, source)]
+
+    while unvisited:
+        curr_dist, curr_node = pop(unvisited)
+
+        if curr_dist > dist[curr_node]:
+            continue
+        if curr_node == target:
+            path = []
+            node = target
+            while node != -1:
+                path.append(digraph.node_name(node))
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+
+        for k in range(offsets[curr_node], offsets[curr_node + 1]):
+            neighbor = targets[k]
+            new_dist = curr_dist + weights[k]
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist, neighbor))
+    return _INF, None
+
+def _dijkstra_alt_nx(digraph: nx.DiGraph, start: str, end: str,
+                     landmarks) -> tuple[float|None, list[str]]:
+    """
+    A* sobre o nx.DiGraph com os limites inferiores das tabelas de landmarks,
+    calculados uma vez por nó descoberto. Com limites arredondados (slack > 0)
+    a heurística pode não ser consistente, então um nó já expandido pode ser
+    reaberto, como no core.astar.
+    """
+    adj = digraph._adj # pylint: disable=protected-access
+    node_id = landmarks.node_ids()
+    bound = landmarks.potential(node_id(end))
+    estimate = {start: bound(node_id(start))}
+    pred = {start: None}
+    dist = {start: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(estimate[start], 0, start)]
 
     while unvisited:
-        curr_dist, curr_node = heapq.heappop(unvisited)
+        _, curr_dist, curr_node = pop(unvisited)
 
-        if curr_dist > dist.get(curr_node, float('inf')):
+        if curr_dist > dist[curr_node]:
             continue
         if curr_node == end:
             path = []
@@ -35,34 +249,400 @@ def dijkstra(digraph: nx.DiGraph, start: str, end: str) -> tuple[float|None, lis
             path.reverse()
             return curr_dist, path
 
-        for neighbor in digraph.neighbors(curr_node):
-            edge = digraph.get_edge_data(curr_node, neighbor)
-            edge_weight = edge.get("weight", 1)
-            new_dist = curr_dist + edge_weight
+        for neighbor, edge in adj[curr_node].items():
+            new_dist = curr_dist + edge.get("weight", 1)
+            if new_dist < dist_get(neighbor, _INF):
+                h = estimate.get(neighbor)
+                if h is None:
+                    h = estimate[neighbor] = bound(node_id(neighbor))
+                if h == _INF:
+                    continue    # as tabelas mostram que neighbor não alcança end
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist + h, new_dist, neighbor))
+    return _INF, None
+
+def _dijkstra_alt_csr(digraph: CSRGraph, start: str, end: str,
+                      landmarks) -> tuple[float|None, list[str]]:
+    """
+    Mesma busca do _dijkstra_alt_nx sobre o CSRGraph, com ids inteiros; a lista
+    de arestas de cada nó é lida de uma vez (successor_ids), como no _dijkstra_rows.
+    """
+    row = digraph.successor_ids
+    source = digraph.node_id(start)
+    target = digraph.node_id(end)
+    bound = landmarks.potential(target)
+    estimate = {source: bound(source)}
+    pred = {source: -1}
+    dist = {source: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(estimate[source], 0, source)]
+
+    while unvisited:
+        _, curr_dist, curr_node = pop(unvisited)
+
+        if curr_dist > dist[curr_node]:
+            continue
+        if curr_node == target:
+            path = []
+            node = target
+            while node != -1:
+                path.append(digraph.node_name(node))
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+
+        for neighbor, weight in zip(*row(curr_node)):
+            new_dist = curr_dist + weight
+            if new_dist < dist_get(neighbor, _INF):
+                h = estimate.get(neighbor)
+                if h is None:
+                    h = estimate[neighbor] = bound(neighbor)
+                if h == _INF:
+                    continue
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist + h, new_dist, neighbor))
+    return _INF, None
+
+def _dijkstra_rows(digraph: CSRGraph, start: str, end: str) -> tuple[float|None, list[str]]:
+    """
+    Laço do _dijkstra_csr que lê a lista de arestas de cada nó de uma vez
+    (successor_ids). No LazyGraph são fatias das páginas em cache, em vez de
+    uma leitura paginada por aresta.
+    """
+    row = digraph.successor_ids
+    source = digraph.node_id(start)
+    target = digraph.node_id(end)
+
+    pred = {source: -1}
+    dist = {source: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(0, source)]
+
+    while unvisited:
+        curr_dist, curr_node = pop(unvisited)
+
+        if curr_dist > dist[curr_node]:
+            continue
+        if curr_node == target:
+            path = []
+            node = target
+            while node != -1:
+                path.append(digraph.node_name(node))
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+
+        for neighbor, weight in zip(*row(curr_node)):
+            new_dist = curr_dist + weight
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist, neighbor))
+    return _INF, None
+
+class SearchStats:
+    """
+    Contadores e tempos de buscas do dijkstra, preenchidos quando o objeto é
+    passado em dijkstra(..., stats=SearchStats()). Os valores são somados a
+    cada busca (peak_frontier guarda o maior pico), então o mesmo objeto pode
+    resumir várias consultas.
+    """
+
+    COUNTERS = ('searches', 'settled', 'relaxed', 'pushes', 'stale_pops', 'peak_frontier')
+    TIMINGS = ('validation_s', 'search_s', 'path_s')
+
+    def __init__(self):
+        self.searches = 0      # buscas instrumentadas
+        self.settled = 0       # nós removidos da fila com a distância final
+        self.relaxed = 0       # arestas examinadas
+        self.pushes = 0        # entradas inseridas no heap
+        self.stale_pops = 0    # entradas removidas do heap com distância velha
+        self.peak_frontier = 0 # maior número de entradas no heap (inclusive as velhas)
+        self.validation_s = 0.0
+        self.search_s = 0.0
+        self.path_s = 0.0
+
+    def as_dict(self) -> dict:
+        """Contadores e tempos (em segundos) num dicionário."""
+        return {name: getattr(self, name) for name in self.COUNTERS + self.TIMINGS}
+
+    def summary(self) -> list[str]:
+        """Linhas de texto com os contadores e os tempos em ms, para a CLI."""
+        labels = {
+            'searches': 'searches', 'settled': 'nodes settled', 'relaxed': 'edges relaxed',
+            'pushes': 'heap pushes', 'stale_pops': 'stale pops', 'peak_frontier': 'peak frontier',
+            'validation_s': 'validation', 'search_s': 'search', 'path_s': 'path reconstruction',
+        }
+        lines = [f"{labels[name]}: {getattr(self, name)}" for name in self.COUNTERS]
+        lines += [f"{labels[name]}: {getattr(self, name) * 1000:.3f} ms" for name in self.TIMINGS]
+        return lines
+
+def _dijkstra_stats(digraph, start, end, stats: SearchStats) -> tuple[float|None, list[str]]:
+    """
+    A mesma busca do _dijkstra_nx/_dijkstra_csr (heapq com remoção preguiçosa)
+    sobre core.adjacency, contando as operações em stats e medindo à parte a
+    validação, a busca e a reconstrução do caminho.
+    """
+    clock = time.perf_counter
+    begin = clock()
+    validator.validate_objects(digraph, start, end)
+    stats.validation_s += clock() - begin
+    stats.searches += 1
+
+    begin = clock()
+    successors = adjacency.successors(digraph)
+    pred = {start: None}
+    dist = {start: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(0, start)]
+    settled = relaxed = stale = 0
+    pushes = peak = 1
+    found = None
+
+    while unvisited:
+        curr_dist, curr_node = pop(unvisited)
+
+        if curr_dist > dist[curr_node]:
+            stale += 1
+            continue
+        settled += 1
+        if curr_node == end:
+            found = curr_dist
+            break
+
+        for neighbor, weight in successors(curr_node):
+            relaxed += 1
+            new_dist = curr_dist + weight
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist, neighbor))
+                pushes += 1
+        if len(unvisited) > peak:
+            peak = len(unvisited)
+
+    stats.search_s += clock() - begin
+    stats.settled += settled
+    stats.relaxed += relaxed
+    stats.pushes += pushes
+    stats.stale_pops += stale
+    stats.peak_frontier = max(stats.peak_frontier, peak)
+    if found is None:
+        return _INF, None
+
+    begin = clock()
+    path = []
+    node = end
+    while node is not None:
+        path.append(node)
+        node = pred[node]
+    path.reverse()
+    stats.path_s += clock() - begin
+    return found, path
+
+class ShortestPathTree:
+    """
+    Resultado de uma busca de um nó para todos (dijkstra_all): distâncias e
+    árvore de antecessores a partir de source. Os caminhos são reconstruídos
+    sob demanda, sem nova busca.
+    """
+
+    def __init__(self, source, dist: dict, pred: dict):
+        self.source = source
+        self.dist = dist # nó -> distância, apenas para os nós alcançáveis
+        self.pred = pred # nó -> antecessor no caminho mais curto (source -> None)
+
+    def __contains__(self, node) -> bool:
+        return node in self.dist
+
+    def __len__(self) -> int:
+        return len(self.dist)
+
+    def distance(self, target) -> float:
+        """Distância de source até target (float('inf') se não alcançável)."""
+        return self.dist.get(target, _INF)
+
+    def path(self, target) -> list | None:
+        """Caminho de source até target, ou None se não alcançável."""
+        if target not in self.pred:
+            return None
+        path = []
+        node = target
+        while node is not None:
+            path.append(node)
+            node = self.pred[node]
+        path.reverse()
+        return path
+
+    def result(self, target) -> tuple[float|None, list[str]]:
+        """(distância, caminho) até target, no mesmo formato do dijkstra."""
+        return self.distance(target), self.path(target)
+
+def dijkstra_all(digraph: nx.DiGraph | CSRGraph, start: str, targets=None) -> ShortestPathTree:
+    """
+    Busca a partir de start até esgotar o grafo e retorna a árvore de caminhos
+    mais curtos (distâncias e antecessores de todos os nós alcançáveis).
+    Com targets (coleção de nós), a busca para assim que todos eles forem
+    fixados; a árvore então contém apenas os nós fixados até esse ponto.
+    """
+    validator.validate_objects(digraph, start, start)
+    if targets is not None:
+        targets = set(targets)
+        if not all(digraph.has_node(target) for target in targets):
+            raise ValueError("Graph must contain the specified nodes")
+    if isinstance(digraph, CSRGraph):
+        return _all_csr(digraph, start, targets)
+
+    adj = digraph._adj # pylint: disable=protected-access
+    pred = {start: None}
+    dist = {start: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(0, start)]
+    remaining = targets
+    settled = []
+
+    while unvisited:
+        curr_dist, curr_node = pop(unvisited)
+        if curr_dist > dist[curr_node]:
+            continue
+        if remaining is not None:
+            settled.append(curr_node)
+            remaining.discard(curr_node)
+            if not remaining:
+                break
+        for neighbor, edge in adj[curr_node].items():
+            new_dist = curr_dist + edge.get("weight", 1)
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist, neighbor))
+
+    if remaining is not None:
+        # descarta os rótulos provisórios dos nós não fixados
+        dist = {node: dist[node] for node in settled}
+        pred = {node: pred[node] for node in settled}
+    return ShortestPathTree(start, dist, pred)
+
+def _all_csr(digraph: CSRGraph, start: str, targets: set | None) -> ShortestPathTree:
+    """
+    dijkstra_all sobre os arrays do CSRGraph, com ids inteiros no lugar dos nomes.
+    """
+    offsets, edge_targets, weights = digraph.arrays()
+    source = digraph.node_id(start)
+    pred = {source: -1}
+    dist = {source: 0}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(0, source)]
+    remaining = None if targets is None else {digraph.node_id(target) for target in targets}
+    settled = []
 
-            if new_dist < dist.get(neighbor, float('inf')):
+    while unvisited:
+        curr_dist, curr_node = pop(unvisited)
+        if curr_dist > dist[curr_node]:
+            continue
+        if remaining is not None:
+            settled.append(curr_node)
+            remaining.discard(curr_node)
+            if not remaining:
+                break
+        for k in range(offsets[curr_node], offsets[curr_node + 1]):
+            neighbor = edge_targets[k]
+            new_dist = curr_dist + weights[k]
+            if new_dist < dist_get(neighbor, _INF):
                 dist[neighbor] = new_dist
                 pred[neighbor] = curr_node
-                heapq.heappush(unvisited, (new_dist, neighbor))
-    return float('inf'), None # no path of start to end
-
-graph = nx.DiGraph()
-graph.add_edge("A", "B", weight=4)
-graph.add_edge("A", "C", weight=2)
-graph.add_edge("C", "B", weight=1)
-graph.add_edge("B", "D", weight=5)
-
-# start = end
-shortest_dist, shortest_path = dijkstra(graph, "A", "A")
-assert shortest_dist == 0
-assert shortest_path == ["A"]
-
-# A → C → B < A → B
-shortest_dist, shortest_path = dijkstra(graph, "A", "B")
-assert shortest_dist == 3
-assert shortest_path == ["A", "C", "B"]
-
-# no path of B to C
-shortest_dist, shortest_path = dijkstra(graph, "B", "C")
-assert shortest_dist == float("inf")
-assert shortest_path is None
+                push(unvisited, (new_dist, neighbor))
+
+    reached = dist if remaining is None else settled
+    name = digraph.node_name
+    return ShortestPathTree(
+        start,
+        {name(i): dist[i] for i in reached},
+        {name(i): (name(pred[i]) if pred[i] != -1 else None) for i in reached},
+    )
+
+def _bidirectional(forward, backward, start, end) -> tuple[float|None, list[str]]:
+    """
+    Dijkstra bidirecional. forward(u) e backward(v) retornam pares (nó, peso)
+    das arestas de saída de u e de entrada de v.
+    Para quando a soma dos topos das duas filas não pode mais melhorar
+    o melhor caminho encontrado (mu).
+    """
+    dist = ({start: 0}, {end: 0})
+    pred = ({start: None}, {end: None})
+    queues = ([(0, start)], [(0, end)])
+    edges = (forward, backward)
+    push, pop = heapq.heappush, heapq.heappop
+    best, meeting = _INF, None
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        # expande o lado com a menor distância no topo
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        curr_dist, curr_node = pop(queues[side])
+        if curr_dist > dist[side][curr_node]:
+            continue
+        this_dist, this_pred, other_dist = dist[side], pred[side], dist[1 - side]
+        for neighbor, weight in edges[side](curr_node):
+            new_dist = curr_dist + weight
+            if new_dist < this_dist.get(neighbor, _INF):
+                this_dist[neighbor] = new_dist
+                this_pred[neighbor] = curr_node
+                push(queues[side], (new_dist, neighbor))
+                if neighbor in other_dist and new_dist + other_dist[neighbor] < best:
+                    best = new_dist + other_dist[neighbor]
+                    meeting = neighbor
+
+    if meeting is None:
+        return _INF, None
+
+    path = []
+    node = meeting
+    while node is not None:
+        path.append(node)
+        node = pred[0][node]
+    path.reverse()
+    node = pred[1][meeting]
+    while node is not None:
+        path.append(node)
+        node = pred[1][node]
+    return best, path
+
+def self_test():
+    """
+    Verificação rápida com um grafo de exemplo. Executada apenas sob demanda
+    (python -m core.dijkstra ou main.py --self-test), nunca no import.
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=4)
+    graph.add_edge("A", "C", weight=2)
+    graph.add_edge("C", "B", weight=1)
+    graph.add_edge("B", "D", weight=5)
+
+    # start = end
+    shortest_dist, shortest_path = dijkstra(graph, "A", "A")
+    assert shortest_dist == 0
+    assert shortest_path == ["A"]
+
+    # A → C → B < A → B
+    shortest_dist, shortest_path = dijkstra(graph, "A", "B")
+    assert shortest_dist == 3
+    assert shortest_path == ["A", "C", "B"]
+
+    # no path of B to C
+    shortest_dist, shortest_path = dijkstra(graph, "B", "C")
+    assert shortest_dist == float("inf")
+    assert shortest_path is None
+
+
+if __name__ == '__main__':
+    self_test()
+    print("dijkstra: self-test OK")
@@ -0,0 +1,195 @@
+#coding: utf-8
+
+'''
+Caminhos mínimos dinâmicos: alterações de arestas (inserção, mudança de peso,
+remoção) aplicadas a um grafo carregado, reparando as árvores de caminhos
+mínimos já calculadas em vez de refazer as buscas (no estilo de
+Ramalingam-Reps).
+
+- Peso menor ou aresta nova (u, v): se d(u) + w melhora d(v), a melhora é
+  propagada a partir de v com uma fila de prioridade, como no dijkstra.
+- Peso maior ou aresta removida: só importa se (u, v) é aresta da árvore.
+  Nesse caso apenas a subárvore de v é afetada: as distâncias dela são
+  descartadas, cada nó afetado recebe a melhor estimativa vinda de antecessores
+  não afetados e um dijkstra restrito à subárvore recalcula as distâncias.
+
+As alterações podem vir de um arquivo delta em JSON:
+    {"set": [["A", "B", 7], ...], "remove": [["B", "C"], ...]}
+As remoções são aplicadas antes das inserções/alterações.
+'''
+
+import heapq
+
+import networkx as nx
+from core.dijkstra import ShortestPathTree, dijkstra_all
+from util import validator
+
+_INF = float('inf')
+
+
+def read_delta(path: str) -> tuple[list, list]:
+    '''
+    Lê e valida um arquivo delta. Retorna (set, remove): as arestas
+    [u, v, w] a inserir/alterar e os pares [u, v] a remover.
+    '''
+    data = validator.validate_path(path)
+    if not isinstance(data, dict) or not set(data) <= {"set", "remove"}:
+        raise ValueError('The delta must be an object with the keys "set" and/or "remove"')
+    updates = data.get("set", [])
+    removals = data.get("remove", [])
+    for edge in updates:
+        if not isinstance(edge, list) or len(edge) != 3:
+            raise ValueError(f"The edge {edge} needs to be [node, terminal, weight]")
+        validator.validate_edge(*edge)
+    for edge in removals:
+        if not isinstance(edge, list) or len(edge) != 2:
+            raise ValueError(f"The edge {edge} needs to be [node, terminal]")
+    return updates, removals
+
+
+class DynamicShortestPaths:
+    '''
+    Mantém árvores de caminhos mínimos (uma por origem consultada) corretas
+    enquanto as arestas do grafo mudam. O grafo precisa ser um nx.DiGraph
+    (o TrackedDiGraph do build_graph): as alterações são feitas nele, então o
+    core.cache também enxerga a nova versão.
+    '''
+
+    def __init__(self, graph: nx.DiGraph):
+        if not isinstance(graph, nx.DiGraph):
+            raise ValueError("Dynamic updates need an nx.DiGraph (build_graph without compact)")
+        self.graph = graph
+        self.trees = {}     # origem -> ShortestPathTree completa
+
+    def tree(self, source) -> ShortestPathTree:
+        '''Árvore de caminhos mínimos de source, calculada na primeira consulta.'''
+        tree = self.trees.get(source)
+        if tree is None:
+            tree = self.trees[source] = dijkstra_all(self.graph, source)
+        return tree
+
+    def query(self, start, end) -> tuple[float|None, list[str]]:
+        '''(distância, caminho) de start até end, no mesmo formato do dijkstra.'''
+        validator.validate_objects(self.graph, start, end)
+        return self.tree(start).result(end)
+
+    def set_edge(self, u, v, weight):
+        '''Insere a aresta (u, v) ou altera o seu peso, reparando as árvores.'''
+        validator.validate_edge(u, v, weight)
+        old = self.graph[u][v].get("weight", 1) if self.graph.has_edge(u, v) else _INF
+        validated = validator.is_validated(self.graph)
+        self.graph.add_edge(u, v, weight=weight)
+        if validated:
+            # a aresta nova já foi validada: o grafo continua válido sem percorrê-lo
+            validator.mark_validated(self.graph)
+        for tree in self.trees.values():
+            if weight < old:
+                _decrease(self.graph, tree, u, v, weight)
+            elif weight > old:
+                _increase(self.graph, tree, u, v)
+
+    def remove_edge(self, u, v):
+        '''Remove a aresta (u, v), reparando as árvores.'''
+        if not self.graph.has_edge(u, v):
+            raise ValueError(f"Edge {u} -> {v} not found")
+        validated = validator.is_validated(self.graph)
+        self.graph.remove_edge(u, v)
+        if validated and self.graph.succ[u]:
+            # u ainda tem arestas, então o grafo não ficou vazio
+            validator.mark_validated(self.graph)
+        for tree in self.trees.values():
+            _increase(self.graph, tree, u, v)
+
+    def apply(self, updates=(), removals=()) -> int:
+        '''
+        Aplica remoções e depois inserções/alterações, na ordem dada.
+        Retorna o número de alterações aplicadas.
+        '''
+        count = 0
+        for u, v in removals:
+            self.remove_edge(u, v)
+            count += 1
+        for u, v, weight in updates:
+            self.set_edge(u, v, weight)
+            count += 1
+        return count
+
+    def apply_delta(self, path: str) -> int:
+        '''Lê um arquivo delta (ver read_delta) e aplica as alterações.'''
+        updates, removals = read_delta(path)
+        return self.apply(updates, removals)
+
+
+def _decrease(graph, tree: ShortestPathTree, u, v, weight):
+    '''A aresta (u, v) ficou mais curta (ou é nova): propaga a melhora a partir de v.'''
+    dist, pred = tree.dist, tree.pred
+    if u not in dist or dist[u] + weight >= dist.get(v, _INF):
+        return
+    dist[v] = dist[u] + weight
+    pred[v] = u
+    adj = graph._adj # pylint: disable=protected-access
+    queue = [(dist[v], v)]
+    while queue:
+        curr_dist, curr_node = heapq.heappop(queue)
+        if curr_dist > dist[curr_node]:
+            continue
+        for neighbor, edge in adj[curr_node].items():
+            new_dist = curr_dist + edge.get("weight", 1)
+            if new_dist < dist.get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                heapq.heappush(queue, (new_dist, neighbor))
+
+
+def _increase(graph, tree: ShortestPathTree, u, v):
+    '''
+    A aresta (u, v) ficou mais longa ou foi removida (o grafo já está alterado).
+    Recalcula apenas a subárvore de v, se (u, v) for aresta da árvore.
+    '''
+    dist, pred = tree.dist, tree.pred
+    if v not in pred or pred[v] != u:
+        return
+
+    adj = graph._adj # pylint: disable=protected-access
+    # nós cujo caminho mínimo passa por v: a subárvore de v na árvore de antecessores
+    affected = {v}
+    stack = [v]
+    while stack:
+        node = stack.pop()
+        for child in adj[node]:
+            if child not in affected and pred.get(child) == node:
+                affected.add(child)
+                stack.append(child)
+    for node in affected:
+        del dist[node]
+        del pred[node]
+
+    # estimativa inicial de cada nó afetado pelos antecessores fora da subárvore
+    in_edges = graph._pred # pylint: disable=protected-access
+    queue = []
+    for node in affected:
+        best, best_pred = _INF, None
+        for parent, edge in in_edges[node].items():
+            if parent not in affected and parent in dist:
+                candidate = dist[parent] + edge.get("weight", 1)
+                if candidate < best:
+                    best, best_pred = candidate, parent
+        if best_pred is not None:
+            dist[node] = best
+            pred[node] = best_pred
+            queue.append((best, node))
+    heapq.heapify(queue)
+
+    # dijkstra restrito à subárvore: as distâncias de fora não mudam quando pesos aumentam
+    while queue:
+        curr_dist, curr_node = heapq.heappop(queue)
+        if curr_dist > dist[curr_node]:
+            continue
+        for neighbor, edge in adj[curr_node].items():
+            if neighbor not in affected:
+                continue
+            new_dist = curr_dist + edge.get("weight", 1)
+            if new_dist < dist.get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                heapq.heappush(queue, (new_dist, neighbor))
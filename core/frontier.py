@@ -0,0 +1,312 @@
+#coding: utf-8
+
+'''
+Filas de prioridade para a fronteira do dijkstra.
+
+Todas têm a mesma interface: push(node, priority) insere o nó ou diminui a
+sua prioridade (retorna True se a prioridade melhorou), pop() remove e
+retorna (priority, node) com a menor prioridade, e len()/bool() dizem se
+ainda há nós na fila.
+
+- LazyHeap: heapq com remoção preguiçosa (entradas duplicadas são ignoradas no pop).
+- IndexedHeap: heap binário com índice de posições e decrease-key, sem duplicatas.
+- BucketQueue: fila de baldes circular (algoritmo de Dial), para pesos inteiros
+  pequenos; push e pop em O(1) amortizado mais a varredura dos baldes vazios.
+- PairingHeap: pairing heap com decrease-key por corte de subárvore.
+'''
+
+import heapq
+
+_INF = float('inf')
+
+
+class LazyHeap:
+    '''heapq com entradas duplicadas; o pop descarta as que ficaram velhas.'''
+
+    def __init__(self):
+        self._heap = []
+        self._best = {}     # nó -> prioridade atual
+
+    def __len__(self):
+        return len(self._best)
+
+    def push(self, node, priority) -> bool:
+        if priority >= self._best.get(node, _INF):
+            return False
+        self._best[node] = priority
+        heapq.heappush(self._heap, (priority, node))
+        return True
+
+    def pop(self) -> tuple:
+        best = self._best
+        while True:
+            priority, node = heapq.heappop(self._heap)
+            if best.get(node) == priority:
+                del best[node]
+                return priority, node
+
+
+class IndexedHeap:
+    '''Heap binário com a posição de cada nó, para decrease-key sem duplicatas.'''
+
+    def __init__(self):
+        self._heap = []     # nós
+        self._priority = {} # nó -> prioridade
+        self._position = {} # nó -> índice em _heap
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, node, priority) -> bool:
+        position = self._position.get(node)
+        if position is None:
+            position = len(self._heap)
+            self._heap.append(node)
+            self._position[node] = position
+        elif priority >= self._priority[node]:
+            return False
+        self._priority[node] = priority
+        self._sift_up(position)
+        return True
+
+    def pop(self) -> tuple:
+        heap = self._heap
+        node = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._position[last] = 0
+            self._sift_down(0)
+        del self._position[node]
+        return self._priority.pop(node), node
+
+    def _sift_up(self, position):
+        heap, priority, index = self._heap, self._priority, self._position
+        node = heap[position]
+        key = priority[node]
+        while position > 0:
+            parent = (position - 1) >> 1
+            parent_node = heap[parent]
+            if priority[parent_node] <= key:
+                break
+            heap[position] = parent_node
+            index[parent_node] = position
+            position = parent
+        heap[position] = node
+        index[node] = position
+
+    def _sift_down(self, position):
+        heap, priority, index = self._heap, self._priority, self._position
+        size = len(heap)
+        node = heap[position]
+        key = priority[node]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and priority[heap[child + 1]] < priority[heap[child]]:
+                child += 1
+            child_node = heap[child]
+            if priority[child_node] >= key:
+                break
+            heap[position] = child_node
+            index[child_node] = position
+            position = child
+        heap[position] = node
+        index[node] = position
+
+
+class BucketQueue:
+    '''
+    Fila de Dial: max_weight + 1 baldes circulares indexados por prioridade.
+    Exige prioridades inteiras (ou floats com valor inteiro) e que, como no
+    dijkstra com pesos entre 0 e max_weight, toda prioridade inserida fique
+    entre a última removida e ela + max_weight.
+    '''
+
+    def __init__(self, max_weight: int):
+        self._size = int(max_weight) + 1
+        self._buckets = [None] * self._size     # cada balde é criado no primeiro push
+        self._priority = {}  # nó -> prioridade atual; entradas velhas ficam nos baldes
+        self._current = 0
+
+    def __len__(self):
+        return len(self._priority)
+
+    def push(self, node, priority) -> bool:
+        if priority >= self._priority.get(node, _INF):
+            return False
+        self._priority[node] = priority
+        slot = int(priority) % self._size
+        if self._buckets[slot] is None:
+            self._buckets[slot] = [node]
+        else:
+            self._buckets[slot].append(node)
+        return True
+
+    def pop(self) -> tuple:
+        if not self._priority:
+            raise IndexError('pop from an empty queue')
+        priorities, buckets, size = self._priority, self._buckets, self._size
+        current = self._current
+        while True:
+            bucket = buckets[current % size]
+            while bucket:
+                node = bucket.pop()
+                priority = priorities.get(node)
+                if priority is not None and int(priority) == current:
+                    del priorities[node]
+                    self._current = current
+                    return priority, node
+            current += 1
+
+
+class _PairingNode:
+    __slots__ = ('priority', 'item', 'child', 'sibling', 'prev')
+
+    def __init__(self, priority, item):
+        self.priority = priority
+        self.item = item
+        self.child = None
+        self.sibling = None
+        self.prev = None    # pai, se for o primeiro filho; senão o irmão anterior
+
+
+def _meld(a: _PairingNode, b: _PairingNode) -> _PairingNode:
+    if b.priority < a.priority:
+        a, b = b, a
+    b.prev = a
+    b.sibling = a.child
+    if a.child is not None:
+        a.child.prev = b
+    a.child = b
+    a.sibling = a.prev = None
+    return a
+
+
+class PairingHeap:
+    '''Pairing heap com decrease-key (corta a subárvore do nó e a junta à raiz).'''
+
+    def __init__(self):
+        self._root = None
+        self._nodes = {}    # nó -> _PairingNode
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def push(self, node, priority) -> bool:
+        handle = self._nodes.get(node)
+        if handle is None:
+            handle = self._nodes[node] = _PairingNode(priority, node)
+            self._root = handle if self._root is None else _meld(self._root, handle)
+            return True
+        if priority >= handle.priority:
+            return False
+        handle.priority = priority
+        if handle is not self._root:
+            # corta a subárvore de handle e a junta de novo à raiz
+            if handle.prev.child is handle:
+                handle.prev.child = handle.sibling
+            else:
+                handle.prev.sibling = handle.sibling
+            if handle.sibling is not None:
+                handle.sibling.prev = handle.prev
+            handle.sibling = handle.prev = None
+            self._root = _meld(self._root, handle)
+        return True
+
+    def pop(self) -> tuple:
+        root = self._root
+        if root is None:
+            raise IndexError('pop from an empty queue')
+        del self._nodes[root.item]
+
+        children = []
+        child = root.child
+        while child is not None:
+            following = child.sibling
+            child.sibling = child.prev = None
+            children.append(child)
+            child = following
+        # duas passadas: junta aos pares da esquerda para a direita, depois da direita
+        pairs = [_meld(children[i], children[i + 1]) if i + 1 < len(children) else children[i]
+                 for i in range(0, len(children), 2)]
+        merged = None
+        for heap in reversed(pairs):
+            merged = heap if merged is None else _meld(heap, merged)
+        self._root = merged
+        return root.priority, root.item
+
+
+FRONTIERS = {
+    'heap': LazyHeap,
+    'indexed': IndexedHeap,
+    'dial': BucketQueue,
+    'pairing': PairingHeap,
+}
+
+
+def make_frontier(name: str, max_weight=None):
+    '''Cria a fila de nome name (ver FRONTIERS); 'dial' precisa de max_weight.'''
+    if name not in FRONTIERS:
+        raise ValueError(f"Frontier must be one of {', '.join(FRONTIERS)}")
+    if name == 'dial':
+        if max_weight is None:
+            raise ValueError("The dial frontier needs the maximum edge weight")
+        return BucketQueue(max_weight)
+    return FRONTIERS[name]()
+
+
+def edge_profile(graph) -> tuple[bool, float, int]:
+    '''
+    Retorna (inteiros, maior peso, arestas): se todos os pesos têm valor
+    inteiro, o maior deles e o número de arestas. Percorre as arestas uma vez
+    por versão do grafo; o resultado fica guardado no grafo enquanto ele não
+    muda (ver core.tracked_graph).
+    '''
+    version = getattr(graph, 'version', None)
+    cached = getattr(graph, 'edge_profile_cache', None)
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    if hasattr(graph, 'arrays'):
+        weights = graph.arrays()[2]     # CSRGraph
+    else:
+        weights = (w for _, _, w in graph.edges(data='weight', default=1))
+    integer, max_weight, edges = True, 0, 0
+    for w in weights:
+        edges += 1
+        if w > max_weight:
+            max_weight = w
+        if integer and not float(w).is_integer():
+            integer = False
+    profile = (integer, max_weight, edges)
+    if version is not None:
+        graph.edge_profile_cache = (version, profile)
+    return profile
+
+
+def shortest_path(successors, start, end, frontier) -> tuple[float|None, list[str]]:
+    '''
+    Dijkstra de start até end usando a fila frontier (vazia).
+    successors(u) retorna pares (vizinho, peso), como em core.adjacency.
+    Retorna (distância, caminho) ou (float('inf'), None) se não houver caminho.
+    '''
+    pred = {start: None}
+    settled = set()
+    frontier.push(start, 0)
+    while frontier:
+        curr_dist, curr_node = frontier.pop()
+        if curr_node == end:
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+        settled.add(curr_node)
+        for neighbor, weight in successors(curr_node):
+            if neighbor not in settled and frontier.push(neighbor, curr_dist + weight):
+                pred[neighbor] = curr_node
+    return _INF, None
@@ -0,0 +1,266 @@
+#coding: utf-8
+
+'''
+Formato binário pré-compilado do grafo, aberto com mmap.
+
+Layout (little-endian, seções alinhadas em 8 bytes):
+    cabeçalho   magic, versão, n (nós), m (arestas), tamanho da tabela de nomes
+    name_offsets  int64[n + 1]  posição de cada nome na tabela de nomes
+    sorted_ids    int64[n]      ids ordenados pelos bytes do nome (busca binária)
+    offsets       int64[n + 1]  offsets CSR
+    targets       int64[m]      destino de cada aresta
+    weights       float64[m]    peso de cada aresta
+    names         bytes         nomes codificados em JSON (utf-8), concatenados
+'''
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from core.csr_graph import CSRGraph
+from util import validator
+
+MAGIC = b'PIAGRAPH'
+VERSION = 1
+SUFFIX = '.graph'
+_HEADER = struct.Struct('<8sIIQQQ')
+
+
+def compiled_path(path: str) -> str:
+    '''
+    Caminho padrão do arquivo compilado de um JSON: data/dataset.json -> data/dataset.graph
+    '''
+    return os.path.splitext(path)[0] + SUFFIX
+
+
+def is_graph_file(path: str) -> bool:
+    '''
+    Verifica se o arquivo existe e começa com o magic do formato compilado.
+    '''
+    try:
+        with open(path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def find_compiled(path: str) -> str | None:
+    '''
+    Retorna o arquivo compilado ao lado do JSON se ele existir e não estiver
+    mais antigo que o JSON; caso contrário retorna None.
+    '''
+    compiled = compiled_path(path)
+    if compiled == path or not is_graph_file(compiled):
+        return None
+    try:
+        if os.path.getmtime(compiled) < os.path.getmtime(path):
+            return None
+    except OSError:
+        return None
+    return compiled
+
+
+def compile_graph(path: str, out_path: str | None = None) -> str:
+    '''
+    Valida o JSON de arestas e grava o grafo no formato binário.
+    Retorna o caminho do arquivo gerado.
+    '''
+    graph = CSRGraph.from_edges(validator.iter_valid_edges(path))
+    out_path = out_path or compiled_path(path)
+    write_graph(graph, out_path)
+    return out_path
+
+
+def _encode(name) -> bytes:
+    return json.dumps(name, ensure_ascii=False).encode('utf-8')
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def _as_array(values, typecode: str) -> array:
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    return array(typecode, values)
+
+
+def _write_array(file, values: array):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(file)
+
+
+def write_graph(graph: CSRGraph, out_path: str):
+    '''
+    Grava um CSRGraph no formato binário. A escrita é feita em um arquivo
+    temporário e movida para out_path ao final.
+    '''
+    offsets, targets, weights = (_as_array(values, typecode)
+                                 for values, typecode in zip(graph.arrays(), 'qqd'))
+
+    def write_edges(file):
+        _write_array(file, targets)
+        _write_array(file, weights)
+
+    write_parts(out_path, [graph.node_name(i) for i in range(graph.number_of_nodes())],
+                offsets, len(targets), write_edges)
+
+
+def write_parts(out_path: str, names: list, offsets: array, m: int, write_edges):
+    '''
+    Grava o arquivo a partir das partes: nomes na ordem dos ids, offsets CSR e
+    o número de arestas m. write_edges(file) escreve os targets (int64) e os
+    pesos (float64) das m arestas, em little-endian, na posição certa do
+    arquivo; assim as arestas não precisam estar em memória.
+    '''
+    n = len(names)
+    encoded = [_encode(name) for name in names]
+    name_offsets = array('q', [0])
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+    sorted_ids = array('q', sorted(range(n), key=encoded.__getitem__))
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, n, m, name_offsets[-1]))
+        for values in (name_offsets, sorted_ids, _as_array(offsets, 'q')):
+            _write_array(file, values)
+        write_edges(file)
+        for name in encoded:
+            file.write(name)
+        file.write(b'\0' * _pad(name_offsets[-1]))
+    os.replace(tmp_path, out_path)
+
+
+class _NameTable:
+    '''Sequência id -> nome decodificada sob demanda a partir do arquivo.'''
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def raw(self, i: int) -> bytes:
+        '''Bytes do nome de id i.'''
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return json.loads(self.raw(i))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class _NameIndex:
+    '''Mapeamento nome -> id por busca binária sobre os ids ordenados.'''
+
+    def __init__(self, names: _NameTable, sorted_ids):
+        self._names = names
+        self._sorted_ids = sorted_ids
+
+    def get(self, name, default=None):
+        '''Retorna o id do nome ou default.'''
+        try:
+            key = _encode(name)
+        except (TypeError, ValueError):
+            return default
+        sorted_ids, raw = self._sorted_ids, self._names.raw
+        pos = bisect.bisect_left(range(len(sorted_ids)), key, key=lambda k: raw(sorted_ids[k]))
+        if pos < len(sorted_ids) and raw(sorted_ids[pos]) == key:
+            return sorted_ids[pos]
+        return default
+
+    def __getitem__(self, name) -> int:
+        node_id = self.get(name)
+        if node_id is None:
+            raise KeyError(name)
+        return node_id
+
+    def __contains__(self, name) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids)
+
+
+def read_header(header: bytes, path: str, size: int) -> tuple[int, int, int]:
+    '''
+    Confere o cabeçalho de um arquivo de size bytes e retorna
+    (n, m, tamanho dos nomes). Lança ValueError se não for um grafo compilado.
+    '''
+    if len(header) < _HEADER.size:
+        raise ValueError(f'{path} is not a compiled graph file')
+    magic, version, _, n, m, names_size = _HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a compiled graph file')
+    if version != VERSION:
+        raise ValueError(f'Unsupported graph file version {version} (expected {VERSION})')
+    if size < _HEADER.size + 8 * (3 * n + 2 + 2 * m) + names_size:
+        raise ValueError(f'{path} is truncated')
+    return n, m, names_size
+
+
+def sections(n: int, m: int) -> tuple[list[tuple[str, int, int]], int]:
+    '''
+    Retorna ([(typecode, posição no arquivo, quantidade)] de name_offsets,
+    sorted_ids, offsets, targets e weights, posição da tabela de nomes).
+    '''
+    layout = []
+    pos = _HEADER.size
+    for typecode, count in (('q', n + 1), ('q', n), ('q', n + 1), ('q', m), ('d', m)):
+        layout.append((typecode, pos, count))
+        pos += 8 * count
+    return layout, pos
+
+
+def name_table(blob, name_offsets, sorted_ids) -> tuple[_NameTable, _NameIndex]:
+    '''
+    Sequência id -> nome e mapeamento nome -> id sobre as seções do arquivo
+    (qualquer sequência indexável; blob precisa aceitar fatias).
+    '''
+    names = _NameTable(blob, name_offsets)
+    return names, _NameIndex(names, sorted_ids)
+
+
+def load_graph(path: str) -> CSRGraph:
+    '''
+    Abre um grafo compilado com mmap. Nada é copiado nem decodificado na
+    abertura, então o tempo não depende do tamanho do grafo, e vários
+    processos que abrem o mesmo arquivo compartilham o page cache.
+    '''
+    with open(path, 'rb') as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:  # arquivo vazio
+            raise ValueError(f'{path} is not a compiled graph file') from exc
+
+    view = memoryview(buffer)
+    n, m, names_size = read_header(view[:_HEADER.size], path, len(view))
+
+    arrays = []
+    layout, names_pos = sections(n, m)
+    for typecode, pos, count in layout:
+        section = view[pos:pos + 8 * count]
+        if sys.byteorder == 'little':
+            section = section.cast(typecode)
+        else:
+            section = array(typecode, section.tobytes())
+            section.byteswap()
+        arrays.append(section)
+    name_offsets, sorted_ids, offsets, targets, weights = arrays
+
+    names, index = name_table(view[names_pos:names_pos + names_size], name_offsets, sorted_ids)
+    return CSRGraph(names, offsets, targets, weights, index)
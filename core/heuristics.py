@@ -0,0 +1,88 @@
+"""
+Heurísticas admissíveis para o A* (core.astar).
+
+- great_circle: distância em linha reta sobre a esfera terrestre, a partir das
+  coordenadas lat/lon dos nós. Admissível quando os pesos são distâncias
+  rodoviárias em km (nenhuma estrada é mais curta que a linha reta).
+- LandmarkHeuristic (ALT): limites inferiores pela desigualdade triangular,
+  usando distâncias pré-calculadas de/para alguns nós de referência (landmarks).
+  As tabelas ficam em memória; para gravá-las em disco e reabri-las com mmap,
+  ver core.landmarks.
+"""
+#coding: utf-8
+import math
+import random
+
+import networkx as nx
+from core import adjacency
+from core.dijkstra import dijkstra_all
+
+EARTH_RADIUS_KM = 6371.0
+
+def node_coordinates(graph) -> dict:
+    """
+    Retorna o dicionário nó -> (lat, lon) dos nós que têm coordenadas.
+    """
+    if isinstance(graph, nx.Graph):
+        return {node: (data["lat"], data["lon"]) for node, data in graph.nodes(data=True)
+                if "lat" in data and "lon" in data}
+    return dict(getattr(graph, "coordinates", {}))
+
+def haversine(coord_a: tuple, coord_b: tuple, radius: float = EARTH_RADIUS_KM) -> float:
+    """
+    Distância de grande círculo entre dois pontos (lat, lon) em graus.
+    """
+    lat_a, lon_a = map(math.radians, coord_a)
+    lat_b, lon_b = map(math.radians, coord_b)
+    h = (math.sin((lat_b - lat_a) / 2) ** 2
+         + math.cos(lat_a) * math.cos(lat_b) * math.sin((lon_b - lon_a) / 2) ** 2)
+    return 2 * radius * math.asin(min(1.0, math.sqrt(h)))
+
+def great_circle(graph, scale: float = 1.0):
+    """
+    Cria a heurística de grande círculo para o grafo.
+    scale converte km para a unidade dos pesos (1.0 quando os pesos estão em km).
+    Nós sem coordenadas recebem estimativa 0, o que mantém a heurística admissível.
+    """
+    coordinates = node_coordinates(graph)
+    radius = EARTH_RADIUS_KM * scale
+
+    def heuristic(node, target) -> float:
+        coord_a = coordinates.get(node)
+        coord_b = coordinates.get(target)
+        if coord_a is None or coord_b is None:
+            return 0
+        return haversine(coord_a, coord_b, radius)
+
+    return heuristic
+
+class LandmarkHeuristic:
+    """
+    Heurística ALT. Para cada landmark L guarda d(L, v) (busca nas arestas de saída)
+    e d(v, L) (busca nas arestas de entrada). Pela desigualdade triangular,
+        d(u, t) >= d(L, t) - d(L, u)   e   d(u, t) >= d(u, L) - d(t, L).
+    As tabelas são calculadas uma vez por grafo, no construtor.
+    """
+
+    def __init__(self, graph, landmarks=None, count: int = 4, seed: int = 0):
+        if landmarks is None:
+            nodes = list(graph.nodes())
+            landmarks = random.Random(seed).sample(nodes, min(count, len(nodes)))
+        self.landmarks = list(landmarks)
+        reverse = adjacency.reverse(graph)
+        self.forward = [dijkstra_all(graph, landmark).dist for landmark in self.landmarks]
+        self.backward = [dijkstra_all(reverse, landmark).dist for landmark in self.landmarks]
+
+    def __call__(self, node, target) -> float:
+        best = 0
+        for from_landmark in self.forward:
+            d_target = from_landmark.get(target)
+            d_node = from_landmark.get(node)
+            if d_target is not None and d_node is not None and d_target - d_node > best:
+                best = d_target - d_node
+        for to_landmark in self.backward:
+            d_node = to_landmark.get(node)
+            d_target = to_landmark.get(target)
+            if d_node is not None and d_target is not None and d_node - d_target > best:
+                best = d_node - d_target
+        return best
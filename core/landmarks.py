@@ -0,0 +1,328 @@
+#coding: utf-8
+
+'''
+Tabelas de landmarks (ALT) gravadas em disco, para a busca dirigida
+dijkstra(..., landmarks=tabela).
+
+Pré-processamento (LandmarkTable.build):
+    escolhe count landmarks, um por vez, por um de dois métodos:
+    - 'farthest': o nó mais distante dos landmarks já escolhidos;
+    - 'avoid' (Goldberg e Werneck): a partir de uma raiz aleatória r, cada nó v
+      recebe o peso d(r, v) - limite inferior atual de d(r, v); desce-se pela
+      árvore de caminhos mínimos de r sempre para a subárvore (sem landmark)
+      de maior peso total, e a folha alcançada vira o landmark. Os landmarks
+      ficam onde os limites atuais são piores.
+    Para cada landmark L guarda d(L, v) (tabela forward) e d(v, L) (tabela
+    backward) para todos os nós, em float32, na ordem de ids do grafo
+    (a ordem de primeira aparição do build_graph, igual no nx e no CSR).
+
+Limites inferiores, pela desigualdade triangular:
+    d(u, t) >= d(L, t) - d(L, u)   e   d(u, t) >= d(u, L) - d(t, L)
+Quando o float32 arredonda as distâncias, todo limite é reduzido de slack
+(duas vezes o maior erro de arredondamento), então continua admissível; com
+pesos inteiros e distâncias até 2^24 o float32 é exato e slack é zero.
+
+Arquivo (save/load), little-endian:
+    cabeçalho   magic, versão, k (landmarks), n (nós), tamanho dos nomes, slack
+    ids         int64[k]       id de cada landmark no grafo
+    forward     float32[k * n] d(L, v), uma linha por landmark (inf se inalcançável)
+    backward    float32[k * n] d(v, L)
+    names       nomes dos landmarks, em uma lista JSON (utf-8)
+load abre o arquivo com mmap: nada é lido na abertura.
+'''
+
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import deque
+
+from core import adjacency
+from core.dijkstra import dijkstra_all
+
+MAGIC = b'PIALANDM'
+VERSION = 1
+SUFFIX = '.landmarks'
+METHODS = ('farthest', 'avoid')
+COUNT = 8
+_HEADER = struct.Struct('<8sIIQQQd')
+_INF = float('inf')
+
+
+def landmarks_path(path: str) -> str:
+    '''
+    Caminho padrão das tabelas de um grafo: data/dataset.json -> data/dataset.landmarks
+    '''
+    return os.path.splitext(path)[0] + SUFFIX
+
+
+def find_landmarks(path: str) -> str | None:
+    '''
+    Retorna o arquivo de tabelas ao lado do grafo path se ele existir e não
+    estiver mais antigo que o grafo; caso contrário retorna None.
+    '''
+    tables = landmarks_path(path)
+    try:
+        if tables == path or os.path.getmtime(tables) < os.path.getmtime(path):
+            return None
+    except OSError:
+        return None
+    return tables
+
+
+class LandmarkTable:
+    '''
+    Tabelas forward/backward de alguns landmarks, ligadas ao grafo para o qual
+    foram calculadas (ou com o qual foram abertas). Use com
+    dijkstra(graph, start, end, landmarks=tabela).
+    '''
+
+    def __init__(self, graph, landmarks: list, ids, forward, backward, slack: float = 0.0):
+        self.landmarks = list(landmarks)
+        self.ids = list(ids)
+        self.forward = forward      # uma sequência de float32 (n posições) por landmark
+        self.backward = backward
+        self.slack = slack
+        self._graph = graph
+        self._version = getattr(graph, 'version', None)
+        self._node_id = None        # nome -> id, montado na primeira consulta
+        self._checked = False       # landmarks conferidos com os ids do grafo
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def node_ids(self):
+        '''
+        Retorna a função nome -> id do grafo. No CSRGraph é a do próprio grafo;
+        no nx.DiGraph o dicionário é montado na primeira chamada.
+        '''
+        if self._node_id is None:
+            if hasattr(self._graph, 'arrays'):
+                self._node_id = self._graph.node_id
+            else:
+                index = {name: i for i, name in enumerate(self._graph.nodes())}
+                self._node_id = index.__getitem__
+        return self._node_id
+
+    def check(self, graph):
+        '''
+        Lança ValueError se graph não for o grafo (e a versão) das tabelas, ou
+        se os ids dos landmarks gravados não forem os do grafo.
+        '''
+        if graph is not self._graph or getattr(graph, 'version', None) != self._version:
+            raise ValueError("The landmark tables belong to another graph or to an "
+                             "older version of it")
+        if not self._checked:
+            node_id = self.node_ids()
+            for name, landmark in zip(self.landmarks, self.ids):
+                try:
+                    if node_id(name) != landmark:
+                        raise KeyError(name)
+                except KeyError as exc:
+                    raise ValueError("The landmark tables were built for another graph") from exc
+            self._checked = True
+
+    def potential(self, target: int):
+        '''
+        Retorna a função id -> limite inferior da distância até o nó de id
+        target (float('inf') quando as tabelas mostram que não há caminho).
+        '''
+        rows = [(fwd, fwd[target], bwd, bwd[target])
+                for fwd, bwd in zip(self.forward, self.backward)]
+        slack = self.slack
+
+        def bound(node: int) -> float:
+            best = 0.0
+            # com inf nas duas parcelas a diferença é nan, e as comparações a ignoram
+            for fwd, fwd_target, bwd, bwd_target in rows:
+                value = fwd_target - fwd[node]
+                if value > best:
+                    best = value
+                value = bwd[node] - bwd_target
+                if value > best:
+                    best = value
+            return best - slack if best > slack else 0.0
+
+        return bound
+
+    # pré-processamento
+
+    @classmethod
+    def build(cls, graph, count: int = COUNT, method: str = 'farthest', seed: int = 0):
+        '''
+        Escolhe count landmarks do grafo pelo método dado ('avoid' ou
+        'farthest') e calcula as suas tabelas.
+        '''
+        if method not in METHODS:
+            raise ValueError(f"Landmark method must be one of {', '.join(METHODS)}")
+        if count < 1:
+            raise ValueError("The number of landmarks must be at least 1")
+        names = list(graph.nodes())
+        if not names:
+            raise ValueError("Graph can't be empty")
+        index = {name: i for i, name in enumerate(names)}
+        reverse = adjacency.reverse(graph)
+        rng = random.Random(seed)
+        ids, forward, backward = [], [], []
+        closest = array('d', [_INF]) * len(names)   # usado pelo 'farthest'
+        error = 0.0                                 # maior erro de arredondamento do float32
+
+        while len(ids) < min(count, len(names)):
+            if method == 'farthest':
+                landmark = _farthest(graph, names, index, ids, closest, rng)
+            else:
+                landmark = _avoid(graph, names, index, ids, forward, backward, rng)
+            ids.append(landmark)
+            for rows, source in ((forward, graph), (backward, reverse)):
+                row, row_error = _table(dijkstra_all(source, names[landmark]), index)
+                rows.append(row)
+                error = max(error, row_error)
+            for i, value in enumerate(forward[-1]):
+                if value < closest[i]:
+                    closest[i] = value
+
+        # cada limite é a diferença de dois valores arredondados
+        table = cls(graph, [names[i] for i in ids], ids, forward, backward, 2 * error)
+        table._checked = True
+        return table
+
+    # arquivo
+
+    def save(self, path: str):
+        '''Grava as tabelas no formato binário descrito no módulo.'''
+        encoded = json.dumps(self.landmarks, ensure_ascii=False).encode('utf-8')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, 0, len(self.ids),
+                                    len(self.forward[0]), len(encoded), self.slack))
+            for values in [array('q', self.ids), *self.forward, *self.backward]:
+                values = array(values.typecode if isinstance(values, array) else 'f', values)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                values.tofile(file)
+            file.write(encoded)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, graph):
+        '''
+        Abre com mmap as tabelas gravadas por save, para uso com graph (o mesmo
+        grafo, com os mesmos ids). Lança ValueError se o arquivo não for de
+        tabelas ou se o número de nós não for o do grafo; os landmarks são
+        conferidos com o grafo na primeira consulta (check).
+        '''
+        with open(path, 'rb') as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # arquivo vazio
+                raise ValueError(f'{path} is not a landmarks file') from exc
+
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size or bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f'{path} is not a landmarks file')
+        _, version, _, k, n, names_size, slack = _HEADER.unpack_from(view)
+        if version != VERSION:
+            raise ValueError(f'Unsupported landmarks file version {version} (expected {VERSION})')
+        pos = _HEADER.size
+        if len(view) < pos + 8 * k + 8 * k * n + names_size:
+            raise ValueError(f'{path} is truncated')
+
+        def section(typecode, size, count):
+            values = view[pos:pos + size * count]
+            if sys.byteorder == 'little':
+                return values.cast(typecode)
+            values = array(typecode, values.tobytes())
+            values.byteswap()
+            return values
+
+        ids = section('q', 8, k)
+        pos += 8 * k
+        rows = []
+        for _ in range(2 * k):
+            rows.append(section('f', 4, n))
+            pos += 4 * n
+        names = json.loads(bytes(view[pos:pos + names_size]))
+
+        if graph.number_of_nodes() != n:
+            raise ValueError(f'{path} was built for a graph with {n} nodes')
+        return cls(graph, names, ids, rows[:k], rows[k:], slack)
+
+
+def _table(tree, index: dict) -> tuple[array, float]:
+    '''
+    Distâncias de uma árvore em um array float32 na ordem de ids (inf se
+    inalcançável) e o maior erro de arredondamento para float32.
+    '''
+    row = array('f', [_INF]) * len(index)
+    error = 0.0
+    for node, distance in tree.dist.items():
+        i = index[node]
+        row[i] = distance
+        if row[i] != distance:
+            error = max(error, abs(row[i] - distance))
+    return row, error
+
+
+def _farthest(graph, names: list, index: dict, ids: list, closest: array, rng) -> int:
+    '''
+    Nó mais distante (pelas arestas de saída) dos landmarks escolhidos entre
+    os que eles alcançam; o primeiro é o mais distante de um nó aleatório.
+    '''
+    if not ids:
+        dist = dijkstra_all(graph, rng.choice(names)).dist
+        return index[max(dist, key=dist.get)]
+    chosen = set(ids)
+    candidates = [i for i in range(len(names)) if i not in chosen and closest[i] != _INF]
+    if not candidates:
+        return rng.choice([i for i in range(len(names)) if i not in chosen])
+    return max(candidates, key=closest.__getitem__)
+
+
+def _avoid(graph, names: list, index: dict, ids: list, forward: list, backward: list,
+           rng) -> int:
+    '''Próximo landmark pelo método avoid (ver o docstring do módulo).'''
+    root = rng.choice(names)
+    tree = dijkstra_all(graph, root)
+    root_id = index[root]
+    rows = [(fwd, fwd[root_id], bwd, bwd[root_id]) for fwd, bwd in zip(forward, backward)]
+
+    children = {}
+    for node, parent in tree.pred.items():
+        if parent is not None:
+            children.setdefault(parent, []).append(node)
+    order = [root]
+    queue = deque([root])
+    while queue:
+        for child in children.get(queue.popleft(), ()):
+            order.append(child)
+            queue.append(child)
+
+    landmarks = {names[i] for i in ids}
+    size = {}
+    for node in reversed(order):
+        if node in landmarks or any(size[child] is None for child in children.get(node, ())):
+            size[node] = None   # subárvore com landmark: não é candidata
+            continue
+        node_id = index[node]
+        bound = 0.0
+        for fwd, fwd_root, bwd, bwd_root in rows:
+            bound = max(bound, fwd[node_id] - fwd_root, bwd_root - bwd[node_id])
+        size[node] = (max(tree.dist[node] - bound, 0.0)
+                      + sum(size[child] for child in children.get(node, ())))
+
+    # desce da raiz (mesmo que a sua subárvore tenha landmark) pelas subárvores
+    # sem landmark de maior peso, até uma folha
+    node = root
+    while True:
+        candidates = [child for child in children.get(node, ()) if size[child] is not None]
+        if not candidates:
+            break
+        node = max(candidates, key=size.__getitem__)
+    if size[node] is None:
+        # a raiz é landmark ou não há subárvore livre abaixo dela: um nó livre qualquer
+        chosen = set(ids)
+        return rng.choice([i for i in range(len(names)) if i not in chosen])
+    return index[node]
@@ -0,0 +1,328 @@
+#coding: utf-8
+
+'''
+Grafo lido sob demanda do arquivo compilado (core.graph_file), para consultas
+ponto a ponto que tocam só uma pequena região do grafo.
+
+O arquivo compilado já é o índice das arestas por nó de origem: as arestas
+ficam ordenadas por origem (targets/weights) e offsets diz onde começa a lista
+de cada nó. LazyGraph não mapeia nem lê o arquivo inteiro: cada seção é lida
+em páginas de page_size bytes, com os.pread, quando a busca precisa de um
+valor dela. As páginas ficam em um cache LRU de até max_pages páginas,
+compartilhado pelas seções, então a memória usada não depende do tamanho do
+grafo. Com mmap (graph_file.load_graph) quem decide o que fica em memória é o
+sistema operacional.
+
+Para entradas maiores que a memória, compile_edges grava o arquivo compilado
+sem montar o grafo: as arestas são lidas do JSON em blocos de run_edges,
+cada bloco é ordenado por origem e gravado em um arquivo temporário, e os
+blocos são intercalados (heapq.merge) direto no arquivo final. Só os nomes dos
+nós e os offsets ficam em memória. O resultado é o mesmo de
+graph_file.compile_graph.
+'''
+
+import heapq
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections import OrderedDict, namedtuple
+from itertools import groupby
+from operator import itemgetter
+
+from core import graph_file
+from core.csr_graph import CSRGraph
+from util import validator
+
+PAGE_SIZE = 1 << 16
+MAX_PAGES = 1024        # até 64 MiB de páginas com PAGE_SIZE padrão
+RUN_EDGES = 1 << 18
+_EDGE = struct.Struct('<qqd')
+
+PageCacheInfo = namedtuple('PageCacheInfo', ['hits', 'misses', 'evictions', 'pages', 'bytes'])
+
+
+class _PageCache:
+    '''Cache LRU das páginas lidas do arquivo, de todas as seções.'''
+
+    def __init__(self, fd: int, page_size: int, max_pages: int):
+        self.fd = fd
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages = OrderedDict()     # (seção, página) -> valores da página
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def page(self, section, number: int):
+        '''Página number de section, lida do arquivo se não estiver no cache.'''
+        key = (section.start, number)
+        values = self._pages.get(key)
+        if values is not None:
+            self.hits += 1
+            self._pages.move_to_end(key)
+            return values
+        self.misses += 1
+        values = section.read_page(number)
+        self._pages[key] = values
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+            self.evictions += 1
+        return values
+
+    def info(self) -> PageCacheInfo:
+        '''Contadores e tamanho atual do cache.'''
+        size = sum(len(values) * values.itemsize for values in self._pages.values())
+        return PageCacheInfo(self.hits, self.misses, self.evictions, len(self._pages), size)
+
+    def clear(self):
+        '''Descarta todas as páginas.'''
+        self._pages.clear()
+
+
+class _PagedSection:
+    '''
+    Seção do arquivo (count valores do tipo typecode a partir de start) com a
+    interface de sequência que o CSRGraph e o graph_file usam: len, índice e,
+    nos bytes dos nomes, fatias.
+    '''
+
+    def __init__(self, cache: _PageCache, start: int, typecode: str, count: int):
+        self.start = start
+        self.typecode = typecode
+        self.count = count
+        self._cache = cache
+        self._itemsize = array(typecode).itemsize
+        self._per_page = cache.page_size // self._itemsize
+        # última página usada: leituras seguidas (a lista de arestas de um nó)
+        # não passam pelo LRU; no máximo uma página a mais por seção fica viva
+        self._number = -1
+        self._page = None
+
+    def read_page(self, number: int):
+        '''Lê do arquivo os valores da página number.'''
+        first = number * self._per_page
+        size = min(self._per_page, self.count - first) * self._itemsize
+        data = os.pread(self._cache.fd, size, self.start + first * self._itemsize)
+        if len(data) < size:
+            raise ValueError('The graph file is truncated')
+        if self._itemsize == 1:
+            return memoryview(data)
+        if sys.byteorder == 'little':
+            return memoryview(data).cast(self.typecode)
+        values = array(self.typecode, data)
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._slice(i)
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        number, pos = divmod(i, self._per_page)
+        if number != self._number:
+            self._page = self._cache.page(self, number)
+            self._number = number
+        return self._page[pos]
+
+    def range(self, start: int, stop: int):
+        '''
+        Valores de start a stop: uma fatia da página (sem cópia) quando estão
+        em uma página só; senão um array com as partes.
+        '''
+        number, pos = divmod(start, self._per_page)
+        if pos + stop - start <= self._per_page:
+            if number != self._number:
+                self._page = self._cache.page(self, number)
+                self._number = number
+            return self._page[pos:pos + stop - start]
+        values = array(self.typecode)
+        while start < stop:
+            number, pos = divmod(start, self._per_page)
+            page = self._cache.page(self, number)
+            end = min(stop - start, len(page) - pos)
+            values.extend(page[pos:pos + end])
+            start += end
+        return values
+
+    def _slice(self, key: slice) -> bytes:
+        start, stop, _ = key.indices(self.count)
+        parts = []
+        while start < stop:
+            number, pos = divmod(start, self._per_page)
+            page = self._cache.page(self, number)
+            end = min(stop - start, len(page) - pos)
+            parts.append(page[pos:pos + end])
+            start += end
+        return b''.join(parts)
+
+    def __iter__(self):
+        for number in range((self.count + self._per_page - 1) // self._per_page):
+            yield from self._cache.page(self, number)
+
+
+class LazyGraph(CSRGraph):
+    '''
+    CSRGraph sobre um arquivo compilado lido sob demanda, com cache de até
+    max_pages páginas de page_size bytes. Abrir custa a leitura do cabeçalho;
+    cada consulta lê só as páginas das listas de arestas dos nós que expande
+    (e dos nomes que procura). As buscas do core (dijkstra, astar, landmarks)
+    funcionam sem mudança. O grafo transposto (reverse, usado pela busca
+    bidirecional) é montado em memória inteiro.
+
+    O arquivo é tratado como já validado: compile_edges e
+    graph_file.compile_graph só gravam arestas que passaram pelo validator.
+    Use close() (ou with) para fechar o arquivo.
+    '''
+
+    def __init__(self, path: str, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES):
+        if page_size < 8 or page_size % 8 or max_pages < 1:
+            raise ValueError("The page size must be a positive multiple of 8 and "
+                             "the cache must hold at least one page")
+        self._fd = os.open(path, os.O_RDONLY)
+        try:
+            size = os.fstat(self._fd).st_size
+            n, m, names_size = graph_file.read_header(
+                os.pread(self._fd, PAGE_SIZE, 0), path, size)
+        except ValueError:
+            os.close(self._fd)
+            raise
+        self._cache = _PageCache(self._fd, page_size, max_pages)
+        layout, names_pos = graph_file.sections(n, m)
+        name_offsets, sorted_ids, offsets, targets, weights = (
+            _PagedSection(self._cache, pos, typecode, count) for typecode, pos, count in layout)
+        names, index = graph_file.name_table(_PagedSection(self._cache, names_pos, 'B', names_size),
+                                             name_offsets, sorted_ids)
+        super().__init__(names, offsets, targets, weights, index)
+        validator.mark_validated(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        '''Fecha o arquivo e descarta o cache.'''
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._cache.clear()
+
+    def successor_ids(self, node_id: int) -> tuple:
+        '''(targets, weights) das arestas que saem do nó de id node_id, lidas por página.'''
+        start, stop = self._offsets[node_id], self._offsets[node_id + 1]
+        return self._targets.range(start, stop), self._weights.range(start, stop)
+
+    def cache_info(self) -> PageCacheInfo:
+        '''Acertos, faltas, descartes, páginas e bytes do cache de páginas.'''
+        return self._cache.info()
+
+
+def open_graph(path: str, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES,
+               run_edges: int = RUN_EDGES) -> LazyGraph:
+    '''
+    Abre path (arquivo compilado ou JSON) como LazyGraph. Para um JSON usa o
+    arquivo compilado ao lado dele se estiver atualizado; senão o grava antes
+    com compile_edges.
+    '''
+    if not graph_file.is_graph_file(path):
+        path = graph_file.find_compiled(path) or compile_edges(path, run_edges=run_edges)
+    return LazyGraph(path, page_size, max_pages)
+
+
+def compile_edges(path: str, out_path: str | None = None, run_edges: int = RUN_EDGES) -> str:
+    '''
+    Valida o JSON de arestas e grava o arquivo compilado (o mesmo de
+    graph_file.compile_graph) ordenando as arestas por origem em blocos de
+    run_edges, sem manter todas as arestas em memória. Retorna o caminho gravado.
+    '''
+    if run_edges < 1:
+        raise ValueError("run_edges must be at least 1")
+    out_path = out_path or graph_file.compiled_path(path)
+    index = {}
+    names = []
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(out_path))) as tmp:
+        runs = []
+        run = (array('q'), array('q'), array('d'))     # origens, destinos e pesos do bloco
+        for node, terminal, w in validator.iter_valid_edges(path):
+            u = index.get(node)
+            if u is None:
+                u = index[node] = len(names)
+                names.append(node)
+            v = index.get(terminal)
+            if v is None:
+                v = index[terminal] = len(names)
+                names.append(terminal)
+            run[0].append(u)
+            run[1].append(v)
+            run[2].append(w)
+            if len(run[0]) == run_edges:
+                runs.append(_write_run(tmp, len(runs), run))
+                run = (array('q'), array('q'), array('d'))
+        if run[0]:
+            runs.append(_write_run(tmp, len(runs), run))
+        run = None
+
+        # intercala os blocos direto em arquivos de targets e pesos
+        offsets = array('q', bytes(8 * (len(names) + 1)))
+        targets_path = os.path.join(tmp, 'targets')
+        weights_path = os.path.join(tmp, 'weights')
+        m = 0
+        with open(targets_path, 'wb') as targets_file, open(weights_path, 'wb') as weights_file:
+            # heapq.merge é estável: entre blocos, arestas repetidas ficam na ordem de leitura
+            edges = heapq.merge(*(_read_run(run_path) for run_path in runs), key=itemgetter(0))
+            for u, row_edges in groupby(edges, key=itemgetter(0)):
+                row = {}
+                for _, v, w in row_edges:
+                    row[v] = w  # aresta repetida: primeira posição, último peso
+                _write_array(targets_file, array('q', row.keys()))
+                _write_array(weights_file, array('d', row.values()))
+                m += len(row)
+                offsets[u + 1] = len(row)
+        for u in range(len(names)):
+            offsets[u + 1] += offsets[u]
+
+        def write_edges(file):
+            for part in (targets_path, weights_path):
+                with open(part, 'rb') as source:
+                    shutil.copyfileobj(source, file)
+
+        graph_file.write_parts(out_path, names, offsets, m, write_edges)
+    return out_path
+
+
+def _write_run(directory: str, number: int, run: tuple, chunk: int = 4096) -> str:
+    '''Grava o bloco ordenado por origem (ordenação estável) e retorna o caminho.'''
+    sources, terminals, weights = run
+    order = sorted(range(len(sources)), key=sources.__getitem__)
+    pack = _EDGE.pack
+    run_path = os.path.join(directory, f'run-{number}')
+    with open(run_path, 'wb') as file:
+        for start in range(0, len(order), chunk):
+            file.write(b''.join(pack(sources[k], terminals[k], weights[k])
+                                for k in order[start:start + chunk]))
+    return run_path
+
+
+def _read_run(run_path: str, chunk: int = 4096):
+    '''Arestas (u, v, w) de um bloco, lidas em pedaços de chunk arestas.'''
+    with open(run_path, 'rb') as file:
+        while True:
+            data = file.read(chunk * _EDGE.size)
+            if not data:
+                return
+            yield from _EDGE.iter_unpack(data)
+
+
+def _write_array(file, values: array):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    values.tofile(file)
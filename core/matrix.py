@@ -0,0 +1,135 @@
+#coding: utf-8
+
+'''
+Matriz de distâncias origem-destino (muitos para muitos).
+
+Cada origem faz uma única busca (dijkstra_all com targets), que para assim que
+todos os destinos são fixados. As origens podem ser distribuídas entre processos
+(ProcessPoolExecutor): com o método "fork" os processos herdam o grafo já
+carregado (copy-on-write); passando o caminho de um grafo compilado
+(core.graph_file), cada processo o abre com mmap e todos compartilham o page cache.
+
+O resultado é uma matriz NumPy (quando o NumPy está instalado; senão, lista de
+listas) ou, para pedidos grandes, as linhas são gravadas uma a uma em um arquivo
+.npy, sem manter a matriz inteira em memória.
+'''
+
+import ast
+import multiprocessing
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from core.build_graph import build_graph
+from core.dijkstra import dijkstra_all
+
+try:
+    import numpy as np
+except ImportError: # o NumPy é opcional
+    np = None
+
+# grafo e destinos usados pelos processos do pool (definidos no initializer, em cada processo)
+_WORKER_GRAPH = None
+_WORKER_TARGETS = None
+
+
+def _init_worker(graph, targets):
+    global _WORKER_GRAPH, _WORKER_TARGETS # pylint: disable=global-statement
+    if isinstance(graph, str):
+        graph = build_graph(graph, compact=True)
+    _WORKER_GRAPH = graph
+    _WORKER_TARGETS = targets
+
+
+def _row(graph, source, targets) -> list[float]:
+    tree = dijkstra_all(graph, source, targets)
+    return [tree.distance(target) for target in targets]
+
+
+def _worker_row(source) -> list[float]:
+    return _row(_WORKER_GRAPH, source, _WORKER_TARGETS)
+
+
+def iter_rows(graph, sources, targets, workers: int = 1, chunksize: int = 16):
+    '''
+    Gera, na ordem de sources, a linha de distâncias de cada origem até targets.
+    graph pode ser um grafo do core.build_graph ou o caminho de um arquivo de grafo
+    (JSON ou compilado), que cada processo carrega por conta própria.
+    Destinos inalcançáveis têm distância float('inf').
+    '''
+    targets = list(targets)
+    if workers <= 1:
+        if isinstance(graph, str):
+            graph = build_graph(graph, compact=True)
+        for source in sources:
+            yield _row(graph, source, targets)
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods and not isinstance(graph, str):
+        # com fork os initargs não são serializados: os filhos herdam o grafo
+        # pela memória do processo pai, e cada pool leva o seu próprio grafo
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(graph, targets)) as executor:
+        yield from executor.map(_worker_row, sources, chunksize=chunksize)
+
+
+def distance_matrix(graph, sources, targets, workers: int = 1):
+    '''
+    Matriz len(sources) x len(targets) com as distâncias mais curtas.
+    Retorna um numpy.ndarray de float64 quando o NumPy está disponível,
+    senão uma lista de listas.
+    '''
+    rows = list(iter_rows(graph, sources, targets, workers))
+    if np is not None:
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(targets))
+    return rows
+
+
+def write_distance_matrix(graph, sources, targets, path: str, workers: int = 1) -> str:
+    '''
+    Grava a matriz de distâncias em path no formato .npy (float64, little-endian),
+    uma linha por vez. O arquivo pode ser aberto com numpy.load(path, mmap_mode='r').
+    '''
+    sources = list(sources)
+    targets = list(targets)
+    header = repr({'descr': '<f8', 'fortran_order': False,
+                   'shape': (len(sources), len(targets))})
+    # magic + versão + tamanho do cabeçalho + cabeçalho, alinhado em 64 bytes
+    header += ' ' * (-(10 + len(header) + 1) % 64) + '\n'
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+        for row in iter_rows(graph, sources, targets, workers):
+            values = array('d', row)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            values.tofile(file)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_distance_matrix(path: str) -> list[list[float]]:
+    '''
+    Lê um arquivo gravado por write_distance_matrix sem depender do NumPy.
+    '''
+    with open(path, 'rb') as file:
+        if file.read(8) != b'\x93NUMPY\x01\x00':
+            raise ValueError(f'{path} is not a distance matrix file')
+        (header_size,) = struct.unpack('<H', file.read(2))
+        rows, cols = ast.literal_eval(file.read(header_size).decode('latin1'))['shape']
+        matrix = []
+        for _ in range(rows):
+            values = array('d')
+            values.fromfile(file, cols)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            matrix.append(values.tolist())
+    return matrix
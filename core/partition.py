@@ -0,0 +1,334 @@
+#coding: utf-8
+
+'''
+Particionamento do grafo em células e grafo de overlay, no estilo do
+Customizable Route Planning (CRP), para responder consultas sem ter o grafo
+inteiro na memória de um único processo.
+
+- As células são regiões com até cell_size nós. Com coordenadas em todos os
+  nós, são feitas por bisseção recursiva no eixo mais longo (regiões compactas,
+  com poucas arestas cortadas); sem coordenadas, crescendo regiões por busca em
+  largura.
+- Nós de fronteira são os que têm arestas para (ou de) outra célula.
+- O overlay tem apenas os nós de fronteira: as arestas entre células e, em
+  cada célula, arestas entre nós de fronteira com a distância entre eles
+  dentro da célula (a "clique" da célula). A aresta a -> b é omitida quando o
+  caminho mínimo de a até b passa por outro nó de fronteira c com
+  0 < d(a, c) < d(a, b): a -> c -> b já tem a mesma distância no overlay.
+  Em grafos geométricos isso remove cerca de 2/3 das arestas das cliques.
+
+Uma consulta de s até t precisa só das células de s e de t e do overlay:
+distâncias de s até a fronteira da sua célula, busca no overlay, distâncias da
+fronteira da célula de t até t. Os trechos do overlay dentro de outras células
+são expandidos depois, cada um por uma busca na sua célula.
+
+Arquivos gravados por write_partition em um diretório:
+    cells.json      nós e nós de fronteira de cada célula
+    cell-N.graph    arestas internas da célula N (formato de core.graph_file)
+    overlay.graph   o grafo de overlay (formato de core.graph_file)
+
+CellShard responde pelas células de um shard, abrindo-as sob demanda (mmap);
+o coordenador que combina os shards fica em service.shards.
+'''
+
+import heapq
+import json
+import math
+import os
+from collections import OrderedDict, deque
+from itertools import chain
+
+from core import adjacency, graph_file
+from core.csr_graph import CSRGraph
+from core.dijkstra import ShortestPathTree, dijkstra, dijkstra_all
+from core.heuristics import node_coordinates
+
+CELL_SIZE = 10000
+_INF = float('inf')
+INDEX_FILE = 'cells.json'
+OVERLAY_FILE = 'overlay.graph'
+
+
+def cell_file(directory: str, cell: int) -> str:
+    '''Caminho do arquivo da célula cell.'''
+    return os.path.join(directory, f'cell-{cell}{graph_file.SUFFIX}')
+
+
+def partition_nodes(graph, cell_size: int = CELL_SIZE) -> list[list]:
+    '''
+    Divide os nós do grafo em células de até cell_size nós.
+    Retorna a lista de células, cada uma uma lista de nós.
+    '''
+    if cell_size < 1:
+        raise ValueError("The cell size must be at least 1")
+    nodes = list(graph.nodes())
+    coordinates = node_coordinates(graph)
+    if nodes and len(coordinates) == len(nodes):
+        return _bisect(nodes, coordinates, cell_size)
+    return _grow(graph, nodes, cell_size)
+
+
+def _bisect(nodes: list, coordinates: dict, cell_size: int) -> list[list]:
+    '''Bisseção recursiva pela mediana no eixo (lat ou lon) de maior extensão.'''
+    cells = []
+    stack = [nodes]
+    while stack:
+        part = stack.pop()
+        if len(part) <= cell_size:
+            cells.append(part)
+            continue
+        lats = [coordinates[node][0] for node in part]
+        lons = [coordinates[node][1] for node in part]
+        # um grau de longitude encolhe com o cosseno da latitude
+        lon_scale = math.cos(math.radians((min(lats) + max(lats)) / 2))
+        axis = 0 if max(lats) - min(lats) >= (max(lons) - min(lons)) * lon_scale else 1
+        part.sort(key=lambda node: coordinates[node][axis])
+        middle = len(part) // 2
+        stack.append(part[middle:])
+        stack.append(part[:middle])
+    return cells
+
+
+def _grow(graph, nodes: list, cell_size: int) -> list[list]:
+    '''Regiões crescidas por busca em largura, ignorando o sentido das arestas.'''
+    successors = adjacency.successors(graph)
+    predecessors = adjacency.predecessors(graph)
+    assigned = set()
+    cells = []
+    for seed in nodes:
+        if seed in assigned:
+            continue
+        cell = []
+        queue = deque([seed])
+        assigned.add(seed)
+        while queue and len(cell) < cell_size:
+            node = queue.popleft()
+            cell.append(node)
+            for neighbor, _ in chain(successors(node), predecessors(node)):
+                if neighbor not in assigned:
+                    assigned.add(neighbor)
+                    queue.append(neighbor)
+        assigned.difference_update(queue)   # ficam para as próximas células
+        cells.append(cell)
+    return cells
+
+
+def _tree(graph: CSRGraph, node) -> ShortestPathTree:
+    '''dijkstra_all dentro da célula; uma célula sem arestas só alcança o próprio nó.'''
+    if graph.number_of_edges() == 0:
+        return ShortestPathTree(node, {node: 0}, {node: None})
+    return dijkstra_all(graph, node)
+
+
+def _clique(graph: CSRGraph, members: list):
+    '''
+    Arestas da clique da célula: (a, b, d(a, b)) para cada par de nós de
+    fronteira, exceto quando o caminho mínimo de a até b passa por outro nó de
+    fronteira c com 0 < d(a, c) < d(a, b). Por indução na distância, o
+    overlay continua com as mesmas distâncias entre nós de fronteira.
+    '''
+    boundary = set(members)
+    for source in members:
+        tree = _tree(graph, source)
+        dist, pred = tree.dist, tree.pred
+        # menor distância positiva de um nó de fronteira estritamente entre source e o nó
+        inner = {source: _INF}
+        for target in members:
+            if target == source or target not in dist:
+                continue
+            stack = []
+            node = target
+            while node not in inner:
+                stack.append(node)
+                node = pred[node]
+            while stack:
+                node = stack.pop()
+                parent = pred[node]
+                value = inner[parent]
+                if parent != source and parent in boundary and 0 < dist[parent] < value:
+                    value = dist[parent]
+                inner[node] = value
+            if not inner[target] < dist[target]:
+                yield source, target, dist[target]
+
+
+def write_partition(graph, directory: str, cell_size: int = CELL_SIZE) -> dict:
+    '''
+    Particiona o grafo (nx.DiGraph ou CSRGraph) e grava as células e o overlay
+    em directory. Retorna um resumo com o número de células, de nós de
+    fronteira e de arestas do overlay.
+    '''
+    cells = partition_nodes(graph, cell_size)
+    cell_of = {node: i for i, cell in enumerate(cells) for node in cell}
+    cell_edges = [[] for _ in cells]
+    boundary = [set() for _ in cells]
+    overlay_edges = []
+    for u, v, data in graph.edges(data=True):
+        w = data.get('weight', 1)
+        cell_u, cell_v = cell_of[u], cell_of[v]
+        if cell_u == cell_v:
+            cell_edges[cell_u].append((u, v, w))
+        else:
+            overlay_edges.append((u, v, w))
+            boundary[cell_u].add(u)
+            boundary[cell_v].add(v)
+
+    os.makedirs(directory, exist_ok=True)
+    boundary_lists = []
+    for i, cell in enumerate(cells):
+        compact = CSRGraph.from_edges(cell_edges[i], nodes=cell)
+        graph_file.write_graph(compact, cell_file(directory, i))
+        members = [node for node in cell if node in boundary[i]]
+        boundary_lists.append(members)
+        overlay_edges.extend(_clique(compact, members))
+
+    overlay = CSRGraph.from_edges(overlay_edges,
+                                  nodes=[node for members in boundary_lists for node in members])
+    graph_file.write_graph(overlay, os.path.join(directory, OVERLAY_FILE))
+    index_path = os.path.join(directory, INDEX_FILE)
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as out:
+        json.dump({"cells": cells, "boundary": boundary_lists}, out, ensure_ascii=False)
+    os.replace(index_path + '.tmp', index_path)
+    return {"cells": len(cells), "boundary_nodes": overlay.number_of_nodes(),
+            "overlay_edges": overlay.number_of_edges()}
+
+
+class PartitionIndex:
+    '''Conteúdo de cells.json: as células, as suas fronteiras e a célula de cada nó.'''
+
+    def __init__(self, directory: str):
+        path = os.path.join(directory, INDEX_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError as exc:
+            raise FileNotFoundError(f'{path} not found: is it a partition directory?') from exc
+        self.directory = directory
+        self.cells = data["cells"]
+        self.boundary = data["boundary"]
+        self.cell_of = {node: i for i, cell in enumerate(self.cells) for node in cell}
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+
+class CellShard:
+    '''
+    Responde pelas células de um shard. As células são abertas sob demanda
+    (mmap) e no máximo max_cells ficam abertas; as últimas árvores calculadas
+    são guardadas para que os caminhos pedidos em seguida saiam sem nova busca.
+    '''
+
+    TREE_CACHE = 16
+
+    def __init__(self, directory: str, cells=None, max_cells: int = 64,
+                 index: PartitionIndex | None = None):
+        self.index = index if index is not None else PartitionIndex(directory)
+        self.directory = directory
+        self.cells = None if cells is None else set(cells)  # None: todas as células
+        self.max_cells = max_cells
+        self._graphs = OrderedDict()    # célula -> CSRGraph
+        self._trees = OrderedDict()     # (célula, nó, invertida) -> ShortestPathTree
+
+    def graph(self, cell: int) -> CSRGraph:
+        '''Grafo da célula, aberto na primeira vez que é usado.'''
+        if self.cells is not None and cell not in self.cells:
+            raise ValueError(f"Cell {cell} is not served by this shard")
+        graph = self._graphs.get(cell)
+        if graph is None:
+            graph = self._graphs[cell] = graph_file.load_graph(cell_file(self.directory, cell))
+            if len(self._graphs) > self.max_cells:
+                self._graphs.popitem(last=False)
+        else:
+            self._graphs.move_to_end(cell)
+        return graph
+
+    def boundary_distances(self, cell: int, node, reverse: bool = False,
+                           target=None) -> tuple[dict, float | None]:
+        '''
+        Distâncias dentro da célula de node até cada nó de fronteira alcançável
+        (com reverse=True, de cada nó de fronteira até node). Com target (na
+        mesma célula), também a distância interna de node até target.
+        '''
+        graph = self.graph(cell)
+        tree = _tree(graph.reverse() if reverse else graph, node)
+        self._trees[(cell, node, reverse)] = tree
+        if len(self._trees) > self.TREE_CACHE:
+            self._trees.popitem(last=False)
+        distances = {member: tree.dist[member] for member in self.index.boundary[cell]
+                     if member in tree}
+        return distances, (None if target is None else tree.dist.get(target))
+
+    def cell_paths(self, requests) -> list[list | None]:
+        '''Caminho dentro da célula para cada (célula, u, v) de requests.'''
+        return [self._cell_path(*request) for request in requests]
+
+    def _cell_path(self, cell: int, u, v) -> list | None:
+        if u == v:
+            return [u]
+        tree = self._trees.get((cell, u, False))
+        if tree is not None:
+            return tree.path(v)
+        tree = self._trees.get((cell, v, True))
+        if tree is not None:
+            # árvore do grafo invertido a partir de v: pred aponta para o próximo nó até v
+            if u not in tree:
+                return None
+            path = []
+            node = u
+            while node is not None:
+                path.append(node)
+                node = tree.pred[node]
+            return path
+        return dijkstra(self.graph(cell), u, v)[1]
+
+
+def overlay_search(overlay: CSRGraph, sources: dict, targets: dict,
+                   best: float = _INF) -> tuple[float, list | None]:
+    '''
+    Dijkstra no overlay com várias origens: sources e targets mapeiam nós de
+    fronteira para a distância desde s e até t. Para quando a menor distância
+    na fila não pode mais melhorar best. Retorna (distância, caminho no
+    overlay), ou (best, None) se nenhum caminho pelo overlay for melhor.
+    '''
+    offsets, edge_targets, weights = overlay.arrays()
+    to_target = {overlay.node_id(node): dist for node, dist in targets.items()}
+    dist = {}
+    pred = {}
+    unvisited = []
+    for node, node_dist in sources.items():
+        i = overlay.node_id(node)
+        dist[i] = node_dist
+        pred[i] = -1
+        unvisited.append((node_dist, i))
+    heapq.heapify(unvisited)
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    meeting = None
+
+    while unvisited:
+        curr_dist, curr_node = pop(unvisited)
+        if curr_dist > dist[curr_node]:
+            continue
+        if curr_dist >= best:
+            break
+        remaining = to_target.get(curr_node)
+        if remaining is not None and curr_dist + remaining < best:
+            best, meeting = curr_dist + remaining, curr_node
+        for k in range(offsets[curr_node], offsets[curr_node + 1]):
+            neighbor = edge_targets[k]
+            new_dist = curr_dist + weights[k]
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist, neighbor))
+
+    if meeting is None:
+        return best, None
+    path = []
+    node = meeting
+    while node != -1:
+        path.append(overlay.node_name(node))
+        node = pred[node]
+    path.reverse()
+    return best, path
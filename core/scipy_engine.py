@@ -0,0 +1,172 @@
+#coding: utf-8
+
+'''
+Motor de buscas de um nó para todos com o SciPy (scipy.sparse.csgraph).
+
+O grafo (nx.DiGraph ou CSRGraph) é convertido uma vez em uma
+scipy.sparse.csr_matrix, com o mapeamento nó -> índice; a conversão fica
+guardada no grafo enquanto ele não muda (ver core.tracked_graph). As buscas
+de várias origens são feitas por csgraph.dijkstra em uma única chamada (em
+blocos de origens cujas matrizes densas de resultado, origens x nós, cabem em
+BLOCK_BYTES; no máximo SOURCES_PER_CALL origens), e os vetores de
+antecessores são convertidos de volta para os nomes das cidades.
+
+O SciPy é opcional: sem ele (ou com engine='python'), as mesmas funções usam
+o dijkstra_all em Python puro, com os mesmos resultados. As distâncias do
+SciPy são sempre float.
+'''
+
+from array import array
+from collections import namedtuple
+
+from core import matrix
+from core.dijkstra import ShortestPathTree, dijkstra_all
+from util import validator
+
+try:
+    import numpy as np
+    from scipy.sparse import csgraph, csr_matrix
+except ImportError: # o SciPy é opcional
+    np = None
+
+ENGINES = ('auto', 'scipy', 'python')
+SOURCES_PER_CALL = 64
+BLOCK_BYTES = 256 * 2 ** 20    # distâncias (e antecessores) de um bloco de origens
+
+SparseGraph = namedtuple('SparseGraph', ['names', 'index', 'matrix'])
+
+
+def available() -> bool:
+    '''Indica se o SciPy está instalado.'''
+    return np is not None
+
+
+def _use_scipy(engine: str) -> bool:
+    if engine not in ENGINES:
+        raise ValueError(f"Engine must be one of {', '.join(ENGINES)}")
+    if engine == 'scipy' and np is None:
+        raise ValueError("The scipy engine needs SciPy installed")
+    return engine != 'python' and np is not None
+
+
+def sparse_graph(graph) -> SparseGraph:
+    '''
+    Retorna o grafo como SparseGraph(nomes, índice nome -> id, csr_matrix).
+    Arestas de peso zero ficam como zeros explícitos, que o csgraph trata
+    como arestas.
+    '''
+    version = getattr(graph, 'version', None)
+    cached = getattr(graph, 'sparse_cache', None)
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    if hasattr(graph, 'arrays'):   # CSRGraph: os arrays já estão no formato CSR
+        names = graph.nodes()
+        index = {name: i for i, name in enumerate(names)}
+        offsets, targets, weights = graph.arrays()
+    else:
+        names = list(graph.nodes())
+        index = {name: i for i, name in enumerate(names)}
+        adj = graph._adj # pylint: disable=protected-access
+        offsets, targets, weights = array('q', [0]), array('q'), array('d')
+        for node in names:
+            for neighbor, edge in adj[node].items():
+                targets.append(index[neighbor])
+                weights.append(edge.get('weight', 1))
+            offsets.append(len(targets))
+
+    n = len(names)
+    sparse = SparseGraph(names, index, csr_matrix(
+        (_vector(weights, np.float64), _vector(targets, np.int64), _vector(offsets, np.int64)),
+        shape=(n, n)))
+    if version is not None:
+        graph.sparse_cache = (version, sparse)
+    return sparse
+
+
+def _vector(values, dtype):
+    '''
+    Array do NumPy com os valores: sem cópia para array e mmap; as seções do
+    LazyGraph (core.lazy_graph), que não são buffers, são lidas inteiras.
+    '''
+    try:
+        return np.frombuffer(values, dtype=dtype)
+    except TypeError:
+        return np.fromiter(values, dtype=dtype, count=len(values))
+
+
+def _block_size(n: int, cell_bytes: int) -> int:
+    '''Origens por chamada do csgraph: cell_bytes por nó e origem, até BLOCK_BYTES.'''
+    return max(1, min(SOURCES_PER_CALL, BLOCK_BYTES // (cell_bytes * max(n, 1))))
+
+
+def _source_ids(graph, sources) -> tuple[SparseGraph, list[int]]:
+    '''Valida o grafo e as origens e retorna a conversão e os ids das origens.'''
+    if sources:
+        # as verificações do grafo inteiro só uma vez; depois, apenas os nós
+        validator.validate_objects(graph, sources[0], sources[0])
+    for source in sources[1:]:
+        if source is None:
+            raise AttributeError("Graph and nodes can't be None")
+        if not graph.has_node(source):
+            raise ValueError("Graph must contain the specified nodes")
+    sparse = sparse_graph(graph)
+    return sparse, [sparse.index[source] for source in sources]
+
+
+def shortest_path_trees(graph, sources, engine: str = 'auto') -> list[ShortestPathTree]:
+    '''
+    Árvores de caminhos mais curtos (como as do dijkstra_all) de cada nó de
+    sources, na mesma ordem. engine: 'auto' (SciPy se instalado), 'scipy' ou
+    'python'.
+    '''
+    sources = list(sources)
+    if not _use_scipy(engine):
+        return [dijkstra_all(graph, source) for source in sources]
+
+    sparse, ids = _source_ids(graph, sources)
+    n = len(sparse.names)
+    # o índice n (fora do grafo) é o antecessor da origem: None
+    names = np.empty(n + 1, dtype=object)
+    names[:n] = sparse.names
+    trees = []
+    step = _block_size(n, 12)   # float64 de distância + int32 de antecessor
+    for begin in range(0, len(ids), step):
+        block = ids[begin:begin + step]
+        dist, pred = csgraph.dijkstra(sparse.matrix, directed=True, indices=block,
+                                      return_predecessors=True)
+        for row, source in enumerate(block):
+            reached = np.flatnonzero(np.isfinite(dist[row]))
+            preds = pred[row][reached]
+            preds[preds < 0] = n
+            reached_names = names[reached].tolist()
+            trees.append(ShortestPathTree(
+                sparse.names[source],
+                dict(zip(reached_names, dist[row][reached].tolist())),
+                dict(zip(reached_names, names[preds].tolist()))))
+    return trees
+
+
+def distance_matrix(graph, sources, targets, engine: str = 'auto'):
+    '''
+    Matriz len(sources) x len(targets) com as distâncias mais curtas
+    (float('inf') se não alcançável), como core.matrix.distance_matrix.
+    Com o SciPy retorna um numpy.ndarray de float64; sem ele, o resultado
+    do core.matrix.
+    '''
+    sources = list(sources)
+    targets = list(targets)
+    if not _use_scipy(engine):
+        return matrix.distance_matrix(graph, sources, targets)
+
+    sparse, ids = _source_ids(graph, sources)
+    if not all(target in sparse.index for target in targets):
+        raise ValueError("Graph must contain the specified nodes")
+    columns = [sparse.index[target] for target in targets]
+    result = np.empty((len(ids), len(columns)), dtype=np.float64)
+    step = _block_size(len(sparse.names), 8)
+    for begin in range(0, len(ids), step):
+        block = ids[begin:begin + step]
+        dist = csgraph.dijkstra(sparse.matrix, directed=True, indices=block)
+        result[begin:begin + len(block)] = dist[:, columns]
+    return result
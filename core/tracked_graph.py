@@ -0,0 +1,98 @@
+#coding: utf-8
+
+'''
+nx.DiGraph com um contador de versão, incrementado a cada alteração de nós,
+arestas ou atributos de arestas. Permite que caches de resultados
+(core.cache) descubram que o grafo mudou sem percorrê-lo.
+'''
+
+import networkx as nx
+
+
+class _EdgeData(dict):
+    '''
+    Dicionário de atributos de uma aresta que avisa o grafo quando é alterado,
+    por exemplo em graph['A']['B']['weight'] = 3.
+    '''
+
+    def __init__(self, graph, data=()):
+        super().__init__(data)
+        self._graph = graph
+
+    def __reduce__(self):
+        # pickle/deepcopy: restaura a referência ao grafo antes dos atributos
+        return (self.__class__, (self._graph, dict(self)))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._graph._version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._graph._version += 1
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._graph._version += 1
+
+    def setdefault(self, key, default=None):
+        self._graph._version += 1
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self._graph._version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self._graph._version += 1
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self._graph._version += 1
+
+
+def _bumps_version(method):
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._version += 1
+        return result
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class TrackedDiGraph(nx.DiGraph):
+    '''
+    nx.DiGraph cujo atributo version muda sempre que o grafo é alterado pelos
+    métodos do networkx ou pelos dicionários de atributos das arestas.
+    Alterações feitas diretamente nas estruturas internas (_adj, _pred) não são vistas.
+    '''
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self._version = 0
+        super().__init__(incoming_graph_data, **attr)
+
+    def edge_attr_dict_factory(self):
+        '''Cria o dicionário de atributos de uma nova aresta.'''
+        return _EdgeData(self)
+
+    @property
+    def version(self) -> int:
+        '''Número de alterações feitas no grafo desde a sua criação.'''
+        # views (reverse, subgraph) compartilham o contador do grafo original
+        base = self.__dict__.get('_graph')
+        return self._version if base is None else base.version
+
+    add_node = _bumps_version(nx.DiGraph.add_node)
+    add_nodes_from = _bumps_version(nx.DiGraph.add_nodes_from)
+    remove_node = _bumps_version(nx.DiGraph.remove_node)
+    remove_nodes_from = _bumps_version(nx.DiGraph.remove_nodes_from)
+    add_edge = _bumps_version(nx.DiGraph.add_edge)
+    add_edges_from = _bumps_version(nx.DiGraph.add_edges_from)
+    add_weighted_edges_from = _bumps_version(nx.DiGraph.add_weighted_edges_from)
+    remove_edge = _bumps_version(nx.DiGraph.remove_edge)
+    remove_edges_from = _bumps_version(nx.DiGraph.remove_edges_from)
+    update = _bumps_version(nx.DiGraph.update)
+    clear = _bumps_version(nx.DiGraph.clear)
+    clear_edges = _bumps_version(nx.DiGraph.clear_edges)
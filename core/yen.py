@@ -0,0 +1,139 @@
+#coding: utf-8
+
+'''
+K caminhos mínimos sem ciclos entre dois nós (algoritmo de Yen).
+
+Em vez de refazer um dijkstra completo para cada desvio:
+- uma única busca a partir de end nas arestas de entrada (dijkstra_all no grafo
+  invertido) dá a árvore de caminhos mínimos até end. Dela sai o primeiro
+  caminho, e as suas distâncias são limites inferiores exatos para as buscas de
+  desvio, que viram um A* com parada ao chegar em end e que ignora os nós que
+  não alcançam end;
+- os caminhos aceitos ficam numa trie de prefixos com o custo acumulado de cada
+  nó, então o prefixo (raiz) de cada desvio e as arestas a bloquear saem sem
+  recalcular nada;
+- cada caminho só gera desvios a partir do ponto em que ele se separou do
+  caminho que o originou (melhoria de Lawler): os desvios anteriores já foram
+  gerados pelo caminho de origem.
+'''
+
+import heapq
+
+import networkx as nx
+from core import adjacency
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra_all
+from util import validator
+
+_INF = float('inf')
+
+
+def k_shortest_paths(digraph: nx.DiGraph | CSRGraph, start: str, end: str,
+                     k: int) -> list[tuple[float, list[str]]]:
+    '''
+    Retorna até k caminhos sem ciclos de start até end, em ordem crescente de
+    distância, como [(distância, caminho), ...]. Retorna uma lista vazia se não
+    houver caminho (e menos de k itens se não houver k caminhos distintos).
+    '''
+    validator.validate_objects(digraph, start, end)
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    if start == end:
+        return [(0, [start])]
+
+    to_end = dijkstra_all(adjacency.reverse(digraph), end)
+    if start not in to_end:
+        return []
+    bound = to_end.dist
+    successors = adjacency.successors(digraph)
+
+    # primeiro caminho: segue a árvore até end (no grafo invertido, pred é o próximo nó)
+    path = []
+    node = start
+    while node is not None:
+        path.append(node)
+        node = to_end.pred[node]
+    total = bound[start]
+    costs = tuple(total - bound[node] for node in path)
+
+    accepted = []
+    trie = {}           # prefixos dos caminhos aceitos: nó -> subárvore dos próximos nós
+    candidates = []     # heap de (distância, caminho, custos acumulados, índice do desvio)
+    seen = set()
+    best = (total, tuple(path), costs, 0)
+    seen.add(best[1])
+
+    while True:
+        accepted.append(best)
+        _, path, costs, deviation = best
+        _insert(trie, path)
+        if len(accepted) == k:
+            break
+
+        branch = trie
+        for i in range(len(path) - 1):
+            branch = branch[path[i]]
+            if i < deviation:
+                continue
+            spur = path[i]
+            found = _spur_search(successors, spur, end, bound, set(path[:i]), branch)
+            if found is None:
+                continue
+            spur_path, spur_costs = found
+            candidate = path[:i] + spur_path
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            candidate_costs = costs[:i] + tuple(costs[i] + cost for cost in spur_costs)
+            heapq.heappush(candidates, (candidate_costs[-1], candidate, candidate_costs, i))
+
+        if not candidates:
+            break
+        best = heapq.heappop(candidates)
+
+    return [(costs[-1], list(path)) for _, path, costs, _ in accepted]
+
+
+def _insert(trie: dict, path: tuple):
+    for node in path:
+        trie = trie.setdefault(node, {})
+
+
+def _spur_search(successors, spur, end, bound: dict, blocked: set, used: dict):
+    '''
+    A* de spur até end sem passar pelos nós blocked nem pelas arestas
+    (spur, v) com v em used. bound[v] é a distância de v até end no grafo
+    completo: um limite inferior consistente no grafo com bloqueios.
+    Retorna (caminho, custos acumulados a partir de spur) ou None.
+    '''
+    dist = {spur: 0}
+    pred = {spur: None}
+    dist_get = dist.get
+    push, pop = heapq.heappush, heapq.heappop
+    unvisited = [(bound[spur], 0, spur)]
+
+    while unvisited:
+        _, curr_dist, curr_node = pop(unvisited)
+        if curr_dist > dist[curr_node]:
+            continue
+        if curr_node == end:
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = pred[node]
+            path.reverse()
+            return tuple(path), tuple(dist[node] for node in path)
+
+        for neighbor, weight in successors(curr_node):
+            estimate = bound.get(neighbor)
+            if estimate is None or neighbor in blocked:
+                continue    # não alcança end ou já está na raiz do desvio
+            if curr_node == spur and neighbor in used:
+                continue    # aresta de desvio já usada por um caminho aceito
+            new_dist = curr_dist + weight
+            if new_dist < dist_get(neighbor, _INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                push(unvisited, (new_dist + estimate, new_dist, neighbor))
+    return None
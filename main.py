@@ -1,11 +1,165 @@
 """
 Classe responsável pela CLI com o usuário.
 """
+import contextlib
 import json
+import sys
 import argparse
 
-from core.build_graph import build_graph
-from core.dijkstra import dijkstra
+from core.astar import astar
+from core.build_graph import build_graph, self_test as build_graph_self_test
+from core.contraction import ContractionHierarchy
+from core.dijkstra import SearchStats, dijkstra, dijkstra_all, self_test as dijkstra_self_test
+from core.dynamic import DynamicShortestPaths
+from core.graph_file import compile_graph
+from core.heuristics import LandmarkHeuristic, great_circle
+from core.lazy_graph import open_graph
+from core.landmarks import (METHODS as LANDMARK_METHODS, LandmarkTable, find_landmarks,
+                            landmarks_path)
+from core.yen import k_shortest_paths
+
+
+def _load(loader, *args, file=None):
+    """
+    Executa loader(*args) e imprime o erro de leitura/validação, se houver, em
+    file (padrão: stdout). Retorna o resultado do loader ou None em caso de erro.
+    """
+    try:
+        return loader(*args)
+    except FileNotFoundError as exc:
+        print(f"JSON file can't be found: {exc}", file=file)
+    except json.JSONDecodeError as exc:
+        print(f"JSON file isn't valid: {exc}", file=file)
+    except ValueError as exc:
+        print(f"The graph isn't valid: {exc}", file=file)
+    return None
+
+
+def _build_hierarchy(path, out_path, compact):
+    hierarchy = ContractionHierarchy.build(build_graph(path, compact=compact))
+    hierarchy.save(out_path)
+    return out_path
+
+
+def _build_landmarks(path, out_path, count, method, compact):
+    table = LandmarkTable.build(build_graph(path, compact=compact), count, method)
+    table.save(out_path)
+    return table
+
+
+def _build_partition(path, out_dir, cell_size, compact):
+    # importado aqui: só é usado ao particionar
+    from core.partition import write_partition # pylint: disable=import-outside-toplevel
+    return write_partition(build_graph(path, compact=compact), out_dir, cell_size)
+
+
+def _print_all(graph, start):
+    """
+    Imprime a distância e o caminho de start até cada cidade alcançável.
+    """
+    try:
+        tree = dijkstra_all(graph, start)
+    except AttributeError as exc:
+        print(f"Some of the parameters are None: {exc}")
+        return 1
+    except ValueError as exc:
+        print(f"Graph empty or with invalid nodes/weights: {exc}")
+        return 1
+
+    for city, dist in sorted(tree.dist.items(), key=lambda item: item[1]):
+        print(f"{city}: {dist:.1f} km ({', '.join(map(str, tree.path(city)))})")
+    return 0
+
+
+def _print_k_paths(graph, start, end, k):
+    """
+    Imprime os k caminhos mais curtos de start até end, um por linha.
+    """
+    try:
+        routes = k_shortest_paths(graph, start, end, k)
+    except AttributeError as exc:
+        print(f"Some of the parameters are None: {exc}")
+        return 1
+    except ValueError as exc:
+        print(f"Graph empty or with invalid nodes/weights: {exc}")
+        return 1
+
+    if not routes:
+        print(f"There is no path from {start} to {end}")
+    for rank, (dist, path) in enumerate(routes, start=1):
+        print(f"{rank}. {dist:.1f} km: {', '.join(map(str, path))}")
+    return 0
+
+
+def _partitioned_query(args):
+    """
+    Responde -s/-e sobre um diretório gravado por --partition, com as células
+    distribuídas em --workers processos shard (1: no próprio processo).
+    """
+    # importado aqui, como o servidor, para não pesar nas consultas avulsas
+    from service.shards import Coordinator # pylint: disable=import-outside-toplevel
+    try:
+        coordinator = Coordinator(args.json, shards=args.workers if args.workers > 1 else 0)
+    except FileNotFoundError as exc:
+        print(f"Partition can't be found: {exc}")
+        return 1
+    with coordinator:
+        try:
+            dist, path = coordinator.query(args.start, args.end)
+        except ValueError as exc:
+            print(f"Graph empty or with invalid nodes/weights: {exc}")
+            return 1
+    if path is None:
+        print(f"There is no path from {args.start} to {args.end}")
+        return 0
+    print(f"The shortest path distance is {dist:.1f} km")
+    print("Path:", ", ".join(map(str, path)))
+    return 0
+
+
+def _serve(args):
+    """
+    Executa o servidor de consultas e imprime as estatísticas ao encerrar.
+    """
+    # importado aqui para não somar o asyncio ao tempo de início das consultas avulsas
+    from service import server # pylint: disable=import-outside-toplevel
+    query_server = _load(server.run, args.json, args.host, args.port, args.compact, args.workers)
+    if query_server is None:
+        return 1
+    stats = query_server.stats()
+    print(f"Served {stats['requests']} requests ({stats['errors']} errors)")
+    for name, value in stats["latency_ms"].items():
+        print(f"  {name}: {value:.2f} ms")
+    return 0
+
+
+def _batch(args):
+    """
+    Executa as consultas em lote, lendo os pares de args.batch e escrevendo em args.output.
+    """
+    # importado aqui, como o servidor, para não pesar nas consultas avulsas
+    from service import batch # pylint: disable=import-outside-toplevel
+    with contextlib.ExitStack() as stack:
+        try:
+            pairs_file = (sys.stdin if args.batch == "-"
+                          else stack.enter_context(open(args.batch, "r", encoding="utf-8")))
+        except FileNotFoundError as exc:
+            print(f"Pairs file can't be found: {exc}", file=sys.stderr)
+            return 1
+        # stdout pode ser a saída dos resultados: os erros vão para stderr
+        graph = _load(build_graph, args.json, args.compact, file=sys.stderr)
+        if graph is None:
+            return 1
+        out = (sys.stdout if args.output in (None, "-")
+               else stack.enter_context(open(args.output, "w", encoding="utf-8")))
+        try:
+            count = batch.run_batch(args.json, pairs_file, out, args.format,
+                                    args.workers, args.compact, graph=graph)
+        except batch.PairsError as exc:
+            print(f"The pairs file isn't valid: {exc}", file=sys.stderr)
+            return 1
+    print(f"Answered {count} pairs", file=sys.stderr)
+    return 0
 
 
 def main():
@@ -14,32 +168,197 @@ def main():
     Define os parâmetros de entrada e faz as chamadas ao módulo build_graph e dijkstra.
     """
     parser = argparse.ArgumentParser()
-    parser.add_argument("json", type=str, help="Path to the json file")
-    parser.add_argument("-s", "--start", type=str, required=True, help="Origin city")
-    parser.add_argument("-e", "--end", type=str, required=True, help="Destination city")
+    parser.add_argument("json", type=str, nargs="?",
+                        help="Path to the json file (or a compiled graph)")
+    parser.add_argument("-s", "--start", type=str, help="Origin city")
+    parser.add_argument("-e", "--end", type=str, help="Destination city")
+    parser.add_argument("--compile", nargs="?", const="", metavar="OUT",
+                        help="Compile the json into the binary graph format and exit "
+                             "(default output: same name with .graph extension)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Use the compact graph (and the compiled file when available)")
+    parser.add_argument("--lazy", action="store_true",
+                        help="Read from the compiled graph only the edges the search touches "
+                             "(the json is compiled next to it, with bounded memory, when needed)")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="Search from both ends at the same time")
+    parser.add_argument("--heuristic", choices=["great-circle", "landmarks"],
+                        help="Use A* with the given heuristic instead of dijkstra")
+    parser.add_argument("--contract", metavar="OUT",
+                        help="Build the contraction hierarchy of the graph, save it to OUT and exit")
+    parser.add_argument("--landmarks", nargs="?", const="", metavar="OUT",
+                        help="Pick landmarks, save their distance tables to OUT and exit "
+                             "(default output: same name with .landmarks extension); "
+                             "--heuristic landmarks then uses the saved tables")
+    parser.add_argument("--landmark-count", type=int, default=8,
+                        help="Number of landmarks picked by --landmarks")
+    parser.add_argument("--landmark-method", choices=LANDMARK_METHODS, default="farthest",
+                        help="How --landmarks picks the landmarks")
+    parser.add_argument("--partition", metavar="DIR",
+                        help="Split the graph into cells with a routing overlay, save them "
+                             "to the directory DIR and exit")
+    parser.add_argument("--cell-size", type=int, default=10000,
+                        help="Maximum number of nodes per cell used by --partition")
+    parser.add_argument("--partitioned", action="store_true",
+                        help="The input is a directory written by --partition "
+                             "(cells are split among --workers processes)")
+    parser.add_argument("--hierarchy", action="store_true",
+                        help="The input is a hierarchy file written by --contract")
+    parser.add_argument("--all", action="store_true",
+                        help="Print the distance from the origin city to every reachable city")
+    parser.add_argument("--k", type=int, metavar="K",
+                        help="Print the K shortest loopless paths from the origin to the "
+                             "destination, in increasing order of distance")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print search counters and the time spent validating, "
+                             "searching and rebuilding the path")
+    parser.add_argument("--delta", metavar="FILE",
+                        help="Apply the edge changes of a delta file (see core.dynamic) "
+                             "before answering")
+    parser.add_argument("--serve", action="store_true",
+                        help="Load the graph once and answer queries over TCP until Ctrl-C")
+    parser.add_argument("--host", default="127.0.0.1", help="Address used by --serve")
+    parser.add_argument("--port", type=int, default=8765, help="Port used by --serve")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of search processes used by --serve, --batch and --partitioned")
+    parser.add_argument("--batch", metavar="PAIRS",
+                        help="Answer every origin,destination line of the PAIRS file "
+                             "('-' for stdin) and exit")
+    parser.add_argument("--output", metavar="OUT",
+                        help="File written by --batch ('-' or default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl",
+                        help="Output format of --batch")
+    parser.add_argument("--self-test", action="store_true",
+                        help="Run the built-in self-checks of the core modules and exit")
 
     args = parser.parse_args()
 
+    if args.self_test:
+        build_graph_self_test()
+        dijkstra_self_test()
+        print("Self-test OK")
+        return 0
+
+    if args.json is None:
+        parser.error("the following arguments are required: json")
+
+    if args.compile is not None:
+        out_path = _load(compile_graph, args.json, args.compile or None)
+        if out_path is None:
+            return 1
+        print(f"Compiled graph written to {out_path}")
+        return 0
+
+    if args.contract is not None:
+        out_path = _load(_build_hierarchy, args.json, args.contract, args.compact)
+        if out_path is None:
+            return 1
+        print(f"Contraction hierarchy written to {out_path}")
+        return 0
+
+    if args.landmarks is not None:
+        if args.landmark_count < 1:
+            parser.error("--landmark-count must be at least 1")
+        out_path = args.landmarks or landmarks_path(args.json)
+        table = _load(_build_landmarks, args.json, out_path, args.landmark_count,
+                      args.landmark_method, args.compact)
+        if table is None:
+            return 1
+        print(f"Landmark tables written to {out_path}: {', '.join(map(str, table.landmarks))}")
+        return 0
+
+    if args.partition is not None:
+        if args.cell_size < 1:
+            parser.error("--cell-size must be at least 1")
+        summary = _load(_build_partition, args.json, args.partition, args.cell_size, args.compact)
+        if summary is None:
+            return 1
+        print(f"Partition written to {args.partition}: {summary['cells']} cells, "
+              f"{summary['boundary_nodes']} boundary nodes, "
+              f"{summary['overlay_edges']} overlay edges")
+        return 0
+
+    if args.serve:
+        return _serve(args)
+
+    if args.batch is not None:
+        return _batch(args)
+
+    if args.start is None or (args.end is None and not args.all):
+        parser.error("the following arguments are required: -s/--start, -e/--end")
+    if args.partitioned:
+        if args.all or args.hierarchy or args.heuristic or args.bidirectional or args.stats \
+                or args.k is not None or args.delta or args.compact or args.lazy:
+            parser.error("--partitioned only answers -s/-e queries")
+        return _partitioned_query(args)
+    if args.all and args.hierarchy:
+        parser.error("--all can't be used with --hierarchy")
+    if args.delta and (args.hierarchy or args.compact):
+        parser.error("--delta can't be used with --hierarchy or --compact")
+    if args.lazy and (args.all or args.hierarchy or args.bidirectional or args.delta):
+        parser.error("--lazy can't be used with --all, --hierarchy, --bidirectional or --delta")
+    if args.k is not None and args.k < 1:
+        parser.error("--k must be at least 1")
+    if args.k is not None and (args.all or args.hierarchy or args.heuristic
+                               or args.bidirectional or args.stats):
+        parser.error("--k can't be used with --all, --hierarchy, --heuristic, "
+                     "--bidirectional or --stats")
+    if args.stats and (args.all or args.hierarchy or args.heuristic or args.bidirectional):
+        parser.error("--stats can't be used with --all, --hierarchy, --heuristic "
+                     "or --bidirectional")
+
+    if args.hierarchy:
+        graph = _load(ContractionHierarchy.load, args.json)
+    elif args.lazy:
+        graph = _load(open_graph, args.json)
+    else:
+        graph = _load(build_graph, args.json, args.compact)
+    if graph is None:
+        return 1
+    if args.delta and _load(DynamicShortestPaths(graph).apply_delta, args.delta) is None:
+        return 1
+
+    if args.all:
+        return _print_all(graph, args.start)
+    if args.k is not None:
+        return _print_k_paths(graph, args.start, args.end, args.k)
+
+    stats = SearchStats() if args.stats else None
     try:
-        graph = build_graph(args.json)
-    except FileNotFoundError as exc:
-        print(f"JSON file can't be found: {exc}")
-    except json.JSONDecodeError as exc:
-        print(f"JSON file isn't valid: {exc}")
-    except ValueError as exc:
-        print(f"The graph isn't valid: {exc}")
-    try:
-        dist, path = dijkstra(graph, args.start, args.end)
+        if args.hierarchy:
+            dist, path = graph.query(args.start, args.end)
+        elif args.heuristic == "great-circle":
+            dist, path = astar(graph, args.start, args.end, great_circle(graph))
+        elif args.heuristic == "landmarks":
+            # tabelas salvas por --landmarks; com --delta os pesos mudaram e elas não valem
+            tables = None if args.delta else find_landmarks(args.json)
+            if tables is not None:
+                dist, path = dijkstra(graph, args.start, args.end,
+                                      landmarks=LandmarkTable.load(tables, graph))
+            else:
+                dist, path = astar(graph, args.start, args.end, LandmarkHeuristic(graph))
+        else:
+            dist, path = dijkstra(graph, args.start, args.end, bidirectional=args.bidirectional,
+                                  stats=stats)
     except AttributeError as exc:
         print(f"Some of the parameters are None: {exc}")
+        return 1
     except ValueError as exc:
         print(f"Graph empty or with invalid nodes/weights: {exc}")
+        return 1
 
-    print(f"The shortest path distance is {dist:.1f} km")
-    print("Path:", ", ".join(path))
+    if path is None:
+        print(f"There is no path from {args.start} to {args.end}")
+    else:
+        print(f"The shortest path distance is {dist:.1f} km")
+        print("Path:", ", ".join(path))
 
+    if stats is not None:
+        print("Search stats:")
+        for line in stats.summary():
+            print(f"  {line}")
     return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#coding: utf-8
+
+'''
+Consultas em lote: muitos pares origem/destino sobre um grafo carregado uma vez.
+
+Os pares são lidos em blocos de tamanho fixo; dentro de cada bloco são
+agrupados por origem, e cada origem faz uma única busca (dijkstra_all com os
+seus destinos como targets) que atende todos os seus destinos. Os grupos podem
+ser distribuídos entre processos. Os resultados saem na ordem de entrada, um
+bloco por vez, em JSON Lines ou CSV, então a memória não cresce com o número
+de pares.
+'''
+
+import csv
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from core.build_graph import build_graph
+from core.dijkstra import dijkstra_all
+
+BLOCK_SIZE = 10000
+FORMATS = ('jsonl', 'csv')
+_MISSING_NODE = "Graph must contain the specified nodes"
+
+# grafo usado pelos processos do pool (definido no initializer, em cada processo)
+_WORKER_GRAPH = None
+
+
+def _init_worker(graph, compact: bool):
+    global _WORKER_GRAPH # pylint: disable=global-statement
+    if isinstance(graph, str):
+        graph = build_graph(graph, compact=compact)
+    _WORKER_GRAPH = graph
+
+
+class PairsError(ValueError):
+    '''Linha inválida no arquivo de pares (não é um erro do grafo).'''
+
+
+def read_pairs(lines):
+    '''
+    Lê pares no formato CSV "origem,destino", um por linha. Linhas em branco e
+    linhas começando com # são ignoradas. Lança PairsError (um ValueError)
+    para linhas com outra quantidade de colunas.
+    '''
+    for number, row in enumerate(csv.reader(lines), start=1):
+        if not row or not ''.join(row).strip() or row[0].startswith('#'):
+            continue
+        if len(row) != 2:
+            raise PairsError(f"Line {number} must be origin,destination")
+        yield row[0].strip(), row[1].strip()
+
+
+def solve_group(graph, origin, destinations) -> list[tuple]:
+    '''
+    Resolve todos os destinos de uma origem com uma única busca.
+    Retorna, na ordem de destinations, tuplas (distância, caminho, erro);
+    distância e caminho são None quando não há caminho.
+    '''
+    if not graph.has_node(origin):
+        return [(None, None, _MISSING_NODE)] * len(destinations)
+    targets = {destination for destination in destinations if graph.has_node(destination)}
+    tree = dijkstra_all(graph, origin, targets)
+    results = []
+    for destination in destinations:
+        if destination not in targets:
+            results.append((None, None, _MISSING_NODE))
+        elif destination in tree:
+            dist, path = tree.result(destination)
+            results.append((dist, path, None))
+        else:
+            results.append((None, None, None))
+    return results
+
+
+def _worker_group(group) -> list[tuple]:
+    return solve_group(_WORKER_GRAPH, *group)
+
+
+def _blocks(pairs, block_size: int):
+    block = []
+    for pair in pairs:
+        block.append(pair)
+        if len(block) == block_size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def iter_results(graph, pairs, workers: int = 1, block_size: int = BLOCK_SIZE,
+                 path: str | None = None, compact: bool = False):
+    '''
+    Gera (origem, destino, distância, caminho, erro) para cada par, na ordem de pairs.
+    Com workers > 1 os grupos de cada bloco são resolvidos em processos; se o
+    sistema não tiver "fork", cada processo carrega o grafo de path (sem path,
+    a execução fica no processo atual).
+    '''
+    executor = None
+    if workers > 1:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # com fork os initargs não são serializados: os filhos herdam o grafo
+            # pela memória do processo pai, e cada pool leva o seu próprio grafo
+            executor = ProcessPoolExecutor(max_workers=workers,
+                                           mp_context=multiprocessing.get_context('fork'),
+                                           initializer=_init_worker, initargs=(graph, compact))
+        elif path is not None:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(path, compact))
+    try:
+        for block in _blocks(pairs, block_size):
+            groups = {}
+            for i, (origin, destination) in enumerate(block):
+                groups.setdefault(origin, []).append((i, destination))
+            tasks = [(origin, [destination for _, destination in entries])
+                     for origin, entries in groups.items()]
+            if executor is None:
+                solved = (solve_group(graph, *task) for task in tasks)
+            else:
+                solved = executor.map(_worker_group, tasks)
+
+            results = [None] * len(block)
+            for entries, group_results in zip(groups.values(), solved):
+                for (i, _), result in zip(entries, group_results):
+                    results[i] = result
+            for (origin, destination), (dist, path_found, error) in zip(block, results):
+                yield origin, destination, dist, path_found, error
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def write_results(results, out, fmt: str = 'jsonl') -> int:
+    '''
+    Escreve os resultados de iter_results em out à medida que são produzidos.
+    jsonl: um objeto {"start", "end", "distance", "path"[, "error"]} por linha.
+    csv: colunas start,end,distance,path,error, com o caminho separado por ";".
+    Retorna o número de pares escritos.
+    '''
+    if fmt not in FORMATS:
+        raise ValueError(f"Output format must be one of {', '.join(FORMATS)}")
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(['start', 'end', 'distance', 'path', 'error'])
+        for start, end, dist, path, error in results:
+            writer.writerow([start, end, '' if dist is None else dist,
+                             '' if path is None else ';'.join(map(str, path)), error or ''])
+            count += 1
+        return count
+
+    for start, end, dist, path, error in results:
+        record = {"start": start, "end": end, "distance": dist, "path": path}
+        if error is not None:
+            record["error"] = error
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def run_batch(graph_path: str, pairs_file, out, fmt: str = 'jsonl', workers: int = 1,
+              compact: bool = False, block_size: int = BLOCK_SIZE, graph=None) -> int:
+    '''
+    Carrega o grafo uma vez (ou usa graph, já carregado de graph_path), lê os
+    pares de pairs_file (arquivo de texto aberto) e escreve os resultados em
+    out. Retorna o número de pares.
+    '''
+    if graph is None:
+        graph = build_graph(graph_path, compact=compact)
+    results = iter_results(graph, read_pairs(pairs_file), workers, block_size,
+                           path=graph_path, compact=compact)
+    return write_results(results, out, fmt)
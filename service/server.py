@@ -0,0 +1,202 @@
+#coding: utf-8
+
+'''
+Servidor de consultas de longa duração.
+
+O grafo é carregado uma única vez e as consultas chegam por TCP, uma por linha,
+em JSON: {"start": "A", "end": "D"}. A resposta é outra linha JSON:
+{"distance": 8.0, "path": ["A", "C", "B", "D"]} (distance e path são null
+quando não há caminho) ou {"error": "..."}. A linha {"stats": true} devolve
+os percentis de latência e os contadores do cache.
+
+As buscas rodam em um pool de processos para não bloquear o laço do asyncio;
+com o método "fork" os processos herdam o grafo já carregado. Resultados
+repetidos são respondidos direto do core.cache.QueryCache, sem ir ao pool, e
+consultas iguais que chegam ao mesmo tempo compartilham uma única busca.
+'''
+
+import asyncio
+import json
+import math
+import multiprocessing
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from core.build_graph import build_graph
+from core.cache import QueryCache
+from core.dijkstra import dijkstra
+
+# grafo usado pelos processos do pool (definido no initializer, em cada processo)
+_WORKER_GRAPH = None
+
+
+def _init_worker(graph, compact: bool):
+    global _WORKER_GRAPH # pylint: disable=global-statement
+    if isinstance(graph, str):
+        graph = build_graph(graph, compact=compact)
+    _WORKER_GRAPH = graph
+
+
+def _worker_search(start, end):
+    return dijkstra(_WORKER_GRAPH, start, end)
+
+
+def percentiles(samples, points=(50, 90, 99)) -> dict:
+    '''
+    Percentis (método nearest-rank) de uma sequência de amostras.
+    Retorna {ponto: valor}, vazio se não houver amostras.
+    '''
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {point: ordered[max(0, math.ceil(point / 100 * len(ordered)) - 1)]
+            for point in points}
+
+
+class QueryServer:
+    '''
+    Responde consultas de caminho mínimo sobre um grafo carregado uma vez.
+    path é o arquivo do grafo (JSON ou compilado); workers é o número de
+    processos de busca. Guarda as latências das últimas latency_window consultas.
+    '''
+
+    def __init__(self, path: str, compact: bool = False, workers: int = 1,
+                 cache_size: int = 4096, latency_window: int = 10000):
+        self.graph = build_graph(path, compact=compact)
+        self.cache = QueryCache(max_entries=cache_size)
+        self.latencies = deque(maxlen=latency_window)   # segundos
+        self.requests = 0
+        self.errors = 0
+        self.searches = 0       # buscas enviadas ao pool
+        self._pending = {}      # (start, end) -> future da busca em andamento
+        self._executor = self._make_executor(path, compact, workers)
+
+    def _make_executor(self, path, compact, workers):
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # com fork os initargs não são serializados: os filhos herdam o grafo
+            # pela memória do processo pai
+            return ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context('fork'),
+                                       initializer=_init_worker, initargs=(self.graph, compact))
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(path, compact))
+
+    async def query(self, start, end) -> dict:
+        '''Resolve uma consulta e retorna o dicionário da resposta.'''
+        result = self.cache.lookup(self.graph, start, end)
+        if result is None:
+            future = self._pending.get((start, end))
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(self._executor, _worker_search, start, end)
+                self.searches += 1
+                self._pending[(start, end)] = future
+                future.add_done_callback(lambda done: self._finish(start, end, done))
+            # shield: se quem espera for cancelado (cliente desconectou), a busca
+            # continua para as outras consultas iguais
+            result = await asyncio.shield(future)
+        dist, path = result
+        if path is None:
+            return {"distance": None, "path": None}
+        return {"distance": dist, "path": path}
+
+    def _finish(self, start, end, future):
+        '''Ao fim de uma busca do pool: tira a busca das pendentes e guarda o resultado.'''
+        del self._pending[(start, end)]
+        if not future.cancelled() and future.exception() is None:
+            self.cache.store(self.graph, start, end, future.result())
+
+    async def respond(self, line: bytes) -> dict:
+        '''Interpreta uma linha de requisição e monta a resposta.'''
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            return {"error": f"Request isn't valid JSON: {exc}"}
+        if not isinstance(request, dict):
+            return {"error": "Request must be a JSON object"}
+        if request.get("stats"):
+            return self.stats()
+        try:
+            return await self.query(request.get("start"), request.get("end"))
+        except (AttributeError, TypeError, ValueError) as exc:
+            return {"error": str(exc)}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        '''Atende uma conexão: uma requisição por linha, respostas na mesma ordem.'''
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                begin = time.perf_counter()
+                response = await self.respond(line)
+                self.requests += 1
+                if "error" in response:
+                    self.errors += 1
+                self.latencies.append(time.perf_counter() - begin)
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stats(self) -> dict:
+        '''Requisições atendidas, buscas executadas, percentis de latência (ms) e contadores do cache.'''
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "searches": self.searches,
+            "latency_ms": {f"p{point}": value * 1000
+                           for point, value in percentiles(self.latencies).items()},
+            "cache": self.cache.cache_info()._asdict(),
+        }
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765, ready=None):
+        '''
+        Atende conexões até ser cancelado. ready(host, port) é chamado quando o
+        socket está aberto (port pode ser 0 para escolher uma porta livre).
+        '''
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(*server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        '''Encerra o pool de processos.'''
+        self._executor.shutdown(cancel_futures=True)
+
+
+def run(path: str, host: str = '127.0.0.1', port: int = 8765, compact: bool = False,
+        workers: int = 1) -> QueryServer:
+    '''
+    Carrega o grafo e atende até receber SIGINT (Ctrl-C) ou SIGTERM. Retorna o
+    servidor, para que o chamador possa imprimir as estatísticas finais.
+    '''
+    server = QueryServer(path, compact=compact, workers=workers)
+
+    def ready(bound_host, bound_port):
+        print(f"Serving on {bound_host}:{bound_port}", flush=True)
+
+    async def serve_until_signal():
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, task.cancel)
+            except NotImplementedError: # Windows: Ctrl-C vira KeyboardInterrupt
+                pass
+        try:
+            await server.serve(host, port, ready)
+        except asyncio.CancelledError:
+            pass
+
+    try:
+        asyncio.run(serve_until_signal())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return server
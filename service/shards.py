@@ -0,0 +1,196 @@
+#coding: utf-8
+
+'''
+Consultas sobre um grafo particionado (core.partition) com as células
+distribuídas entre processos.
+
+Cada shard é um processo com um CellShard que abre apenas as suas células
+(célula i fica no shard i % shards), sob demanda. O coordenador, no processo
+atual, tem apenas o overlay e o índice de células: para uma consulta de s até
+t pede aos shards das células de s e de t as distâncias até as fronteiras,
+faz a busca no overlay e pede aos shards os trechos internos das células para
+montar o caminho. As chamadas a shards diferentes são enviadas antes de
+qualquer resposta ser lida, então os shards trabalham em paralelo.
+'''
+
+import multiprocessing
+import os
+
+from core import graph_file
+from core.partition import OVERLAY_FILE, CellShard, PartitionIndex, overlay_search
+
+_INF = float('inf')
+
+
+def _shard_main(conn, directory: str, cells: list, max_cells: int):
+    '''Laço de um processo shard: recebe (método, argumentos) e responde (erro, resultado).'''
+    shard = CellShard(directory, cells, max_cells)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        method, args = request
+        try:
+            result = getattr(shard, method)(*args)
+        except Exception as exc: # pylint: disable=broad-except
+            # qualquer erro volta para o coordenador; o shard continua atendendo
+            try:
+                conn.send((exc, None))
+            except Exception: # pylint: disable=broad-except
+                conn.send((RuntimeError(f"Shard error: {exc!r}"), None))
+            continue
+        conn.send((None, result))
+    conn.close()
+
+
+class Coordinator:
+    '''
+    Responde consultas sobre o diretório gravado por core.partition.write_partition.
+    Com shards = 0 as células são abertas no próprio processo; com shards > 0
+    cada shard é um processo separado. Use close() (ou with) para encerrá-los.
+    '''
+
+    def __init__(self, directory: str, shards: int = 0, max_cells: int = 64):
+        self.index = PartitionIndex(directory)
+        self.overlay = graph_file.load_graph(os.path.join(directory, OVERLAY_FILE))
+        self.shards = max(0, shards)
+        self._local = None
+        self._connections = []
+        self._processes = []
+        if self.shards == 0:
+            self._local = CellShard(directory, max_cells=max_cells, index=self.index)
+            return
+        for i in range(self.shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_main, daemon=True,
+                args=(child, directory, list(range(i, len(self.index), self.shards)), max_cells))
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        '''Encerra os processos shard.'''
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._connections = []
+        self._processes = []
+
+    def _call(self, calls: list[tuple]) -> list:
+        '''
+        Executa cada (célula, método, argumentos) no shard da célula e retorna
+        os resultados na mesma ordem. Todas as chamadas são enviadas antes de
+        ler as respostas.
+        '''
+        if self._local is not None:
+            return [getattr(self._local, method)(*args) for _, method, args in calls]
+        for cell, method, args in calls:
+            shard = cell % self.shards
+            self._check_alive(shard)
+            try:
+                self._connections[shard].send((method, args))
+            except (BrokenPipeError, OSError) as exc:
+                raise self._stopped(shard) from exc
+        # todas as respostas são lidas antes de lançar um erro, para que a
+        # próxima chamada não receba respostas desta
+        results = []
+        first_error = None
+        for cell, _, _ in calls:
+            shard = cell % self.shards
+            try:
+                error, result = self._connections[shard].recv()
+            except (EOFError, OSError) as exc:
+                error, result = self._stopped(shard), None
+                error.__cause__ = exc
+            if error is not None and first_error is None:
+                first_error = error
+            results.append(result)
+        if first_error is not None:
+            raise first_error
+        return results
+
+    def _check_alive(self, shard: int):
+        '''Lança RuntimeError se o processo do shard terminou.'''
+        if not self._processes[shard].is_alive():
+            raise self._stopped(shard)
+
+    def _stopped(self, shard: int) -> RuntimeError:
+        process = self._processes[shard]
+        process.join(timeout=1)
+        return RuntimeError(f"Shard {shard} is not running (exit code {process.exitcode})")
+
+    def query(self, start, end) -> tuple[float|None, list]:
+        '''(distância, caminho) de start até end, no mesmo formato do dijkstra.'''
+        if start is None or end is None:
+            raise AttributeError("Graph and nodes can't be None")
+        cell_of = self.index.cell_of
+        if start not in cell_of or end not in cell_of:
+            raise ValueError("Graph must contain the specified nodes")
+        if start == end:
+            return 0, [start]
+
+        start_cell, end_cell = cell_of[start], cell_of[end]
+        same_cell = start_cell == end_cell
+        (sources, direct), (targets, _) = self._call([
+            (start_cell, 'boundary_distances', (start_cell, start, False, end if same_cell else None)),
+            (end_cell, 'boundary_distances', (end_cell, end, True, None)),
+        ])
+        best = _INF if direct is None else direct
+        best, overlay_path = overlay_search(self.overlay, sources, targets, best)
+
+        if overlay_path is None:
+            if direct is None:
+                return _INF, None
+            requests = [(start_cell, start, end)]
+        else:
+            # início e fim na célula de start e de end; trechos do overlay
+            # entre nós da mesma célula são arestas da clique dessa célula
+            requests = [(start_cell, start, overlay_path[0])]
+            requests += [(cell_of[u], u, v) for u, v in zip(overlay_path, overlay_path[1:])
+                         if cell_of[u] == cell_of[v]]
+            requests.append((end_cell, overlay_path[-1], end))
+        pieces = self._unpack(requests)
+
+        if overlay_path is None:
+            return best, pieces[0]
+        path = list(pieces[0])
+        piece = 1
+        for u, v in zip(overlay_path, overlay_path[1:]):
+            if cell_of[u] == cell_of[v]:
+                path.extend(pieces[piece][1:])
+                piece += 1
+            else:
+                path.append(v)
+        path.extend(pieces[-1][1:])
+        return best, path
+
+    def _unpack(self, requests: list[tuple]) -> list[list]:
+        '''Caminhos internos de cada (célula, u, v), com uma chamada por shard.'''
+        if self._local is not None:
+            return self._local.cell_paths(requests)
+        groups = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(request[0] % self.shards, []).append((i, request))
+        calls = [(entries[0][1][0], 'cell_paths', ([request for _, request in entries],))
+                 for entries in groups.values()]
+        pieces = [None] * len(requests)
+        for entries, paths in zip(groups.values(), self._call(calls)):
+            for (i, _), path in zip(entries, paths):
+                pieces[i] = path
+        return pieces
@@ -0,0 +1,4 @@
+"""
+Benchmarks do projeto. Os arquivos deste pacote não seguem o padrão test_*.py,
+então não são coletados pelo pytest; cada um é executado com python -m.
+"""
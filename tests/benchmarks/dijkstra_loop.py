@@ -0,0 +1,101 @@
+"""
+Micro-benchmark do laço interno do dijkstra sobre nx.DiGraph.
+
+Compara o laço antigo (neighbors() + get_edge_data() por vizinho) com o laço
+atual (_adj[u].items()) no mesmo grafo aleatório e nos mesmos pares de consulta.
+A validação do grafo fica de fora para medir apenas a busca.
+
+Uso:
+    python -m tests.benchmarks.dijkstra_loop [--nodes 100000] [--edges 1000000]
+                                             [--queries 20] [--seed 42]
+"""
+import argparse
+import heapq
+import random
+import time
+
+import networkx as nx
+
+from core.dijkstra import _dijkstra_nx
+
+
+def legacy_dijkstra(digraph: nx.DiGraph, start, end):
+    """Laço original, mantido aqui apenas como referência de comparação."""
+    pred = {start: None}
+    dist = {start: 0}
+    unvisited = []
+    heapq.heappush(unvisited, (0, start))
+
+    while unvisited:
+        curr_dist, curr_node = heapq.heappop(unvisited)
+
+        if curr_dist > dist.get(curr_node, float('inf')):
+            continue
+        if curr_node == end:
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = pred[node]
+            path.reverse()
+            return curr_dist, path
+
+        for neighbor in digraph.neighbors(curr_node):
+            edge = digraph.get_edge_data(curr_node, neighbor)
+            edge_weight = edge.get("weight", 1)
+            new_dist = curr_dist + edge_weight
+
+            if new_dist < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_dist
+                pred[neighbor] = curr_node
+                heapq.heappush(unvisited, (new_dist, neighbor))
+    return float('inf'), None
+
+
+def random_graph(nodes: int, edges: int, seed: int) -> nx.DiGraph:
+    """Grafo direcionado aleatório com pesos inteiros entre 1 e 100."""
+    rng = random.Random(seed)
+    digraph = nx.DiGraph()
+    digraph.add_nodes_from(range(nodes))
+    added = 0
+    while added < edges:
+        u, v = rng.randrange(nodes), rng.randrange(nodes)
+        if u != v and not digraph.has_edge(u, v):
+            digraph.add_edge(u, v, weight=rng.randint(1, 100))
+            added += 1
+    return digraph
+
+
+def _run(search, digraph, pairs) -> float:
+    begin = time.perf_counter()
+    for start, end in pairs:
+        search(digraph, start, end)
+    return time.perf_counter() - begin
+
+
+def main():
+    """Executa o benchmark e imprime os tempos."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=100_000)
+    parser.add_argument('--edges', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    digraph = random_graph(args.nodes, args.edges, args.seed)
+    rng = random.Random(args.seed + 1)
+    pairs = [(rng.randrange(args.nodes), rng.randrange(args.nodes)) for _ in range(args.queries)]
+
+    for start, end in pairs:
+        assert _dijkstra_nx(digraph, start, end)[0] == legacy_dijkstra(digraph, start, end)[0]
+
+    legacy = _run(legacy_dijkstra, digraph, pairs)
+    current = _run(_dijkstra_nx, digraph, pairs)
+    print(f'graph: {digraph.number_of_nodes()} nodes, {digraph.number_of_edges()} edges')
+    print(f'legacy loop : {legacy:8.3f} s')
+    print(f'current loop: {current:8.3f} s')
+    print(f'speedup     : {legacy / current:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark das filas de prioridade da fronteira do dijkstra (core.frontier).
+
+Para cada formato de grafo mede os laços especializados do dijkstra (heapq
+com remoção preguiçosa e, com pesos inteiros, a fila de Dial) e o laço
+genérico core.frontier.shortest_path com cada fila, nos mesmos pares de
+consulta, e mostra a fila que o dijkstra escolhe com frontier='auto'.
+A validação do grafo fica de fora.
+
+Formatos:
+    grid   grade 2D com arestas nos dois sentidos e pesos inteiros de 1 a 10 (malha viária)
+    sparse aleatório com grau médio 4 e pesos inteiros de 1 a 100
+    dense  aleatório com grau médio 200 e pesos inteiros de 1 a 100
+    float  igual ao sparse, com pesos reais
+
+Uso:
+    python -m tests.benchmarks.frontier [--nodes 40000] [--queries 10] [--seed 42]
+"""
+import argparse
+import math
+import random
+import time
+
+from core import adjacency, frontier
+from core.dijkstra import _dijkstra_dial_nx, _dijkstra_nx, choose_frontier
+from core.tracked_graph import TrackedDiGraph
+
+
+def grid_graph(nodes: int, rng: random.Random) -> TrackedDiGraph:
+    """Grade quadrada de lado sqrt(nodes), arestas nos dois sentidos."""
+    side = max(2, math.isqrt(nodes))
+    digraph = TrackedDiGraph()
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col
+            if col + 1 < side:
+                digraph.add_edge(node, node + 1, weight=rng.randint(1, 10))
+                digraph.add_edge(node + 1, node, weight=rng.randint(1, 10))
+            if row + 1 < side:
+                digraph.add_edge(node, node + side, weight=rng.randint(1, 10))
+                digraph.add_edge(node + side, node, weight=rng.randint(1, 10))
+    return digraph
+
+
+def random_graph(nodes: int, degree: int, rng: random.Random, real: bool = False) -> TrackedDiGraph:
+    """Grafo aleatório com nodes * degree arestas."""
+    digraph = TrackedDiGraph()
+    digraph.add_nodes_from(range(nodes))
+    for _ in range(nodes * degree):
+        u, v = rng.randrange(nodes), rng.randrange(nodes)
+        if u != v:
+            weight = rng.uniform(1, 100) if real else rng.randint(1, 100)
+            digraph.add_edge(u, v, weight=weight)
+    return digraph
+
+
+def _time(search, pairs) -> tuple[float, list]:
+    begin = time.perf_counter()
+    results = [search(start, end)[0] for start, end in pairs]
+    return time.perf_counter() - begin, results
+
+
+def main():
+    """Executa o benchmark e imprime uma tabela por formato de grafo."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=40_000)
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    shapes = {
+        'grid': grid_graph(args.nodes, rng),
+        'sparse': random_graph(args.nodes, 4, rng),
+        'dense': random_graph(max(2, args.nodes // 20), 200, rng),
+        'float': random_graph(args.nodes, 4, rng, real=True),
+    }
+    for shape, digraph in shapes.items():
+        nodes = list(digraph)
+        pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+        integer, max_weight, _ = frontier.edge_profile(digraph)
+        successors = adjacency.successors(digraph)
+
+        print(f'{shape}: {digraph.number_of_nodes()} nodes, {digraph.number_of_edges()} edges, '
+              f'auto -> {choose_frontier(digraph)}')
+        baseline, expected = _time(lambda s, e: _dijkstra_nx(digraph, s, e), pairs)
+        print(f'  {"heap (loop)":12s} {baseline:8.3f} s')
+        if integer:
+            elapsed, results = _time(
+                lambda s, e: _dijkstra_dial_nx(digraph, s, e, max_weight), pairs)
+            assert results == expected
+            print(f'  {"dial (loop)":12s} {elapsed:8.3f} s  ({elapsed / baseline:5.2f}x)')
+        for name in frontier.FRONTIERS:
+            if name == 'dial' and not integer:
+                continue
+            elapsed, results = _time(
+                lambda s, e, name=name: frontier.shortest_path(
+                    successors, s, e, frontier.make_frontier(name, max_weight)), pairs)
+            assert results == expected, name
+            print(f'  {name:12s} {elapsed:8.3f} s  ({elapsed / baseline:5.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Geradores de grafos sintéticos para os benchmarks, com semente fixa.
+
+Os grafos são escritos no formato lido pelo build_graph, aresta por aresta,
+sem montar a lista completa em memória, então servem para arquivos de 10^3 a
+10^7 arestas:
+    {"edges": [["V0", "V1", 12], ...], "coordinates": [["V0", lat, lon], ...]}
+
+Formatos (o número de arestas pedido é aproximado):
+    grid       grade com arestas nos dois sentidos, como uma malha viária
+    geometric  pontos aleatórios ligados aos vizinhos dentro de um raio (grau médio 6)
+    scale-free Barabási-Albert: poucos nós com muitas arestas, como hubs (m = 3)
+
+grid e geometric têm coordenadas e pesos em km inteiros (a distância de
+haversine arredondada para cima, então a heurística do A* continua admissível).
+scale-free não tem coordenadas e tem pesos inteiros de 1 a 100.
+
+Uso:
+    python -m tests.benchmarks.generators grid --edges 1000000 -o /tmp/grid.json [--seed 0]
+"""
+import argparse
+import json
+import math
+import random
+from array import array
+
+from core.heuristics import haversine
+
+# região coberta pelos grafos com coordenadas (graus), aproximadamente o Brasil
+LAT_RANGE = (-30.0, -5.0)
+LON_RANGE = (-55.0, -35.0)
+GEOMETRIC_DEGREE = 6
+SCALE_FREE_M = 3
+WRITE_CHUNK = 10000
+
+
+def _coordinate(x: float, y: float) -> tuple[float, float]:
+    '''Ponto do quadrado unitário -> (lat, lon) dentro da região.'''
+    return (LAT_RANGE[0] + y * (LAT_RANGE[1] - LAT_RANGE[0]),
+            LON_RANGE[0] + x * (LON_RANGE[1] - LON_RANGE[0]))
+
+
+def _km(coord_a: tuple, coord_b: tuple) -> int:
+    return max(1, math.ceil(haversine(coord_a, coord_b)))
+
+
+def grid(edges: int, seed: int = 0):
+    '''
+    Grade de lado sqrt(edges / 4) com pequenas variações nas coordenadas.
+    Retorna (arestas, coordenadas), ambos iteráveis.
+    '''
+    rng = random.Random(seed)
+    side = max(2, math.ceil(math.sqrt(edges / 4)))
+    jitter = 0.3 / side
+    points = []
+    for row in range(side):
+        for col in range(side):
+            points.append(_coordinate(min(1.0, max(0.0, col / (side - 1) + rng.uniform(-jitter, jitter))),
+                                      min(1.0, max(0.0, row / (side - 1) + rng.uniform(-jitter, jitter)))))
+
+    def _edges():
+        for row in range(side):
+            for col in range(side):
+                node = row * side + col
+                for other in ((node + 1) if col + 1 < side else None,
+                              (node + side) if row + 1 < side else None):
+                    if other is not None:
+                        weight = _km(points[node], points[other])
+                        yield [f"V{node}", f"V{other}", weight]
+                        yield [f"V{other}", f"V{node}", weight]
+
+    return _edges(), ([f"V{i}", lat, lon] for i, (lat, lon) in enumerate(points))
+
+
+def geometric(edges: int, seed: int = 0):
+    '''
+    Grafo geométrico aleatório: edges / GEOMETRIC_DEGREE pontos no quadrado
+    unitário, cada par a menos de um raio ligado nos dois sentidos. Os vizinhos
+    são procurados numa grade de células do tamanho do raio.
+    Retorna (arestas, coordenadas), ambos iteráveis.
+    '''
+    rng = random.Random(seed)
+    nodes = max(2, edges // GEOMETRIC_DEGREE)
+    radius = math.sqrt(GEOMETRIC_DEGREE / (math.pi * nodes))
+    xs = array('d', (rng.random() for _ in range(nodes)))
+    ys = array('d', (rng.random() for _ in range(nodes)))
+    cells = {}
+    for i in range(nodes):
+        cells.setdefault((int(xs[i] / radius), int(ys[i] / radius)), []).append(i)
+
+    def _edges():
+        squared = radius * radius
+        for (cx, cy), members in cells.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for j in cells.get((cx + dx, cy + dy), ()):
+                        for i in members:
+                            if i < j and (xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2 <= squared:
+                                weight = _km(_coordinate(xs[i], ys[i]), _coordinate(xs[j], ys[j]))
+                                yield [f"V{i}", f"V{j}", weight]
+                                yield [f"V{j}", f"V{i}", weight]
+
+    coordinates = ([f"V{i}", *_coordinate(xs[i], ys[i])] for i in range(nodes))
+    return _edges(), coordinates
+
+
+def scale_free(edges: int, seed: int = 0):
+    '''
+    Barabási-Albert: cada nó novo se liga a SCALE_FREE_M nós escolhidos com
+    probabilidade proporcional ao grau, nos dois sentidos.
+    Retorna (arestas, None).
+    '''
+    rng = random.Random(seed)
+    m = SCALE_FREE_M
+    nodes = max(m + 1, edges // (2 * m))
+
+    def _edges():
+        repeated = array('l')   # cada nó aparece uma vez por aresta incidente
+        for node in range(m, nodes):
+            if node == m:
+                targets = set(range(m))
+            else:
+                targets = set()
+                while len(targets) < m:
+                    targets.add(repeated[rng.randrange(len(repeated))])
+            for target in targets:
+                weight = rng.randint(1, 100)
+                yield [f"V{node}", f"V{target}", weight]
+                yield [f"V{target}", f"V{node}", weight]
+                repeated.append(target)
+                repeated.append(node)
+
+    return _edges(), None
+
+
+GENERATORS = {
+    'grid': grid,
+    'geometric': geometric,
+    'scale-free': scale_free,
+}
+
+
+def write_graph(path: str, edges, coordinates=None) -> int:
+    '''Escreve as arestas (e as coordenadas) em path aos poucos. Retorna o número de arestas.'''
+    count = 0
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write('{"edges": [')
+        chunk = []
+        for edge in edges:
+            chunk.append(json.dumps(edge))
+            if len(chunk) == WRITE_CHUNK:
+                out.write((',\n' if count else '\n') + ',\n'.join(chunk))
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            out.write((',\n' if count else '\n') + ',\n'.join(chunk))
+            count += len(chunk)
+        out.write('\n]')
+        if coordinates is not None:
+            out.write(',\n"coordinates": [\n')
+            out.write(',\n'.join(json.dumps(entry) for entry in coordinates))
+            out.write('\n]')
+        out.write('}\n')
+    return count
+
+
+def generate(kind: str, edges: int, path: str, seed: int = 0) -> int:
+    '''Gera o grafo kind (ver GENERATORS) com cerca de edges arestas em path.'''
+    if kind not in GENERATORS:
+        raise ValueError(f"Graph kind must be one of {', '.join(GENERATORS)}")
+    return write_graph(path, *GENERATORS[kind](edges, seed))
+
+
+def main():
+    """Gera um arquivo de grafo pela linha de comando."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('kind', choices=list(GENERATORS))
+    parser.add_argument('--edges', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args()
+    count = generate(args.kind, args.edges, args.output, args.seed)
+    print(f'{args.output}: {count} edges')
+
+
+if __name__ == '__main__':
+    main()
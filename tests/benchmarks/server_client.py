@@ -0,0 +1,131 @@
+"""
+Benchmark de vazão do servidor de consultas (main.py --serve).
+
+Abre --concurrency conexões e envia, ao todo, --requests consultas sorteadas
+entre --pairs pares de cidades do grafo (poucos pares repetidos, como no
+tráfego real). Mede a vazão e os percentis de latência vistos pelo cliente e
+imprime as estatísticas do próprio servidor.
+
+Uso:
+    python -m tests.benchmarks.server_client [--json data/dataset.json]
+                                             [--port 8765] [--requests 2000]
+                                             [--concurrency 8] [--pairs 200]
+                                             [--workers 2]
+
+Sem --port, o benchmark inicia o servidor (python main.py --serve) em uma
+porta livre e o encerra no final.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+from core.build_graph import build_graph
+from service.server import percentiles
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+
+async def _client(host: str, port: int, queries: list, latencies: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    for start, end in queries:
+        begin = time.perf_counter()
+        writer.write(json.dumps({"start": start, "end": end}).encode('utf-8') + b'\n')
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - begin)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def _server_stats(host: str, port: int) -> dict:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"stats": true}\n')
+    await writer.drain()
+    stats = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return stats
+
+
+async def measure(host: str, port: int, queries: list, concurrency: int) -> dict:
+    """
+    Envia as consultas divididas entre as conexões e retorna a vazão (req/s),
+    os percentis de latência do cliente (ms) e as estatísticas do servidor.
+    """
+    latencies = []
+    begin = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, queries[i::concurrency], latencies)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - begin
+    return {
+        'requests': len(latencies),
+        'throughput_rps': len(latencies) / elapsed,
+        'latency_ms': {f'p{point}': value * 1000
+                       for point, value in percentiles(latencies).items()},
+        'server': await _server_stats(host, port),
+    }
+
+
+def _spawn_server(json_path: str, workers: int):
+    """Inicia main.py --serve em uma porta livre e retorna (processo, host, porta)."""
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, 'main.py', json_path, '--serve', '--port', '0',
+         '--workers', str(workers)],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Serving on '):
+        process.kill()
+        raise RuntimeError(f'server did not start: {line!r}')
+    host, port = line.split()[-1].rsplit(':', 1)
+    return process, host, int(port)
+
+
+def main() -> int:
+    """Executa o benchmark e imprime o resultado."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--json', default=os.path.join(ROOT, 'data', 'dataset.json'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--pairs', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    nodes = list(build_graph(args.json, compact=True).nodes())
+    pairs = [tuple(rng.sample(nodes, 2)) for _ in range(args.pairs)]
+    queries = [rng.choice(pairs) for _ in range(args.requests)]
+
+    process = None
+    host, port = args.host, args.port
+    if port is None:
+        process, host, port = _spawn_server(os.path.abspath(args.json), args.workers)
+    try:
+        result = asyncio.run(measure(host, port, queries, args.concurrency))
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGINT)
+            process.communicate(timeout=30)
+
+    print(f"{'requests':>16}: {result['requests']}")
+    print(f"{'throughput':>16}: {result['throughput_rps']:8.1f} req/s")
+    for name, value in result['latency_ms'].items():
+        print(f"{'client ' + name:>16}: {value:8.2f} ms")
+    for name, value in result['server']['latency_ms'].items():
+        print(f"{'server ' + name:>16}: {value:8.2f} ms")
+    cache = result['server']['cache']
+    print(f"{'cache':>16}: {cache['hits']} hits, {cache['misses']} misses")
+    print(f"{'searches':>16}: {result['server']['searches']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
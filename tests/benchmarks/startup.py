@@ -0,0 +1,75 @@
+"""
+Benchmark de inicialização da CLI.
+
+Mede, em processos novos, o tempo de `import main` e o tempo de uma primeira
+consulta completa (`python main.py <json> -s X -e Y`).
+
+Uso:
+    python -m tests.benchmarks.startup [--json data/dataset.json] [-s A] [-e D]
+                                       [--repeat 10] [--max-import-ms 500]
+                                       [--max-query-ms 1000]
+
+Com --max-import-ms/--max-query-ms o processo termina com código 1 se a mediana
+ultrapassar o limite, para ser usado como verificação de regressão.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+
+def _time_command(command: list[str], repeat: int) -> list[float]:
+    """Executa o comando repeat vezes e retorna os tempos de parede em ms."""
+    timings = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - begin) * 1000)
+    return timings
+
+
+def measure(json_path: str, start: str, end: str, repeat: int) -> dict:
+    """
+    Retorna as medianas (ms) do interpretador vazio, do import de main e da primeira consulta.
+    """
+    baseline = _time_command([sys.executable, '-c', 'pass'], repeat)
+    imports = _time_command([sys.executable, '-c', 'import main'], repeat)
+    query = _time_command([sys.executable, 'main.py', json_path, '-s', start, '-e', end], repeat)
+    return {
+        'interpreter_ms': statistics.median(baseline),
+        'import_ms': statistics.median(imports),
+        'first_query_ms': statistics.median(query),
+    }
+
+
+def main() -> int:
+    """Executa o benchmark e imprime o resultado."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--json', default=os.path.join('data', 'dataset.json'))
+    parser.add_argument('-s', '--start', default='A')
+    parser.add_argument('-e', '--end', default='D')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--max-import-ms', type=float)
+    parser.add_argument('--max-query-ms', type=float)
+    args = parser.parse_args()
+
+    result = measure(args.json, args.start, args.end, args.repeat)
+    for key, value in result.items():
+        print(f'{key:>16}: {value:8.1f}')
+
+    failed = False
+    if args.max_import_ms is not None and result['import_ms'] > args.max_import_ms:
+        print(f'import time above {args.max_import_ms} ms')
+        failed = True
+    if args.max_query_ms is not None and result['first_query_ms'] > args.max_query_ms:
+        print(f'first query time above {args.max_query_ms} ms')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Suíte de benchmarks sobre grafos sintéticos (tests.benchmarks.generators).
+
+Para cada formato e tamanho gera o arquivo (ou reaproveita o já gerado em
+--workdir) e mede, no processo atual, cada etapa abaixo: o menor tempo de
+parede em --repeat execuções e o pico de memória alocada pelo Python
+(tracemalloc, numa execução à parte para não distorcer o tempo).
+
+    validate_graph_entry  leitura e validação de todas as arestas
+    find_edge_violations  varredura do arquivo em busca de arestas inválidas
+    node_index            índice de nós usado pela validação das consultas
+    build_graph           TrackedDiGraph a partir do JSON
+    build_graph_compact   CSRGraph a partir do JSON
+    has_negative_weight   verificação de pesos sobre o grafo montado
+    dijkstra              uma consulta (média de --queries pares) no TrackedDiGraph
+    dijkstra_compact      o mesmo no CSRGraph
+
+Os resultados são salvos em JSON (--output). Com --baseline, cada etapa é
+comparada com um arquivo de resultados anterior, e o processo termina com
+código 1 se alguma ficar mais de --tolerance mais lenta (etapas abaixo de 1 ms
+são ignoradas, por serem dominadas por ruído).
+
+Uso:
+    python -m tests.benchmarks.suite [--kinds grid,geometric,scale-free]
+                                     [--edges 1000,10000,100000] [--queries 5]
+                                     [--repeat 3] [--seed 0] [--workdir DIR]
+                                     [--no-memory]
+                                     [--output results.json]
+                                     [--baseline old.json] [--tolerance 0.25]
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from core.build_graph import build_graph
+from core.dijkstra import dijkstra
+from tests.benchmarks.generators import GENERATORS, generate
+from util import validator
+
+MIN_COMPARED_SECONDS = 0.001
+
+
+def graph_file(workdir: str, kind: str, edges: int, seed: int) -> str:
+    '''Caminho do arquivo do grafo, gerado apenas se ainda não existir.'''
+    path = os.path.join(workdir, f'{kind}-{edges}-{seed}.json')
+    if not os.path.exists(path):
+        partial = path + '.partial'
+        generate(kind, edges, partial, seed)
+        os.replace(partial, path)
+    return path
+
+
+def _stages(path: str, queries: int, seed: int) -> dict:
+    '''Etapas medidas: nome -> (função sem argumentos, número de repetições internas).'''
+    graph = build_graph(path)
+    compact = build_graph(path, compact=True)
+    rng = random.Random(seed)
+    nodes = list(graph)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+
+    def _node_index():
+        validator._load_node_index.cache_clear() # pylint: disable=protected-access
+        return validator.node_index(path)
+
+    def _queries(digraph):
+        return lambda: [dijkstra(digraph, start, end) for start, end in pairs]
+
+    return {
+        'validate_graph_entry': (lambda: validator.validate_graph_entry(path), 1),
+        'find_edge_violations': (lambda: validator.find_edge_violations(path), 1),
+        'node_index': (_node_index, 1),
+        'build_graph': (lambda: build_graph(path), 1),
+        'build_graph_compact': (lambda: build_graph(path, compact=True), 1),
+        'has_negative_weight': (lambda: validator.has_negative_weight(graph), 1),
+        'dijkstra': (_queries(graph), len(pairs)),
+        'dijkstra_compact': (_queries(compact), len(pairs)),
+    }
+
+
+def measure(function, repeat: int, runs: int, memory: bool) -> tuple[float, float | None]:
+    '''
+    Executa function runs vezes e retorna (menor tempo em segundos dividido
+    por repeat, pico de memória em MiB ou None).
+    '''
+    seconds = float('inf')
+    for _ in range(runs):
+        gc.collect()
+        begin = time.perf_counter()
+        function()
+        seconds = min(seconds, (time.perf_counter() - begin) / repeat)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return seconds, peak
+
+
+def run(kinds, sizes, queries: int, seed: int, workdir: str, runs: int = 3,
+        memory: bool = True) -> list[dict]:
+    '''Executa a suíte e retorna uma lista de resultados, um por grafo e etapa.'''
+    results = []
+    for kind in kinds:
+        for edges in sizes:
+            path = graph_file(workdir, kind, edges, seed)
+            stages = _stages(path, queries, seed)
+            for stage, (function, repeat) in stages.items():
+                seconds, peak = measure(function, repeat, runs, memory)
+                results.append({'graph': kind, 'edges': edges, 'stage': stage,
+                                'seconds': seconds, 'peak_mib': peak})
+                peak_text = '' if peak is None else f' {peak:10.1f} MiB'
+                print(f'{kind:>10} {edges:>10} {stage:>22} {seconds * 1000:12.3f} ms{peak_text}',
+                      flush=True)
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    '''Etapas mais de tolerance mais lentas que no baseline, como mensagens.'''
+    previous = {(r['graph'], r['edges'], r['stage']): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result['graph'], result['edges'], result['stage']))
+        if old is None or old['seconds'] < MIN_COMPARED_SECONDS:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append(f"{result['graph']} {result['edges']} {result['stage']}: "
+                               f"{old['seconds'] * 1000:.3f} ms -> "
+                               f"{result['seconds'] * 1000:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> int:
+    """Executa a suíte, salva os resultados e compara com o baseline."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--kinds', default=','.join(GENERATORS))
+    parser.add_argument('--edges', default='1000,10000,100000')
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'projeto-ia-bench'))
+    parser.add_argument('--no-memory', action='store_true')
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    kinds = args.kinds.split(',')
+    unknown = set(kinds) - set(GENERATORS)
+    if unknown:
+        parser.error(f"unknown graph kinds: {', '.join(sorted(unknown))}")
+    sizes = [int(float(size)) for size in args.edges.split(',')]
+    os.makedirs(args.workdir, exist_ok=True)
+
+    results = run(kinds, sizes, args.queries, args.seed, args.workdir, max(1, args.repeat),
+                  not args.no_memory)
+    if args.output:
+        report = {
+            'meta': {
+                'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'queries': args.queries,
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as out:
+            json.dump(report, out, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as old:
+            regressions = compare(results, json.load(old)['results'], args.tolerance)
+        for message in regressions:
+            print(f'regression: {message}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Testes para o A* (core.astar) e suas heurísticas (core.heuristics).
+Verifica que o A* encontra as mesmas distâncias do dijkstra
+e que as coordenadas dos nós são lidas do JSON.
+"""
+
+import json
+import random
+
+import networkx as nx
+import pytest
+
+from core.astar import astar
+from core.build_graph import build_graph
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra
+from core.heuristics import LandmarkHeuristic, great_circle, haversine
+
+CITIES = {
+    "Campina Grande": (-7.2307, -35.8811),
+    "João Pessoa": (-7.1195, -34.8450),
+    "Recife": (-8.0476, -34.8770),
+    "Patos": (-7.0244, -37.2800),
+    "Caruaru": (-8.2760, -35.9819),
+}
+
+def _geo_json(tmp_path):
+    names = list(CITIES)
+    edges = []
+    for a in names:
+        for b in names:
+            if a != b:
+                # estrada 10% mais longa que a linha reta
+                edges.append([a, b, round(haversine(CITIES[a], CITIES[b]) * 1.1, 1)])
+    edges = [e for e in edges if {e[0], e[1]} != {"Patos", "Recife"}]
+    data = {"edges": edges, "coordinates": [[n, lat, lon] for n, (lat, lon) in CITIES.items()]}
+    json_file = tmp_path / "cities.json"
+    json_file.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(json_file)
+
+def _random_graph(seed):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(40))
+    for _ in range(120):
+        graph.add_edge(rng.randrange(40), rng.randrange(40), weight=rng.randint(0, 30))
+    return graph
+
+def test_build_graph_reads_coordinates(tmp_path):
+    """
+    GIVEN um JSON com a chave coordinates
+    WHEN build_graph for chamado
+    THEN os nós devem ter os atributos lat e lon
+    """
+    path = _geo_json(tmp_path)
+
+    graph = build_graph(path)
+    compact = build_graph(path, compact=True)
+
+    assert graph.nodes["Recife"]["lat"] == CITIES["Recife"][0]
+    assert graph.nodes["Recife"]["lon"] == CITIES["Recife"][1]
+    assert compact.coordinates["Patos"] == CITIES["Patos"]
+
+def test_build_graph_invalid_coordinates(tmp_path):
+    """
+    GIVEN um JSON com latitude fora do intervalo
+    WHEN build_graph for chamado
+    THEN deve lançar ValueError
+    """
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": [["A", "B", 1]], "coordinates": [["A", 95, 0]]}))
+
+    with pytest.raises(ValueError, match="out of range"):
+        build_graph(str(json_file))
+
+def test_astar_great_circle_matches_dijkstra(tmp_path):
+    """
+    GIVEN um grafo de cidades com coordenadas
+    WHEN astar for chamado com a heurística de grande círculo
+    THEN deve retornar a mesma distância do dijkstra para todos os pares
+    """
+    for graph in (build_graph(_geo_json(tmp_path)), build_graph(_geo_json(tmp_path), compact=True)):
+        heuristic = great_circle(graph)
+        for start in CITIES:
+            for end in CITIES:
+                assert astar(graph, start, end, heuristic)[0] == dijkstra(graph, start, end)[0]
+
+def test_astar_landmarks_matches_dijkstra():
+    """
+    GIVEN grafos aleatórios
+    WHEN astar for chamado com a heurística ALT
+    THEN deve retornar as mesmas distâncias do dijkstra, inclusive sem caminho
+    """
+    for seed in range(3):
+        graph = _random_graph(seed)
+        for candidate in (graph, CSRGraph.from_networkx(graph)):
+            heuristic = LandmarkHeuristic(candidate, count=3, seed=seed)
+            for start in range(0, 40, 4):
+                for end in range(40):
+                    assert astar(candidate, start, end, heuristic)[0] == \
+                        dijkstra(graph, start, end)[0]
+
+def test_landmark_heuristic_is_admissible():
+    """
+    GIVEN um grafo aleatório e a heurística ALT
+    WHEN a heurística for avaliada para todos os pares
+    THEN nunca deve superar a distância real
+    """
+    graph = _random_graph(11)
+    heuristic = LandmarkHeuristic(graph, landmarks=[0, 5, 9])
+
+    for start in graph.nodes():
+        for end in graph.nodes():
+            assert heuristic(start, end) <= dijkstra(graph, start, end)[0]
+
+def test_astar_without_heuristic():
+    """
+    GIVEN um grafo simples
+    WHEN astar for chamado sem heurística
+    THEN deve se comportar como o dijkstra
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=4)
+    graph.add_edge("A", "C", weight=2)
+    graph.add_edge("C", "B", weight=1)
+
+    assert astar(graph, "A", "B") == (3, ["A", "C", "B"])
+    assert astar(graph, "B", "A") == (float('inf'), None)
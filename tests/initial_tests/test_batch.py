@@ -0,0 +1,167 @@
+"""
+Testes para as consultas em lote service.batch.
+Garante que cada par recebe o mesmo resultado do dijkstra, na ordem de entrada,
+com uma busca por origem, e que as saídas JSON Lines e CSV são escritas corretamente.
+"""
+
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+
+import networkx as nx
+import pytest
+
+from core import matrix
+from core.dijkstra import dijkstra
+from service import batch
+
+def _graph():
+    rng = random.Random(5)
+    graph = nx.DiGraph()
+    names = [f"N{i}" for i in range(25)]
+    for _ in range(70):
+        u, v = rng.sample(names, 2)
+        graph.add_edge(u, v, weight=rng.randint(1, 9))
+    return graph
+
+def _pairs():
+    rng = random.Random(6)
+    return [(f"N{rng.randrange(25)}", f"N{rng.randrange(25)}") for _ in range(60)]
+
+def _expected(graph, pairs):
+    expected = []
+    for start, end in pairs:
+        dist, path = dijkstra(graph, start, end)
+        expected.append((start, end, None if path is None else dist, path, None))
+    return expected
+
+def test_iter_results_matches_dijkstra(monkeypatch):
+    """
+    GIVEN pares com origens repetidas, divididos em blocos pequenos
+    WHEN iter_results for consumido
+    THEN cada par deve ter o resultado do dijkstra, na ordem, com uma busca por origem e bloco
+    """
+    graph, pairs = _graph(), _pairs()
+    calls = []
+    search = batch.dijkstra_all
+    monkeypatch.setattr(batch, "dijkstra_all",
+                        lambda g, start, targets: calls.append(start) or search(g, start, targets))
+
+    results = list(batch.iter_results(graph, pairs, block_size=20))
+
+    assert results == _expected(graph, pairs)
+    expected_calls = sum(len({start for start, _ in pairs[i:i + 20] if graph.has_node(start)})
+                         for i in range(0, len(pairs), 20))
+    assert len(calls) == expected_calls
+
+def test_iter_results_parallel():
+    """
+    GIVEN os mesmos pares
+    WHEN iter_results for chamado com dois processos
+    THEN o resultado deve ser igual ao sequencial
+    """
+    graph, pairs = _graph(), _pairs()
+
+    assert list(batch.iter_results(graph, pairs, workers=2, block_size=25)) == \
+        _expected(graph, pairs)
+
+def test_interleaved_parallel_runs():
+    """
+    GIVEN dois grafos diferentes
+    WHEN uma matriz e dois lotes com processos forem consumidos intercalados
+    THEN cada um deve usar o próprio grafo, sem alterar o estado do processo atual
+    """
+    graph, pairs = _graph(), _pairs()
+    other = graph.reverse()
+    sources, targets = ["N0", "N3", "N7"], [f"N{i}" for i in range(25)]
+
+    first = batch.iter_results(graph, pairs, workers=2, block_size=10)
+    second = batch.iter_results(other, pairs, workers=2, block_size=10)
+    rows = matrix.iter_rows(other, sources, targets, workers=2, chunksize=1)
+    results = {"first": [], "second": [], "rows": []}
+    for _ in range(len(sources)):
+        results["first"].append(next(first))
+        results["rows"].append(next(rows))
+        results["second"].append(next(second))
+        assert batch._WORKER_GRAPH is None # pylint: disable=protected-access
+        assert matrix._WORKER_GRAPH is None # pylint: disable=protected-access
+    results["first"] += first
+    results["second"] += second
+    results["rows"] += rows
+
+    assert results["first"] == _expected(graph, pairs)
+    assert results["second"] == _expected(other, pairs)
+    assert results["rows"] == [[dijkstra(other, s, t)[0] for t in targets] for s in sources]
+
+def test_missing_nodes():
+    """
+    GIVEN pares com origem ou destino fora do grafo
+    WHEN iter_results for consumido
+    THEN esses pares devem vir com erro e os demais normalmente
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=2)
+
+    results = list(batch.iter_results(graph, [("A", "B"), ("A", "Z"), ("Z", "A"), ("B", "A")]))
+
+    assert results == [
+        ("A", "B", 2, ["A", "B"], None),
+        ("A", "Z", None, None, "Graph must contain the specified nodes"),
+        ("Z", "A", None, None, "Graph must contain the specified nodes"),
+        ("B", "A", None, None, None),
+    ]
+
+def test_run_batch_formats(tmp_path):
+    """
+    GIVEN um arquivo de grafo e um arquivo de pares com comentário e linha em branco
+    WHEN run_batch for chamado em JSON Lines e em CSV
+    THEN cada par deve gerar uma linha de saída
+    """
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": [["A", "B", 4], ["A", "C", 2], ["C", "B", 1]]}))
+    pairs = "# origem,destino\nA,B\n\nC,B\n"
+
+    out = io.StringIO()
+    assert batch.run_batch(str(json_file), io.StringIO(pairs), out) == 2
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {"start": "A", "end": "B", "distance": 3, "path": ["A", "C", "B"]},
+        {"start": "C", "end": "B", "distance": 1, "path": ["C", "B"]},
+    ]
+
+    out = io.StringIO()
+    batch.run_batch(str(json_file), io.StringIO(pairs), out, fmt="csv")
+    assert out.getvalue().splitlines() == [
+        "start,end,distance,path,error", "A,B,3,A;C;B,", "C,B,1,C;B,"]
+
+def test_read_pairs_invalid_line():
+    """
+    GIVEN uma linha com três colunas
+    WHEN read_pairs for consumido
+    THEN deve lançar PairsError (um ValueError) com o número da linha
+    """
+    with pytest.raises(batch.PairsError, match="Line 2"):
+        list(batch.read_pairs(io.StringIO("A,B\nA,B,C\n")))
+
+def test_cli_reports_pairs_errors_on_stderr(tmp_path):
+    """
+    GIVEN um arquivo de pares com uma linha inválida
+    WHEN main.py --batch escrever os resultados em stdout
+    THEN o erro deve sair em stderr como erro do arquivo de pares, com código 1
+    """
+    root = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": [["A", "B", 4]]}))
+    pairs_file = tmp_path / "pairs.csv"
+    pairs_file.write_text("A,B\nA,B,C\n")
+
+    result = subprocess.run([sys.executable, os.path.join(root, "main.py"), str(json_file),
+                             "--batch", str(pairs_file), "--output", "-"],
+                            capture_output=True, text=True, check=False)
+
+    assert result.returncode == 1
+    assert result.stdout == ""
+    assert "The pairs file isn't valid: Line 2" in result.stderr
+    assert "graph" not in result.stderr
@@ -0,0 +1,199 @@
+"""
+Testes para o cache de consultas core.cache.QueryCache.
+Garante que acertos não refazem a busca, que o limite LRU é respeitado
+e que alterações no grafo invalidam os resultados guardados.
+"""
+
+import gc
+import pickle
+
+import networkx as nx
+import pytest
+
+from core.cache import QueryCache
+from core.csr_graph import CSRGraph
+from core.dijkstra import SearchStats, dijkstra
+from core.tracked_graph import TrackedDiGraph
+
+def _graph():
+    graph = TrackedDiGraph()
+    graph.add_edge("A", "B", weight=4)
+    graph.add_edge("A", "C", weight=2)
+    graph.add_edge("C", "B", weight=1)
+    graph.add_edge("B", "D", weight=5)
+    return graph
+
+class _CountingSearch:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, graph, start, end, **kwargs):
+        self.calls += 1
+        return dijkstra(graph, start, end, **kwargs)
+
+def test_repeated_query_hits_cache():
+    """
+    GIVEN um cache na frente do dijkstra
+    WHEN a mesma consulta for feita duas vezes
+    THEN a busca deve rodar uma única vez e o contador de acertos deve subir
+    """
+    search = _CountingSearch()
+    cache = QueryCache(search=search)
+    graph = _graph()
+
+    first = cache(graph, "A", "D")
+    second = cache(graph, "A", "D")
+
+    assert first == second == (8, ["A", "C", "B", "D"])
+    assert search.calls == 1
+    assert cache.cache_info().hits == 1
+    assert cache.cache_info().misses == 1
+
+def test_edge_change_invalidates():
+    """
+    GIVEN um resultado guardado no cache
+    WHEN o peso de uma aresta for alterado ou uma aresta for adicionada
+    THEN a próxima consulta deve refletir o grafo novo
+    """
+    cache = QueryCache()
+    graph = _graph()
+    assert cache(graph, "A", "D")[0] == 8
+
+    graph["B"]["D"]["weight"] = 1
+    assert cache(graph, "A", "D")[0] == 4
+
+    graph.add_edge("A", "D", weight=2)
+    assert cache(graph, "A", "D") == (2, ["A", "D"])
+    assert cache.cache_info().invalidations == 2
+    assert len(cache) == 1
+
+def test_kwargs_are_part_of_the_key():
+    """
+    GIVEN um cache na frente de uma busca cujo resultado depende dos kwargs
+    WHEN duas consultas diferirem só nos kwargs, e uma delas pedir stats
+    THEN cada uma deve ir para a busca e stats deve ser preenchido mesmo após um acerto
+    """
+    def search(graph, start, end, k=1, stats=None):
+        if stats is not None:
+            return dijkstra(graph, start, end, stats=stats)
+        return (k, [start, end])
+
+    cache = QueryCache(search=search)
+    graph = _graph()
+
+    assert cache(graph, "A", "D", k=1) == (1, ["A", "D"])
+    assert cache(graph, "A", "D", k=2) == (2, ["A", "D"])
+    assert cache(graph, "A", "D", k=1) == (1, ["A", "D"])
+    assert cache.cache_info().hits == 1
+
+    stats = SearchStats()
+    assert cache(graph, "A", "D", stats=stats)[0] == 8
+    assert cache(graph, "A", "D", stats=stats)[0] == 8
+    assert stats.searches == 2
+    assert len(cache) == 2
+
+def test_lru_eviction():
+    """
+    GIVEN um cache limitado a duas entradas
+    WHEN três consultas diferentes forem feitas
+    THEN a menos usada recentemente deve ser descartada
+    """
+    search = _CountingSearch()
+    cache = QueryCache(max_entries=2, search=search)
+    graph = _graph()
+
+    cache(graph, "A", "B")
+    cache(graph, "A", "C")
+    cache(graph, "A", "B")
+    cache(graph, "A", "D")
+    cache(graph, "A", "B")
+
+    assert search.calls == 3
+    assert cache.cache_info().evictions == 1
+    assert len(cache) == 2
+
+def test_byte_limit():
+    """
+    GIVEN um cache com limite de bytes menor que um resultado
+    WHEN uma consulta for feita
+    THEN o resultado não deve ser guardado
+    """
+    cache = QueryCache(max_bytes=1)
+
+    assert cache(_graph(), "A", "D")[0] == 8
+    assert cache.cache_info().entries == 0
+    assert cache.cache_info().bytes == 0
+
+def test_untracked_graph_is_not_cached():
+    """
+    GIVEN um nx.DiGraph comum, sem contador de versão
+    WHEN a mesma consulta for feita duas vezes
+    THEN as duas devem ir para a busca
+    """
+    search = _CountingSearch()
+    cache = QueryCache(search=search)
+    graph = nx.DiGraph(_graph())
+
+    cache(graph, "A", "D")
+    cache(graph, "A", "D")
+
+    assert search.calls == 2
+    assert len(cache) == 0
+
+def test_compact_graph_is_cached():
+    """
+    GIVEN um CSRGraph, que é imutável
+    WHEN a mesma consulta for feita duas vezes
+    THEN a segunda deve ser um acerto
+    """
+    cache = QueryCache()
+    graph = CSRGraph.from_networkx(_graph())
+
+    cache(graph, "A", "D")
+    cache(graph, "A", "D")
+
+    assert cache.cache_info().hits == 1
+
+def test_collected_graph_is_forgotten():
+    """
+    GIVEN resultados guardados de um grafo
+    WHEN o grafo deixar de existir
+    THEN os resultados devem sair do cache
+    """
+    cache = QueryCache()
+    graph = _graph()
+    cache(graph, "A", "D")
+
+    del graph
+    gc.collect()
+
+    assert len(cache) == 0
+
+def test_tracked_graph_version():
+    """
+    GIVEN um TrackedDiGraph
+    WHEN ele for alterado, copiado ou serializado
+    THEN a versão deve mudar só nas alterações e as cópias devem continuar rastreadas
+    """
+    graph = _graph()
+    version = graph.version
+    assert graph.reverse(copy=False).version == version
+
+    graph.remove_edge("A", "B")
+    assert graph.version > version
+    assert graph.reverse(copy=False).version == graph.version
+
+    clone = pickle.loads(pickle.dumps(graph))
+    version = clone.version
+    clone["A"]["C"]["weight"] = 7
+    assert clone.version > version
+    assert graph["A"]["C"]["weight"] == 2
+
+def test_invalid_limits():
+    """
+    GIVEN limites não positivos
+    WHEN o cache for criado
+    THEN deve lançar ValueError
+    """
+    with pytest.raises(ValueError):
+        QueryCache(max_entries=0)
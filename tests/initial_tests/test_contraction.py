@@ -0,0 +1,90 @@
+"""
+Testes para as Contraction Hierarchies (core.contraction).
+Verifica que as consultas na hierarquia retornam as mesmas distâncias do dijkstra,
+que os atalhos são desfeitos em caminhos válidos e que o arquivo gravado pode ser relido.
+"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from core.contraction import ContractionHierarchy
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra
+
+def _random_graph(seed, nodes=40, edges=120):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(nodes))
+    for _ in range(edges):
+        graph.add_edge(rng.randrange(nodes), rng.randrange(nodes), weight=rng.randint(0, 30))
+    return graph
+
+def _assert_same_as_dijkstra(hierarchy, graph):
+    for start in graph.nodes():
+        for end in graph.nodes():
+            dist, path = hierarchy.query(start, end)
+            assert dist == dijkstra(graph, start, end)[0]
+            if path is not None:
+                assert path[0] == start and path[-1] == end
+                assert sum(graph[u][v]["weight"] for u, v in zip(path, path[1:])) == dist
+
+def test_contraction_matches_dijkstra():
+    """
+    GIVEN grafos aleatórios
+    WHEN a hierarquia for construída e consultada para todos os pares
+    THEN as distâncias devem ser iguais às do dijkstra e os caminhos devem ser válidos
+    """
+    for seed in range(3):
+        graph = _random_graph(seed)
+        _assert_same_as_dijkstra(ContractionHierarchy.build(graph), graph)
+
+def test_contraction_small_witness_limit():
+    """
+    GIVEN um limite de busca por testemunha muito pequeno
+    WHEN a hierarquia for construída a partir de um CSRGraph
+    THEN as consultas continuam corretas (apenas com atalhos a mais)
+    """
+    graph = _random_graph(5)
+    hierarchy = ContractionHierarchy.build(CSRGraph.from_networkx(graph), settle_limit=1)
+
+    _assert_same_as_dijkstra(hierarchy, graph)
+
+def test_contraction_save_and_load(tmp_path):
+    """
+    GIVEN uma hierarquia construída
+    WHEN ela for gravada e carregada de novo
+    THEN as consultas devem retornar os mesmos resultados
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("Campina Grande", "João Pessoa", weight=125)
+    graph.add_edge("João Pessoa", "Recife", weight=120)
+    graph.add_edge("Campina Grande", "Recife", weight=300)
+    graph.add_edge("Patos", "Campina Grande", weight=180)
+    hierarchy = ContractionHierarchy.build(graph)
+    path = str(tmp_path / "graph.ch")
+
+    hierarchy.save(path)
+    loaded = ContractionHierarchy.load(path)
+
+    assert loaded.query("Patos", "Recife") == hierarchy.query("Patos", "Recife")
+    assert loaded.query("Patos", "Recife") == (425, ["Patos", "Campina Grande",
+                                                      "João Pessoa", "Recife"])
+    assert loaded.query("Recife", "Patos") == (float('inf'), None)
+
+def test_contraction_invalid_nodes():
+    """
+    GIVEN uma hierarquia construída
+    WHEN a consulta usar nós inexistentes ou None
+    THEN deve lançar as mesmas exceções do dijkstra
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=1)
+    hierarchy = ContractionHierarchy.build(graph)
+
+    with pytest.raises(ValueError):
+        hierarchy.query("A", "Z")
+    with pytest.raises(AttributeError):
+        hierarchy.query(None, "A")
+    assert hierarchy.query("A", "A") == (0, ["A"])
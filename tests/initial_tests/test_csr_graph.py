@@ -0,0 +1,93 @@
+"""
+Testes para a representação compacta core.csr_graph.CSRGraph.
+Verifica a construção a partir do JSON e do networkx e
+que o dijkstra produz os mesmos resultados nas duas representações.
+"""
+
+import json
+import networkx as nx
+
+from core.build_graph import build_graph
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra
+
+def _sample_graph():
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=10)
+    graph.add_edge("A", "C", weight=17)
+    graph.add_edge("A", "D", weight=10)
+    graph.add_edge("B", "C", weight=5)
+    graph.add_edge("B", "E", weight=7)
+    graph.add_edge("C", "F", weight=3)
+    graph.add_edge("C", "H", weight=4)
+    graph.add_edge("D", "F", weight=10)
+    graph.add_edge("E", "G", weight=12)
+    graph.add_edge("E", "H", weight=12)
+    graph.add_edge("F", "H", weight=7)
+    graph.add_edge("F", "I", weight=10)
+    graph.add_edge("G", "J", weight=7)
+    graph.add_edge("H", "I", weight=3)
+    graph.add_edge("H", "J", weight=2)
+    graph.add_edge("I", "J", weight=5)
+    return graph
+
+def test_build_graph_compact(tmp_path):
+    """
+    GIVEN um conjunto de arestas válido
+    WHEN build_graph for chamado com compact=True
+    THEN deve retornar um CSRGraph com os mesmos nós, arestas e pesos
+    """
+    data = {"edges": [["A", "B", 5], ["B", "C", 2], ["C", "D", 1], ["A", "C", 9]]}
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps(data))
+
+    graph = build_graph(str(json_file), compact=True)
+
+    assert isinstance(graph, CSRGraph)
+    assert graph.nodes() == ["A", "B", "C", "D"]
+    assert graph.number_of_edges() == 4
+    assert graph["A"]["B"]["weight"] == 5
+    assert graph["A"]["C"]["weight"] == 9
+    assert list(graph.neighbors("A")) == ["B", "C"]
+    assert not graph.has_edge("D", "A")
+
+def test_csr_repeated_edge_keeps_last_weight():
+    """
+    GIVEN arestas repetidas entre o mesmo par de nós
+    WHEN o CSRGraph for construído
+    THEN deve manter apenas uma aresta com o último peso, como o nx.DiGraph
+    """
+    graph = CSRGraph.from_edges([("A", "B", 5), ("A", "C", 1), ("A", "B", 2)])
+
+    assert graph.number_of_edges() == 2
+    assert list(graph.weighted_successors("A")) == [("B", 2), ("C", 1)]
+
+def test_csr_from_networkx_keeps_isolated_nodes():
+    """
+    GIVEN um nx.DiGraph com um nó isolado
+    WHEN from_networkx for chamado
+    THEN o nó isolado deve continuar no grafo compacto
+    """
+    graph = _sample_graph()
+    graph.add_node("Z")
+
+    compact = CSRGraph.from_networkx(graph)
+
+    assert compact.nodes() == list(graph.nodes())
+    assert set(compact.edges()) == set(graph.edges())
+
+def test_dijkstra_csr_matches_networkx():
+    """
+    GIVEN o mesmo grafo como nx.DiGraph e como CSRGraph
+    WHEN dijkstra for chamado para todos os pares de nós
+    THEN as distâncias devem ser iguais nas duas representações
+    """
+    graph = _sample_graph()
+    compact = CSRGraph.from_networkx(graph)
+
+    for start in graph.nodes():
+        for end in graph.nodes():
+            assert dijkstra(compact, start, end)[0] == dijkstra(graph, start, end)[0]
+
+    assert dijkstra(compact, "A", "J") == (21, ['A', 'B', 'C', 'H', 'J'])
+    assert dijkstra(compact, "B", "D") == (float('inf'), None)
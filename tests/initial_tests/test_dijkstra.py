@@ -4,10 +4,13 @@ Verifica se os caminhos estão sendo calculados corretamente
 e se está lidando corretamente com os paramentros passados.
 """
 
+import random
+
 import networkx as nx
 import pytest
 
-from core.dijkstra import dijkstra
+from core.csr_graph import CSRGraph
+from core.dijkstra import SearchStats, dijkstra, dijkstra_all
 
 def test_dijkstra_with_graph_none():
     """
@@ -340,3 +343,122 @@ def test_dijkstra_bottleneck_path_ignored():
     result = dijkstra(graph, "S", "Z")
 
     assert result == (30, ["S", "C", "D", "E", "F", "Z"])
+
+def test_dijkstra_bidirectional_matches_unidirectional():
+    """
+    GIVEN grafos aleatórios, como nx.DiGraph e como CSRGraph
+    WHEN dijkstra for chamado com bidirectional=True
+    THEN as distâncias devem ser iguais às da busca unidirecional
+    e o caminho retornado deve ter exatamente essa distância
+    """
+    rng = random.Random(7)
+    for _ in range(5):
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(30))
+        for _ in range(90):
+            graph.add_edge(rng.randrange(30), rng.randrange(30), weight=rng.randint(0, 20))
+        compact = CSRGraph.from_networkx(graph)
+
+        for start in range(0, 30, 3):
+            for end in range(30):
+                expected, _ = dijkstra(graph, start, end)
+                for candidate in (graph, compact):
+                    dist, path = dijkstra(candidate, start, end, bidirectional=True)
+                    assert dist == expected
+                    if path is not None:
+                        assert path[0] == start and path[-1] == end
+                        assert sum(graph[u][v]["weight"] for u, v in zip(path, path[1:])) == dist
+
+def test_dijkstra_bidirectional_inexistent_path():
+    """
+    GIVEN um grafo onde não existe caminho entre os nós
+    WHEN dijkstra for chamado com bidirectional=True
+    THEN deve retornar a tupla (float('inf'), None)
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=10)
+    graph.add_edge("C", "B", weight=5)
+
+    assert dijkstra(graph, "A", "C", bidirectional=True) == (float('inf'), None)
+    assert dijkstra(graph, "A", "B", bidirectional=True) == (10, ["A", "B"])
+
+def test_dijkstra_all_matches_point_to_point():
+    """
+    GIVEN um grafo aleatório, como nx.DiGraph e como CSRGraph
+    WHEN dijkstra_all for chamado a partir de um nó
+    THEN a árvore deve ter as mesmas distâncias do dijkstra para cada destino
+    e caminhos reconstruídos com exatamente essas distâncias
+    """
+    rng = random.Random(3)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(30))
+    for _ in range(80):
+        graph.add_edge(rng.randrange(30), rng.randrange(30), weight=rng.randint(0, 20))
+
+    for candidate in (graph, CSRGraph.from_networkx(graph)):
+        tree = dijkstra_all(candidate, 0)
+        for end in range(30):
+            dist, path = tree.result(end)
+            assert dist == dijkstra(graph, 0, end)[0]
+            assert (end in tree) == (path is not None)
+            if path is not None:
+                assert path[0] == 0 and path[-1] == end
+                assert sum(graph[u][v]["weight"] for u, v in zip(path, path[1:])) == dist
+
+def test_dijkstra_all_unreachable():
+    """
+    GIVEN um grafo onde alguns nós não são alcançáveis a partir da origem
+    WHEN dijkstra_all for chamado
+    THEN esses nós devem ter distância infinita e caminho None
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=4)
+    graph.add_edge("C", "A", weight=1)
+
+    tree = dijkstra_all(graph, "A")
+
+    assert tree.dist == {"A": 0, "B": 4}
+    assert tree.path("B") == ["A", "B"]
+    assert tree.result("C") == (float('inf'), None)
+    assert tree.path("A") == ["A"]
+
+def test_dijkstra_stats_counts_search():
+    """
+    GIVEN um grafo aleatório, como nx.DiGraph e como CSRGraph, e um SearchStats
+    WHEN dijkstra for chamado com stats para vários destinos
+    THEN o resultado deve ser igual ao da busca sem stats e os contadores
+    devem somar as buscas de forma coerente
+    """
+    rng = random.Random(9)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(30))
+    for _ in range(90):
+        graph.add_edge(rng.randrange(30), rng.randrange(30), weight=rng.randint(0, 20))
+
+    for candidate in (graph, CSRGraph.from_networkx(graph)):
+        stats = SearchStats()
+        for end in range(30):
+            before = stats.as_dict()
+            assert dijkstra(candidate, 0, end, stats=stats) == dijkstra(graph, 0, end)
+            settled = stats.settled - before["settled"]
+            popped = settled + stats.stale_pops - before["stale_pops"]
+            assert 1 <= settled <= 30
+            assert popped <= stats.pushes - before["pushes"]
+            assert stats.relaxed - before["relaxed"] <= 90
+        assert stats.searches == 30
+        assert 1 <= stats.peak_frontier <= stats.pushes
+        assert all(stats.as_dict()[name] >= 0 for name in SearchStats.TIMINGS)
+
+def test_dijkstra_stats_only_unidirectional_heap():
+    """
+    GIVEN um SearchStats
+    WHEN dijkstra for chamado com stats e bidirectional=True ou outra fila
+    THEN deve lançar ValueError
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=1)
+
+    with pytest.raises(ValueError):
+        dijkstra(graph, "A", "B", bidirectional=True, stats=SearchStats())
+    with pytest.raises(ValueError):
+        dijkstra(graph, "A", "B", frontier="pairing", stats=SearchStats())
@@ -0,0 +1,101 @@
+"""
+Testes para os caminhos mínimos dinâmicos core.dynamic.
+Compara as árvores reparadas depois de cada alteração com uma busca refeita do zero.
+"""
+
+import json
+import random
+
+import pytest
+
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra_all
+from core.dynamic import DynamicShortestPaths, read_delta
+from core.tracked_graph import TrackedDiGraph
+
+def _random_graph(rng, nodes=40, edges=120):
+    graph = TrackedDiGraph()
+    names = [f"N{i}" for i in range(nodes)]
+    for _ in range(edges):
+        u, v = rng.sample(names, 2)
+        graph.add_edge(u, v, weight=rng.randint(0, 10))
+    return graph, names
+
+def _check(dynamic):
+    for source, tree in dynamic.trees.items():
+        fresh = dijkstra_all(dynamic.graph, source)
+        assert tree.dist == fresh.dist
+        for node in tree.dist:
+            path = tree.path(node)
+            assert path[0] == source
+            assert sum(dynamic.graph[a][b]["weight"] for a, b in zip(path, path[1:])) == \
+                tree.dist[node]
+
+def test_random_updates_match_recomputation():
+    """
+    GIVEN árvores de várias origens sobre um grafo aleatório com pesos zero
+    WHEN arestas forem inseridas, encurtadas, alongadas e removidas
+    THEN as árvores reparadas devem ser iguais às recalculadas do zero
+    """
+    rng = random.Random(11)
+    graph, names = _random_graph(rng)
+    dynamic = DynamicShortestPaths(graph)
+    for source in names[:5]:
+        dynamic.tree(source)
+
+    for _ in range(300):
+        edges = list(graph.edges())
+        action = rng.random()
+        if action < 0.3 and len(edges) > 1:
+            dynamic.remove_edge(*rng.choice(edges))
+        elif action < 0.7 and edges:
+            u, v = rng.choice(edges)
+            dynamic.set_edge(u, v, rng.randint(0, 12))
+        else:
+            u, v = rng.sample(names, 2)
+            dynamic.set_edge(u, v, rng.randint(0, 12))
+        _check(dynamic)
+
+def test_query_and_delta_file(tmp_path):
+    """
+    GIVEN um grafo com o caminho A -> C -> B -> D
+    WHEN um arquivo delta remover C -> B e encurtar A -> B
+    THEN a consulta deve usar o novo caminho sem recalcular a árvore inteira
+    """
+    graph = TrackedDiGraph()
+    graph.add_weighted_edges_from([("A", "B", 4), ("A", "C", 2), ("C", "B", 1), ("B", "D", 5)])
+    dynamic = DynamicShortestPaths(graph)
+    assert dynamic.query("A", "D") == (8, ["A", "C", "B", "D"])
+
+    delta = tmp_path / "delta.json"
+    delta.write_text(json.dumps({"remove": [["C", "B"]], "set": [["A", "B", 3]]}))
+    dynamic.apply_delta(str(delta))
+
+    assert dynamic.query("A", "D") == (8, ["A", "B", "D"])
+    assert not graph.has_edge("C", "B")
+
+def test_invalid_delta(tmp_path):
+    """
+    GIVEN arquivos delta com peso negativo, aresta mal formada ou chave desconhecida
+    WHEN read_delta for chamado
+    THEN deve lançar ValueError
+    """
+    delta = tmp_path / "delta.json"
+    for content in ({"set": [["A", "B", -1]]}, {"remove": [["A"]]}, {"add": []}):
+        delta.write_text(json.dumps(content))
+        with pytest.raises(ValueError):
+            read_delta(str(delta))
+
+def test_remove_missing_edge_and_compact_graph():
+    """
+    GIVEN um grafo sem a aresta B -> A e um CSRGraph
+    WHEN a aresta for removida ou o CSRGraph for usado
+    THEN deve lançar ValueError
+    """
+    graph = TrackedDiGraph()
+    graph.add_edge("A", "B", weight=1)
+
+    with pytest.raises(ValueError, match="Edge B -> A not found"):
+        DynamicShortestPaths(graph).remove_edge("B", "A")
+    with pytest.raises(ValueError):
+        DynamicShortestPaths(CSRGraph.from_networkx(graph))
@@ -0,0 +1,131 @@
+"""
+Testes para o leitor incremental util.edge_stream.
+Garante que o array "edges" é lido corretamente em blocos pequenos
+e que erros de formato continuam sendo reportados.
+"""
+
+import json
+import pytest
+
+from util.edge_stream import iter_edge_blocks, iter_edges
+from util.validator import find_edge_violations, iter_valid_edges
+
+def test_iter_edges_small_chunks(tmp_path):
+    """
+    GIVEN um arquivo com várias arestas e pesos com vários dígitos
+    WHEN iter_edges for chamado com blocos de 1 e 3 caracteres
+    THEN deve produzir exatamente as arestas do arquivo
+    """
+    edges = [["Campina Grande", "João Pessoa", 125.5], ["A", "B", 12345], ["B", "A", 0]]
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"name": {"x": [1, 2]}, "edges": edges}, ensure_ascii=False),
+                         encoding="utf-8")
+
+    for chunk_size in (1, 3):
+        assert list(iter_edges(str(json_file), chunk_size=chunk_size)) == edges
+
+def test_iter_edges_extras(tmp_path):
+    """
+    GIVEN um arquivo com outras chaves além de "edges"
+    WHEN iter_edges for chamado com um dicionário extras
+    THEN as outras chaves devem ser preenchidas no dicionário
+    """
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": [["A", "B", 1]], "version": 2}))
+
+    extras = {}
+    assert list(iter_edges(str(json_file), extras, chunk_size=4)) == [["A", "B", 1]]
+    assert extras == {"version": 2}
+
+def test_iter_edges_extra_data(tmp_path):
+    """
+    GIVEN um arquivo com conteúdo após o objeto principal
+    WHEN iter_edges for consumido
+    THEN deve lançar json.JSONDecodeError
+    """
+    json_file = tmp_path / "graph.json"
+    json_file.write_text('{"edges": [["A", "B", 1]]} []')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_edges(str(json_file)))
+
+def test_iter_edges_missing_delimiter(tmp_path):
+    """
+    GIVEN um arquivo com arestas sem vírgula entre elas
+    WHEN iter_edges for consumido
+    THEN deve lançar json.JSONDecodeError
+    """
+    json_file = tmp_path / "graph.json"
+    json_file.write_text('{"edges": [["A", "B", 1] ["B", "C", 2]]}')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_edges(str(json_file), chunk_size=2))
+
+def test_iter_valid_edges_empty(tmp_path):
+    """
+    GIVEN um arquivo sem a chave "edges"
+    WHEN iter_valid_edges for consumido
+    THEN deve lançar ValueError de grafo vazio
+    """
+    json_file = tmp_path / "graph.json"
+    json_file.write_text('{"other": []}')
+
+    with pytest.raises(ValueError, match="Graph can't be empty"):
+        list(iter_valid_edges(str(json_file)))
+
+def test_iter_edge_blocks_tricky_elements(tmp_path):
+    """
+    GIVEN arestas com "]," dentro dos nomes, elementos aninhados e o array
+          seguido de outras chaves, com e sem indentação
+    WHEN iter_edge_blocks for consumido com vários tamanhos de bloco
+    THEN os elementos devem ser os mesmos do json.load, na mesma ordem
+    """
+    edges = [["A", "B", 1]] * 50 + [["x],[", "y", 2], [["A"], "B", 1], {"a": [1]}, 5,
+                                     ["C", "D"], ["E", "F", 3.5]] + [["G", "H", 1]] * 50
+    document = {"edges": edges, "coordinates": [["A", 1, 2], ["B", 3, 4]]}
+    json_file = tmp_path / "graph.json"
+
+    for indent in (None, 2):
+        json_file.write_text(json.dumps(document, indent=indent))
+        for chunk_size in (1, 7, 64, 1 << 16):
+            extras = {}
+            blocks = list(iter_edge_blocks(str(json_file), extras, chunk_size=chunk_size))
+            assert [edge for block in blocks for edge in block] == edges
+            assert extras == {"coordinates": document["coordinates"]}
+
+def test_iter_edge_blocks_decodes_runs(tmp_path):
+    """
+    GIVEN um arquivo com muitas arestas simples
+    WHEN iter_edge_blocks for consumido
+    THEN as arestas devem vir em blocos grandes, não uma a uma
+    """
+    edges = [[f"N{i}", f"N{i + 1}", i] for i in range(1000)]
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": edges}))
+
+    blocks = list(iter_edge_blocks(str(json_file)))
+
+    assert [edge for block in blocks for edge in block] == edges
+    assert len(blocks) < 10
+
+def test_find_edge_violations(tmp_path):
+    """
+    GIVEN um arquivo com várias arestas inválidas
+    WHEN find_edge_violations for chamado
+    THEN deve devolver o índice e a mensagem de cada uma, na ordem, até o limite
+    """
+    edges = [["A", "B", 1], ["", "B", 1], ["A", "B", -2], ["A", "B", "x"],
+             ["C", "C", 4], ["A", "B", True], ["A", "B"], ["A", "B", 3]]
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": edges}))
+
+    violations = find_edge_violations(str(json_file))
+
+    assert [index for index, _ in violations] == [1, 2, 3, 4, 6]
+    assert violations[0][1] == "The value of vertixA is empty"
+    assert violations[1][1] == "The value of Weight between A and B needs to be positive"
+    assert "not enough values to unpack" in violations[4][1]
+    assert find_edge_violations(str(json_file), limit=2) == violations[:2]
+
+    json_file.write_text(json.dumps({"edges": [["A", "B", 1]]}))
+    assert find_edge_violations(str(json_file)) == []
@@ -0,0 +1,134 @@
+"""
+Testes para as filas de prioridade core.frontier e a escolha da fila no dijkstra.
+Garante que todas as filas removem os nós em ordem de prioridade, que o dijkstra
+dá o mesmo resultado com qualquer fila e que frontier='auto' segue os pesos do grafo.
+"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from core import frontier
+from core.csr_graph import CSRGraph
+from core.dijkstra import choose_frontier, dijkstra
+from core.tracked_graph import TrackedDiGraph
+
+def _random_graph(rng, nodes=60, edges=240, real=False):
+    graph = TrackedDiGraph()
+    names = [f"N{i}" for i in range(nodes)]
+    for _ in range(edges):
+        u, v = rng.sample(names, 2)
+        graph.add_edge(u, v, weight=rng.uniform(0, 10) if real else rng.randint(0, 10))
+    return graph, names
+
+@pytest.mark.parametrize("name", ["heap", "indexed", "pairing"])
+def test_queues_pop_in_priority_order(name):
+    """
+    GIVEN uma sequência aleatória de inserções, reduções de prioridade e remoções
+    WHEN a fila for usada
+    THEN cada pop deve retornar o nó de menor prioridade atual
+    """
+    rng = random.Random(3)
+    queue = frontier.make_frontier(name)
+    expected = {}
+    for _ in range(2000):
+        if expected and rng.random() < 0.3:
+            priority, node = queue.pop()
+            assert priority == min(expected.values())
+            assert expected.pop(node) == priority
+        else:
+            node, priority = rng.randrange(200), rng.randint(0, 1000)
+            improved = priority < expected.get(node, float('inf'))
+            assert queue.push(node, priority) == improved
+            if improved:
+                expected[node] = priority
+        assert len(queue) == len(expected)
+    while queue:
+        priority, node = queue.pop()
+        assert expected.pop(node) == priority
+    assert not expected
+
+def test_bucket_queue_monotone_pops():
+    """
+    GIVEN uma fila de Dial com pesos até 5 e inserções que respeitam a ordem do dijkstra
+    WHEN os nós forem removidos
+    THEN as prioridades devem sair em ordem, inclusive depois de dar a volta nos baldes
+    """
+    rng = random.Random(4)
+    queue = frontier.BucketQueue(5)
+    queue.push("S", 0)
+    popped = []
+    while queue:
+        priority, _ = queue.pop()
+        popped.append(priority)
+        if len(popped) < 300:
+            for _ in range(2):
+                queue.push(f"N{len(popped)}-{rng.random()}", priority + rng.randint(0, 5))
+    assert popped == sorted(popped)
+    with pytest.raises(IndexError):
+        queue.pop()
+
+@pytest.mark.parametrize("name", ["heap", "indexed", "dial", "pairing"])
+def test_dijkstra_frontiers_match(name):
+    """
+    GIVEN um grafo aleatório com pesos inteiros (inclusive zero), nx e CSR
+    WHEN o dijkstra for chamado com cada fila
+    THEN distâncias devem ser iguais às da fila padrão e os caminhos devem somar a distância
+    """
+    rng = random.Random(5)
+    graph, names = _random_graph(rng)
+    compact = CSRGraph.from_networkx(graph)
+    for _ in range(40):
+        start, end = rng.sample(names, 2)
+        expected, _ = dijkstra(graph, start, end, frontier="heap")
+        for digraph in (graph, compact):
+            dist, path = dijkstra(digraph, start, end, frontier=name)
+            assert dist == expected
+            if path is not None:
+                assert sum(graph[a][b]["weight"] for a, b in zip(path, path[1:])) == dist
+
+def test_auto_follows_weights():
+    """
+    GIVEN grafos com pesos inteiros, com peso real, sem versão e compacto
+    WHEN choose_frontier for chamado
+    THEN só o TrackedDiGraph com pesos inteiros deve usar a fila de Dial
+    """
+    rng = random.Random(6)
+    graph, _ = _random_graph(rng)
+    assert choose_frontier(graph) == "dial"
+    assert choose_frontier(nx.DiGraph(graph)) == "heap"
+    assert choose_frontier(CSRGraph.from_networkx(graph)) == "heap"
+
+    u, v = next(iter(graph.edges()))
+    graph[u][v]["weight"] = 2.5
+    assert choose_frontier(graph) == "heap"
+    assert frontier.edge_profile(graph) == (False, 10, graph.number_of_edges())
+
+def test_auto_avoids_dial_with_large_weights():
+    """
+    GIVEN caminhos longos com pesos inteiros grandes (metros) ou grandes para o grau médio
+    WHEN choose_frontier e o dijkstra com 'auto' forem chamados
+    THEN deve ser escolhido o heap, com o mesmo resultado da fila de Dial
+    """
+    for weight in (60000, 40):
+        graph = TrackedDiGraph()
+        for i in range(50):
+            graph.add_edge(f"c{i}", f"c{i + 1}", weight=weight)
+
+        assert choose_frontier(graph) == "heap"
+        assert dijkstra(graph, "c0", "c50") == dijkstra(graph, "c0", "c50", frontier="dial")
+
+def test_invalid_frontier():
+    """
+    GIVEN um grafo com peso real
+    WHEN o dijkstra for chamado com a fila de Dial ou com uma fila desconhecida
+    THEN deve lançar ValueError
+    """
+    graph = TrackedDiGraph()
+    graph.add_edge("A", "B", weight=1.5)
+
+    with pytest.raises(ValueError, match="integer weights"):
+        dijkstra(graph, "A", "B", frontier="dial")
+    with pytest.raises(ValueError, match="Frontier must be one of"):
+        dijkstra(graph, "A", "B", frontier="fibonacci")
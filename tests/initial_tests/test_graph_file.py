@@ -0,0 +1,89 @@
+"""
+Testes para o formato binário compilado core.graph_file.
+Verifica a ida e volta JSON -> binário -> CSRGraph e a detecção feita por build_graph.
+"""
+
+import json
+import os
+import pytest
+
+from core.build_graph import build_graph
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra
+from core.graph_file import compile_graph, compiled_path, load_graph
+
+def _write_json(tmp_path, edges):
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": edges}, ensure_ascii=False), encoding="utf-8")
+    return str(json_file)
+
+def test_compile_and_load_round_trip(tmp_path):
+    """
+    GIVEN um JSON de arestas válido
+    WHEN o grafo for compilado e carregado com load_graph
+    THEN deve ter os mesmos nós, arestas e distâncias do JSON
+    """
+    edges = [["Campina Grande", "João Pessoa", 125], ["João Pessoa", "Recife", 120],
+             ["Campina Grande", "Recife", 300], ["Patos", "Campina Grande", 180]]
+    path = _write_json(tmp_path, edges)
+
+    out_path = compile_graph(path)
+    graph = load_graph(out_path)
+
+    assert out_path == str(tmp_path / "graph.graph")
+    assert isinstance(graph, CSRGraph)
+    assert graph.nodes() == ["Campina Grande", "João Pessoa", "Recife", "Patos"]
+    assert graph.number_of_edges() == 4
+    assert graph.has_node("Patos") and not graph.has_node("Natal")
+    assert dijkstra(graph, "Patos", "Recife") == (425, ["Patos", "Campina Grande",
+                                                        "João Pessoa", "Recife"])
+
+def test_load_numeric_node_names(tmp_path):
+    """
+    GIVEN nós representados como números
+    WHEN o grafo for compilado e carregado
+    THEN os nós devem manter o tipo numérico
+    """
+    path = _write_json(tmp_path, [[1, 2, 10], [2, 3, 5]])
+
+    graph = load_graph(compile_graph(path))
+
+    assert graph.nodes() == [1, 2, 3]
+    assert graph.has_node(2) and not graph.has_node("2")
+    assert graph[1][2]["weight"] == 10
+
+def test_build_graph_detects_compiled_file(tmp_path):
+    """
+    GIVEN um JSON com o arquivo compilado atualizado ao lado
+    WHEN build_graph for chamado com compact=True ou com o arquivo compilado
+    THEN deve abrir o arquivo compilado
+    """
+    path = _write_json(tmp_path, [["A", "B", 5]])
+    compile_graph(path)
+
+    assert build_graph(path, compact=True).number_of_edges() == 1
+    assert build_graph(compiled_path(path)).nodes() == ["A", "B"]
+
+def test_build_graph_ignores_stale_compiled_file(tmp_path):
+    """
+    GIVEN um arquivo compilado mais antigo que o JSON
+    WHEN build_graph for chamado com compact=True
+    THEN deve ler o JSON e ignorar o arquivo compilado
+    """
+    path = _write_json(tmp_path, [["A", "B", 5]])
+    out_path = compile_graph(path)
+    os.utime(out_path, (0, 0))
+    _write_json(tmp_path, [["A", "B", 5], ["B", "C", 1]])
+
+    assert build_graph(path, compact=True).number_of_edges() == 2
+
+def test_load_graph_rejects_other_files(tmp_path):
+    """
+    GIVEN um arquivo que não está no formato compilado
+    WHEN load_graph for chamado
+    THEN deve lançar ValueError
+    """
+    path = _write_json(tmp_path, [["A", "B", 5]])
+
+    with pytest.raises(ValueError):
+        load_graph(path)
@@ -0,0 +1,43 @@
+"""
+Testes de import dos módulos do projeto.
+Garante que importar os módulos não executa código de exemplo
+nem depende do diretório de trabalho atual.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+def test_import_outside_project_root(tmp_path):
+    """
+    GIVEN um diretório de trabalho diferente da raiz do projeto
+    WHEN os módulos core e main forem importados
+    THEN o import deve funcionar sem abrir arquivos de dados
+    """
+    code = (
+        "import builtins\n"
+        "opened = []\n"
+        "real_open = builtins.open\n"
+        "builtins.open = lambda *a, **k: opened.append(a[0]) or real_open(*a, **k)\n"
+        "import core.build_graph, core.dijkstra, main\n"
+        "assert not [p for p in opened if str(p).endswith('.json')], opened\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, check=False)
+
+    assert result.returncode == 0, result.stderr
+
+def test_self_test_entry_point():
+    """
+    GIVEN a CLI do projeto
+    WHEN main.py for executado com --self-test
+    THEN as verificações dos módulos devem passar
+    """
+    result = subprocess.run([sys.executable, "main.py", "--self-test"], cwd=ROOT,
+                            capture_output=True, text=True, check=False)
+
+    assert result.returncode == 0, result.stderr
+    assert "Self-test OK" in result.stdout
@@ -0,0 +1,147 @@
+"""
+Testes para as tabelas de landmarks core.landmarks e a busca dirigida
+dijkstra(..., landmarks=tabela).
+Compara as distâncias com o dijkstra comum, com as tabelas recém-calculadas e
+reabertas do arquivo, no nx.DiGraph, no CSRGraph e no grafo compilado.
+"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra
+from core.graph_file import load_graph, write_graph
+from core import landmarks as landmarks_module
+from core.landmarks import LandmarkTable, find_landmarks, landmarks_path
+from core.tracked_graph import TrackedDiGraph
+
+def _random_graph(seed, integer=True):
+    rng = random.Random(seed)
+    graph = TrackedDiGraph()
+    names = [f"N{i}" for i in range(40)]
+    graph.add_nodes_from(names)
+    for _ in range(120):
+        u, v = rng.sample(names, 2)
+        graph.add_edge(u, v, weight=rng.randint(0, 9) if integer else rng.uniform(0, 9000))
+    return graph
+
+def test_landmark_search_matches_dijkstra(tmp_path):
+    """
+    GIVEN grafos aleatórios com pesos inteiros (inclusive zero) e reais
+    WHEN as tabelas forem calculadas por 'avoid' e 'farthest', gravadas e reabertas
+    THEN dijkstra com landmarks deve dar as distâncias do dijkstra comum, em todos os grafos
+    """
+    for seed in range(4):
+        graph = _random_graph(seed, integer=seed % 2 == 0)
+        compact = CSRGraph.from_networkx(graph)
+        write_graph(compact, str(tmp_path / "graph.graph"))
+        mapped = load_graph(str(tmp_path / "graph.graph"))
+        for method in ("avoid", "farthest"):
+            table = LandmarkTable.build(graph, 4, method, seed)
+            assert len(set(table.landmarks)) == 4
+            path = str(tmp_path / f"{seed}-{method}.landmarks")
+            table.save(path)
+            searches = [(graph, table), (graph, LandmarkTable.load(path, graph)),
+                        (compact, LandmarkTable.load(path, compact)),
+                        (mapped, LandmarkTable.load(path, mapped))]
+            for start in list(graph)[:10]:
+                for end in graph:
+                    expected, _ = dijkstra(graph, start, end)
+                    for candidate, tables in searches:
+                        dist, found = dijkstra(candidate, start, end, landmarks=tables)
+                        assert dist == expected
+                        if found is not None:
+                            assert nx.path_weight(graph, found, "weight") == pytest.approx(dist)
+
+def test_avoid_descends_from_the_root(monkeypatch):
+    """
+    GIVEN uma grade fortemente conexa, em que toda raiz alcança os landmarks já escolhidos
+    WHEN 8 landmarks forem escolhidos pelo método 'avoid'
+    THEN cada landmark deve vir da descida a partir de uma raiz aleatória, nunca de um sorteio
+    """
+    draws = []
+
+    class CountingRandom(random.Random):
+        def choice(self, seq):
+            draws.append(len(seq))
+            return super().choice(seq)
+
+    monkeypatch.setattr(landmarks_module.random, "Random", CountingRandom)
+    rng = random.Random(0)
+    graph = TrackedDiGraph()
+    for i in range(12):
+        for j in range(12):
+            for a, b in ((i + 1, j), (i, j + 1)):
+                if a < 12 and b < 12:
+                    weight = rng.randint(1, 9)
+                    graph.add_edge(f"{i},{j}", f"{a},{b}", weight=weight)
+                    graph.add_edge(f"{a},{b}", f"{i},{j}", weight=weight)
+
+    table = LandmarkTable.build(graph, 8, "avoid")
+
+    assert len(set(table.landmarks)) == 8
+    assert draws == [len(graph)] * 8     # só a escolha da raiz de cada landmark
+
+def test_tables_are_exact_with_integer_weights():
+    """
+    GIVEN um grafo com pesos inteiros
+    WHEN as tabelas forem calculadas
+    THEN o float32 deve ser exato (slack zero) e as linhas devem ter as distâncias
+    """
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([("A", "B", 5), ("B", "C", 7), ("C", "A", 1), ("D", "A", 2)])
+    table = LandmarkTable.build(graph, 1, "farthest")
+
+    assert table.slack == 0
+    landmark = table.landmarks[0]
+    lengths = nx.single_source_dijkstra_path_length(graph, landmark)
+    for node in graph:
+        assert table.forward[0][table.node_ids()(node)] == lengths.get(node, float("inf"))
+
+def test_tables_tied_to_their_graph(tmp_path):
+    """
+    GIVEN tabelas calculadas para um grafo
+    WHEN forem usadas com outro grafo, com o grafo alterado, ou o arquivo não for de tabelas
+    THEN deve lançar ValueError
+    """
+    graph = _random_graph(1)
+    table = LandmarkTable.build(graph, 2)
+    path = str(tmp_path / "graph.landmarks")
+    table.save(path)
+
+    with pytest.raises(ValueError):
+        dijkstra(_random_graph(2), "N0", "N1", landmarks=table)
+    with pytest.raises(ValueError):
+        LandmarkTable.load(path, _random_graph(2).subgraph([f"N{i}" for i in range(10)]))
+    shuffled = TrackedDiGraph()
+    shuffled.add_nodes_from(reversed(list(graph)))
+    shuffled.add_edges_from(graph.edges(data=True))
+    with pytest.raises(ValueError):
+        dijkstra(shuffled, "N0", "N1", landmarks=LandmarkTable.load(path, shuffled))
+    with pytest.raises(ValueError):
+        dijkstra(graph, "N0", "N1", bidirectional=True, landmarks=table)
+    graph.add_edge("N0", "N1", weight=0)
+    with pytest.raises(ValueError):
+        dijkstra(graph, "N0", "N1", landmarks=table)
+    (tmp_path / "other.landmarks").write_bytes(b"not a table")
+    with pytest.raises(ValueError):
+        LandmarkTable.load(str(tmp_path / "other.landmarks"), graph)
+    with pytest.raises(ValueError):
+        LandmarkTable.build(graph, 2, "random")
+
+def test_find_landmarks_next_to_the_graph(tmp_path):
+    """
+    GIVEN um JSON de grafo e as tabelas gravadas no caminho padrão
+    WHEN find_landmarks for chamado antes e depois de gravar as tabelas
+    THEN deve retornar None e depois o arquivo ao lado do JSON
+    """
+    json_path = tmp_path / "graph.json"
+    json_path.write_text('{"edges": [["A", "B", 1]]}')
+    assert landmarks_path(str(json_path)) == str(tmp_path / "graph.landmarks")
+    assert find_landmarks(str(json_path)) is None
+
+    graph = nx.DiGraph([("A", "B", {"weight": 1})])
+    LandmarkTable.build(graph, 1).save(landmarks_path(str(json_path)))
+    assert find_landmarks(str(json_path)) == str(tmp_path / "graph.landmarks")
@@ -0,0 +1,84 @@
+"""
+Testes para o grafo lido sob demanda core.lazy_graph.
+Verifica que compile_edges grava o mesmo arquivo do graph_file.compile_graph e
+que as buscas no LazyGraph, com um cache de poucas páginas, dão os mesmos
+resultados das buscas no grafo aberto com mmap.
+"""
+
+import json
+import random
+
+import pytest
+
+from core.dijkstra import dijkstra
+from core.graph_file import compile_graph, load_graph
+from core.landmarks import LandmarkTable
+from core.lazy_graph import LazyGraph, compile_edges, open_graph
+
+def _write_json(path, seed=0):
+    rng = random.Random(seed)
+    names = [f"N{i}" for i in range(80)]
+    edges = [[*rng.sample(names, 2), rng.randint(0, 40)] for _ in range(400)]
+    edges += [[u, v, w + 1] for u, v, w in edges[:20]]   # arestas repetidas
+    path.write_text(json.dumps({"edges": edges}))
+    return str(path)
+
+def test_compile_edges_matches_compile_graph(tmp_path):
+    """
+    GIVEN um JSON com arestas repetidas
+    WHEN compile_edges gravar o arquivo em blocos de poucas arestas
+    THEN o arquivo deve ser idêntico ao de graph_file.compile_graph
+    """
+    source = _write_json(tmp_path / "graph.json")
+    compile_graph(source, str(tmp_path / "expected.graph"))
+    for run_edges in (1, 37, 10000):
+        compile_edges(source, str(tmp_path / "lazy.graph"), run_edges=run_edges)
+        assert ((tmp_path / "lazy.graph").read_bytes()
+                == (tmp_path / "expected.graph").read_bytes())
+
+def test_lazy_searches_match_mmap(tmp_path):
+    """
+    GIVEN um grafo compilado aberto com mmap e como LazyGraph de 4 páginas de 64 bytes
+    WHEN o dijkstra (com e sem landmarks) for chamado para vários pares
+    THEN os resultados devem ser iguais e o cache não deve passar de 4 páginas
+    """
+    source = _write_json(tmp_path / "graph.json", seed=1)
+    compiled = compile_graph(source)
+    expected = load_graph(compiled)
+    with LazyGraph(compiled, page_size=64, max_pages=4) as graph:
+        tables = LandmarkTable.build(graph, 3)
+        names = list(expected)
+        for start in names[:10]:
+            for end in names:
+                result = dijkstra(expected, start, end)
+                assert dijkstra(graph, start, end) == result
+                assert dijkstra(graph, start, end, landmarks=tables)[0] == result[0]
+        info = graph.cache_info()
+        assert info.pages <= 4 and info.evictions > 0
+        assert list(graph.edges(data=True)) == list(expected.edges(data=True))
+
+def test_open_graph_compiles_the_json(tmp_path):
+    """
+    GIVEN um JSON sem arquivo compilado ao lado
+    WHEN open_graph for chamado com o JSON
+    THEN deve gravar o arquivo compilado e abrir o grafo sob demanda a partir dele
+    """
+    source = _write_json(tmp_path / "graph.json", seed=2)
+    with open_graph(source) as graph:
+        assert (tmp_path / "graph.graph").exists()
+        assert graph.number_of_nodes() == load_graph(str(tmp_path / "graph.graph")).number_of_nodes()
+
+def test_invalid_files_and_parameters(tmp_path):
+    """
+    GIVEN um arquivo que não é um grafo compilado
+    WHEN LazyGraph for aberto com ele ou com parâmetros de cache inválidos
+    THEN deve lançar ValueError
+    """
+    (tmp_path / "other.graph").write_bytes(b"not a graph")
+    with pytest.raises(ValueError):
+        LazyGraph(str(tmp_path / "other.graph"))
+    compiled = compile_graph(_write_json(tmp_path / "graph.json"))
+    with pytest.raises(ValueError):
+        LazyGraph(compiled, page_size=12)
+    with pytest.raises(ValueError):
+        LazyGraph(compiled, max_pages=0)
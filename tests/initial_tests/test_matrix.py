@@ -0,0 +1,105 @@
+"""
+Testes para a matriz de distâncias core.matrix.
+Verifica que cada célula é igual ao dijkstra ponto a ponto,
+com e sem processos, e que o arquivo .npy gravado pode ser relido.
+"""
+
+import json
+import random
+
+import networkx as nx
+
+from core.dijkstra import dijkstra, dijkstra_all
+from core.graph_file import compile_graph
+from core import matrix as matrix_module
+from core.matrix import distance_matrix, iter_rows, read_distance_matrix, write_distance_matrix
+
+def _random_graph(seed=1):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    names = [f"N{i}" for i in range(30)]
+    graph.add_nodes_from(names)
+    for _ in range(90):
+        u, v = rng.sample(names, 2)
+        graph.add_edge(u, v, weight=rng.randint(1, 20))
+    return graph
+
+def _expected(graph, sources, targets):
+    return [[dijkstra(graph, s, t)[0] for t in targets] for s in sources]
+
+def test_distance_matrix_matches_dijkstra():
+    """
+    GIVEN um grafo aleatório e conjuntos de origens e destinos
+    WHEN distance_matrix for chamado
+    THEN cada célula deve ser a distância do dijkstra, inclusive float('inf')
+    """
+    graph = _random_graph()
+    sources, targets = ["N0", "N3", "N7", "N29"], ["N1", "N2", "N3", "N15", "N28"]
+
+    matrix = distance_matrix(graph, sources, targets)
+
+    assert [list(row) for row in matrix] == _expected(graph, sources, targets)
+
+def test_distance_matrix_parallel_from_compiled_file(tmp_path):
+    """
+    GIVEN um grafo compilado em disco
+    WHEN distance_matrix for chamado com dois processos e o caminho do arquivo
+    THEN o resultado deve ser igual ao cálculo sequencial
+    """
+    graph = _random_graph(2)
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": [[u, v, d["weight"]]
+                                               for u, v, d in graph.edges(data=True)]}))
+    compiled = compile_graph(str(json_file))
+    sources = [f"N{i}" for i in range(0, 30, 2)]
+    targets = [f"N{i}" for i in range(1, 30, 3)]
+
+    matrix = distance_matrix(compiled, sources, targets, workers=2)
+
+    assert [list(row) for row in matrix] == _expected(graph, sources, targets)
+
+def test_interleaved_parallel_rows():
+    """
+    GIVEN dois grafos diferentes
+    WHEN as linhas de duas matrizes com processos forem consumidas intercaladas
+    THEN cada matriz deve usar o próprio grafo, sem alterar o estado do processo atual
+    """
+    graphs = [_random_graph(3), _random_graph(4)]
+    sources, targets = [f"N{i}" for i in range(0, 30, 5)], [f"N{i}" for i in range(30)]
+    generators = [iter_rows(graph, sources, targets, workers=2, chunksize=1) for graph in graphs]
+
+    rows = [[], []]
+    for _ in sources:
+        for i, generator in enumerate(generators):
+            rows[i].append(next(generator))
+            assert matrix_module._WORKER_GRAPH is None # pylint: disable=protected-access
+
+    assert rows == [_expected(graph, sources, targets) for graph in graphs]
+
+def test_write_distance_matrix(tmp_path):
+    """
+    GIVEN um grafo aleatório
+    WHEN a matriz for gravada em disco com write_distance_matrix
+    THEN read_distance_matrix deve devolver as mesmas distâncias
+    """
+    graph = _random_graph(3)
+    sources, targets = ["N0", "N1", "N2"], ["N5", "N6"]
+    path = str(tmp_path / "matrix.npy")
+
+    write_distance_matrix(graph, sources, targets, path, workers=2)
+
+    assert read_distance_matrix(path) == _expected(graph, sources, targets)
+
+def test_dijkstra_all_with_targets_stops_early():
+    """
+    GIVEN um caminho longo A -> B -> ...
+    WHEN dijkstra_all for chamado só com o destino B
+    THEN a árvore deve conter apenas os nós fixados até B
+    """
+    graph = nx.path_graph(["A", "B", "C", "D"], create_using=nx.DiGraph)
+    nx.set_edge_attributes(graph, 1, "weight")
+
+    tree = dijkstra_all(graph, "A", targets=["B"])
+
+    assert tree.dist == {"A": 0, "B": 1}
+    assert tree.path("B") == ["A", "B"]
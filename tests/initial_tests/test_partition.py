@@ -0,0 +1,128 @@
+"""
+Testes para o particionamento em células (core.partition) e o coordenador de
+shards (service.shards). As consultas particionadas devem dar as mesmas
+distâncias do dijkstra no grafo inteiro, com caminhos válidos.
+"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra
+from core.partition import partition_nodes, write_partition
+from service.shards import Coordinator
+
+def _random_graph(seed, coordinates):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    names = [f"N{i}" for i in range(40)]
+    for _ in range(120):
+        u, v = rng.sample(names, 2)
+        graph.add_edge(u, v, weight=rng.randint(0, 9))
+    if coordinates:
+        for node in graph:
+            graph.nodes[node].update(lat=rng.uniform(-30, -5), lon=rng.uniform(-55, -35))
+    return graph
+
+def _check_queries(graph, coordinator):
+    for start in list(graph)[:8]:
+        for end in graph:
+            expected, _ = dijkstra(graph, start, end)
+            dist, path = coordinator.query(start, end)
+            assert dist == expected
+            if path is not None:
+                assert path[0] == start and path[-1] == end
+                assert nx.path_weight(graph, path, "weight") == dist
+
+def test_partition_nodes_covers_graph():
+    """
+    GIVEN grafos aleatórios com e sem coordenadas
+    WHEN partition_nodes for chamado com cell_size = 7
+    THEN cada nó deve estar em exatamente uma célula, com no máximo 7 nós
+    """
+    for coordinates in (False, True):
+        graph = _random_graph(0, coordinates)
+        cells = partition_nodes(graph, 7)
+        assert all(0 < len(cell) <= 7 for cell in cells)
+        assert sorted(node for cell in cells for node in cell) == sorted(graph)
+    with pytest.raises(ValueError):
+        partition_nodes(graph, 0)
+
+def test_partitioned_queries_match_dijkstra(tmp_path):
+    """
+    GIVEN grafos aleatórios com pesos inteiros (inclusive zero), com e sem coordenadas
+    WHEN o grafo for particionado e consultado pelo Coordinator no próprio processo
+    THEN as distâncias devem ser as do dijkstra e os caminhos devem ter essa distância
+    """
+    for seed in range(3):
+        for coordinates in (False, True):
+            graph = _random_graph(seed, coordinates)
+            directory = tmp_path / f"{seed}-{coordinates}"
+            summary = write_partition(graph, str(directory), cell_size=8)
+            assert summary["cells"] >= 5
+            with Coordinator(str(directory)) as coordinator:
+                _check_queries(graph, coordinator)
+
+def test_partition_compact_graph(tmp_path):
+    """
+    GIVEN um grafo aleatório sem coordenadas convertido para CSRGraph
+    WHEN o grafo compacto for particionado e consultado pelo Coordinator
+    THEN as células devem cobrir o grafo e as distâncias devem ser as do dijkstra
+    """
+    graph = _random_graph(2, False)
+    compact = CSRGraph.from_networkx(graph)
+    cells = partition_nodes(compact, 7)
+    assert sorted(node for cell in cells for node in cell) == sorted(graph)
+    summary = write_partition(compact, str(tmp_path), cell_size=8)
+    assert summary["cells"] >= 5
+    with Coordinator(str(tmp_path)) as coordinator:
+        _check_queries(graph, coordinator)
+
+def test_partitioned_queries_with_shard_processes(tmp_path):
+    """
+    GIVEN um grafo particionado em células
+    WHEN o Coordinator distribuir as células entre 2 processos shard
+    THEN as distâncias devem ser as do dijkstra
+    """
+    graph = _random_graph(1, True)
+    write_partition(graph, str(tmp_path), cell_size=8)
+    with Coordinator(str(tmp_path), shards=2) as coordinator:
+        _check_queries(graph, coordinator)
+
+def test_shard_errors_reach_the_coordinator(tmp_path):
+    """
+    GIVEN um Coordinator com 2 processos shard
+    WHEN uma chamada lançar TypeError no shard, e depois um shard morrer
+    THEN o erro deve chegar ao coordenador sem derrubar o shard, e o shard morto deve dar RuntimeError
+    """
+    graph = _random_graph(1, True)
+    write_partition(graph, str(tmp_path), cell_size=8)
+    with Coordinator(str(tmp_path), shards=2) as coordinator:
+        with pytest.raises(TypeError):
+            coordinator._call([(0, "boundary_distances", (0,)), # pylint: disable=protected-access
+                               (1, "boundary_distances", (1, "N0", False, None))])
+        _check_queries(graph, coordinator)
+
+        coordinator._processes[0].kill() # pylint: disable=protected-access
+        coordinator._processes[0].join() # pylint: disable=protected-access
+        with pytest.raises(RuntimeError, match="Shard 0 is not running"):
+            coordinator._call([(0, "boundary_distances", (0, "N0", False, None))]) # pylint: disable=protected-access
+
+def test_partitioned_invalid_nodes(tmp_path):
+    """
+    GIVEN um grafo particionado
+    WHEN a consulta tiver um nó inexistente ou None, ou o diretório não existir
+    THEN deve lançar ValueError, AttributeError ou FileNotFoundError
+    """
+    graph = _random_graph(2, False)
+    write_partition(graph, str(tmp_path / "cells"), cell_size=8)
+    with Coordinator(str(tmp_path / "cells")) as coordinator:
+        with pytest.raises(ValueError):
+            coordinator.query("N0", "Z")
+        with pytest.raises(AttributeError):
+            coordinator.query(None, "N1")
+        assert coordinator.query("N1", "N1") == (0, ["N1"])
+    with pytest.raises(FileNotFoundError):
+        Coordinator(str(tmp_path / "missing"))
@@ -0,0 +1,130 @@
+"""
+Testes para o motor SciPy core.scipy_engine.
+Compara as árvores e a matriz de distâncias do SciPy com as do motor em
+Python puro e verifica a volta ao Python puro quando o SciPy não está instalado.
+"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from core import scipy_engine
+from core.csr_graph import CSRGraph
+from core.dijkstra import dijkstra_all
+from core.graph_file import load_graph, write_graph
+from core.lazy_graph import LazyGraph
+from core.tracked_graph import TrackedDiGraph
+
+def _random_graph(seed):
+    rng = random.Random(seed)
+    graph = TrackedDiGraph()
+    names = [f"N{i}" for i in range(40)]
+    graph.add_nodes_from(names)
+    for _ in range(120):
+        u, v = rng.sample(names, 2)
+        graph.add_edge(u, v, weight=rng.randint(0, 30))
+    return graph
+
+def _check_trees(graph, trees, sources):
+    for source, tree in zip(sources, trees):
+        expected = dijkstra_all(graph, source)
+        assert tree.source == source
+        assert tree.dist == expected.dist
+        for node in expected.dist:
+            path = tree.path(node)
+            assert path[0] == source and path[-1] == node
+            assert nx.path_weight(graph, path, "weight") == tree.dist[node]
+
+def test_engines_agree(tmp_path):
+    """
+    GIVEN grafos aleatórios com pesos inteiros (inclusive zero): nx, CSR, CSR mapeado de arquivo e LazyGraph
+    WHEN shortest_path_trees e distance_matrix forem chamados com o SciPy
+    THEN as distâncias devem ser as do motor em Python puro e os caminhos devem ter essa distância
+    """
+    pytest.importorskip("scipy")
+    for seed in range(4):
+        graph = _random_graph(seed)
+        sources = random.Random(seed).sample(list(graph), 10)
+        write_graph(CSRGraph.from_networkx(graph), str(tmp_path / f"{seed}.graph"))
+        lazy = LazyGraph(str(tmp_path / f"{seed}.graph"), page_size=64, max_pages=4)
+        for candidate in (graph, CSRGraph.from_networkx(graph),
+                          load_graph(str(tmp_path / f"{seed}.graph")), lazy):
+            _check_trees(graph, scipy_engine.shortest_path_trees(candidate, sources, "scipy"),
+                         sources)
+            matrix = scipy_engine.distance_matrix(candidate, sources, list(graph), "scipy")
+            expected = scipy_engine.distance_matrix(candidate, sources, list(graph), "python")
+            assert [list(row) for row in matrix] == [list(row) for row in expected]
+        lazy.close()
+
+def test_conversion_is_cached_per_version():
+    """
+    GIVEN um TrackedDiGraph já convertido para matriz esparsa
+    WHEN o grafo não mudar, e depois ganhar uma aresta mais curta
+    THEN a conversão deve ser reaproveitada e, após a mudança, refeita
+    """
+    pytest.importorskip("scipy")
+    graph = _random_graph(7)
+    first = scipy_engine.sparse_graph(graph)
+    assert scipy_engine.sparse_graph(graph) is first
+
+    graph.add_edge("N0", "N1", weight=0)
+    assert scipy_engine.sparse_graph(graph) is not first
+    assert scipy_engine.shortest_path_trees(graph, ["N0"])[0].dist["N1"] == 0
+
+def test_blocks_fit_the_memory_budget(monkeypatch):
+    """
+    GIVEN um orçamento de memória que cabe só três linhas de distâncias
+    WHEN shortest_path_trees e distance_matrix forem chamados com 10 origens
+    THEN os blocos devem caber no orçamento, com os mesmos resultados
+    """
+    pytest.importorskip("scipy")
+    graph = _random_graph(9)
+    sources = list(graph)[:10]
+    expected = scipy_engine.distance_matrix(graph, sources, list(graph), "scipy")
+    monkeypatch.setattr(scipy_engine, "BLOCK_BYTES", 3 * 12 * len(graph))
+    calls = []
+    dijkstra = scipy_engine.csgraph.dijkstra
+    monkeypatch.setattr(scipy_engine.csgraph, "dijkstra",
+                        lambda *args, **kwargs: calls.append(len(kwargs["indices"]))
+                        or dijkstra(*args, **kwargs))
+
+    _check_trees(graph, scipy_engine.shortest_path_trees(graph, sources, "scipy"), sources)
+    assert calls == [3, 3, 3, 1]
+    matrix = scipy_engine.distance_matrix(graph, sources, list(graph), "scipy")
+    assert [list(row) for row in matrix] == [list(row) for row in expected]
+    assert calls[4:] == [4, 4, 2]     # sem antecessores cabem mais linhas
+    monkeypatch.undo()
+    assert scipy_engine._block_size(10 ** 7, 12) == 2 # pylint: disable=protected-access
+
+def test_fallback_without_scipy(monkeypatch):
+    """
+    GIVEN o SciPy indisponível
+    WHEN o motor for chamado com engine 'auto', 'scipy' ou um nome inválido
+    THEN 'auto' deve usar o Python puro e os outros devem lançar ValueError
+    """
+    graph = _random_graph(3)
+    monkeypatch.setattr(scipy_engine, "np", None)
+    assert not scipy_engine.available()
+
+    tree, = scipy_engine.shortest_path_trees(graph, ["N0"])
+    assert tree.dist == dijkstra_all(graph, "N0").dist
+    matrix = scipy_engine.distance_matrix(graph, ["N0"], ["N1", "N2"])
+    assert [list(row) for row in matrix] == [[tree.distance("N1"), tree.distance("N2")]]
+    with pytest.raises(ValueError):
+        scipy_engine.shortest_path_trees(graph, ["N0"], "scipy")
+    with pytest.raises(ValueError):
+        scipy_engine.shortest_path_trees(graph, ["N0"], "fortran")
+
+def test_invalid_sources():
+    """
+    GIVEN um grafo válido
+    WHEN as origens tiverem um nó inexistente ou None
+    THEN deve lançar ValueError ou AttributeError, como o dijkstra_all
+    """
+    graph = _random_graph(5)
+    for engine in ("auto", "python"):
+        with pytest.raises(ValueError):
+            scipy_engine.shortest_path_trees(graph, ["N0", "Z"], engine)
+        with pytest.raises(AttributeError):
+            scipy_engine.shortest_path_trees(graph, ["N0", None], engine)
@@ -0,0 +1,114 @@
+"""
+Testes para o servidor de consultas service.server.
+Sobe o servidor em uma porta livre e conversa com ele pelo protocolo de linhas JSON.
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.dijkstra import dijkstra
+from service import server as server_module
+from service.server import QueryServer, percentiles
+
+def _write_graph(tmp_path):
+    json_file = tmp_path / "graph.json"
+    json_file.write_text(json.dumps({"edges": [["A", "B", 4], ["A", "C", 2], ["C", "B", 1],
+                                               ["B", "D", 5], ["E", "F", 5]]}))
+    return str(json_file)
+
+async def _talk(server, lines):
+    bound = asyncio.get_running_loop().create_future()
+    task = asyncio.create_task(server.serve('127.0.0.1', 0,
+                                            lambda host, port: bound.set_result((host, port))))
+    host, port = await bound
+    reader, writer = await asyncio.open_connection(host, port)
+    responses = []
+    for line in lines:
+        writer.write(line.encode("utf-8") + b"\n")
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    task.cancel()
+    return responses
+
+def test_server_answers_queries(tmp_path):
+    """
+    GIVEN um servidor com o grafo carregado
+    WHEN consultas válidas, repetidas, sem caminho e inválidas forem enviadas
+    THEN cada linha deve receber a resposta correspondente e o cache deve ser usado
+    """
+    server = QueryServer(_write_graph(tmp_path), workers=1)
+    try:
+        responses = asyncio.run(_talk(server, [
+            '{"start": "A", "end": "D"}',
+            '{"start": "A", "end": "D"}',
+            '{"start": "A", "end": "F"}',
+            '{"start": "A", "end": "Z"}',
+            'not json',
+            '{"stats": true}',
+        ]))
+    finally:
+        server.close()
+
+    assert responses[0] == {"distance": 8, "path": ["A", "C", "B", "D"]}
+    assert responses[1] == responses[0]
+    assert responses[2] == {"distance": None, "path": None}
+    assert responses[3] == {"error": "Graph must contain the specified nodes"}
+    assert "error" in responses[4]
+    stats = responses[5]
+    assert stats["requests"] == 5
+    assert stats["errors"] == 2
+    assert stats["searches"] == 3
+    assert stats["cache"]["hits"] == 1
+    assert set(stats["latency_ms"]) == {"p50", "p90", "p99"}
+
+def test_cancelled_query_keeps_shared_search(tmp_path, monkeypatch):
+    """
+    GIVEN duas consultas iguais esperando a mesma busca do pool
+    WHEN a primeira, que iniciou a busca, for cancelada
+    THEN a segunda deve receber o resultado e ele deve ficar no cache
+    """
+    server = QueryServer(_write_graph(tmp_path), workers=1)
+    server.close()
+    # busca em uma thread que só termina depois do cancelamento
+    release = threading.Event()
+
+    def blocked_search(start, end):
+        release.wait(5)
+        return dijkstra(server.graph, start, end)
+
+    monkeypatch.setattr(server_module, "_worker_search", blocked_search)
+    server._executor = ThreadPoolExecutor(max_workers=1) # pylint: disable=protected-access
+
+    async def scenario():
+        first = asyncio.create_task(server.query("A", "D"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(server.query("A", "D"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await second, first.cancelled()
+
+    try:
+        response, cancelled = asyncio.run(scenario())
+    finally:
+        release.set()
+        server.close()
+
+    assert cancelled
+    assert response == {"distance": 8, "path": ["A", "C", "B", "D"]}
+    assert server.searches == 1
+    assert len(server.cache) == 1
+    assert not server._pending # pylint: disable=protected-access
+
+def test_percentiles():
+    """
+    GIVEN as amostras de 1 a 100
+    WHEN percentiles for chamado
+    THEN deve devolver os valores pelo método nearest-rank
+    """
+    assert percentiles(range(1, 101)) == {50: 50, 90: 90, 99: 99}
+    assert percentiles([]) == {}
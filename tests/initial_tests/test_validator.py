@@ -13,7 +13,12 @@ from util.validator import (
     validate_entries,
     validate_objects,
     has_negative_weight,
+    is_validated,
+    node_index,
+    validate_vertex_pairs,
 )
+from core.build_graph import build_graph
+from core.tracked_graph import TrackedDiGraph
 
 def test_validate_path_valid_json(tmp_path):
     """Testa se validate_path retorna o conteúdo correto de um arquivo JSON válido."""
@@ -166,6 +171,33 @@ def test_validate_objects_negative_weight():
     with pytest.raises(ValueError, match="negative weight"):
         validate_objects(g, "A", "B")
 
+def test_validate_objects_once_per_version(monkeypatch):
+    """Testa se validate_objects só percorre as arestas de novo depois que o grafo muda."""
+    g = TrackedDiGraph()
+    g.add_edge("A", "B", weight=1)
+    validate_objects(g, "A", "B")
+    assert is_validated(g)
+
+    monkeypatch.setattr("util.validator.has_negative_weight",
+                        lambda graph: pytest.fail("graph revalidated"))
+    validate_objects(g, "B", "A")
+    monkeypatch.undo()
+
+    g["A"]["B"]["weight"] = -1
+    assert not is_validated(g)
+    with pytest.raises(ValueError, match="negative weight"):
+        validate_objects(g, "A", "B")
+    with pytest.raises(ValueError, match="Graph must contain the specified nodes"):
+        validate_objects(g, "A", "C")
+
+def test_build_graph_is_validated(tmp_path):
+    """Testa se o grafo do build_graph já sai validado, nas duas representações."""
+    file = tmp_path / "graph.json"
+    file.write_text(json.dumps({"edges": [["A", "B", 1]]}), encoding="utf-8")
+
+    assert is_validated(build_graph(str(file)))
+    assert is_validated(build_graph(str(file), compact=True))
+
 def test_validate_graph_entry_vertex_a_empty(tmp_path):
     """Testa se validate_graph_entry lança ValueError para vertixA vazio."""
     file = tmp_path / "emptyA.json"
@@ -195,3 +227,30 @@ def test_validate_vertices_entry_vertex_a_not_found(tmp_path):
 
     with pytest.raises(ValueError, match="Node A not found"):
         validate_vertices_entry(str(file), "A", "C")
+
+def test_validate_vertex_pairs(tmp_path):
+    """Testa se validate_vertex_pairs devolve a posição e o erro de cada par inválido."""
+    file = tmp_path / "pairs.json"
+    file.write_text(json.dumps({
+        "edges": [["A", "B", 1], ["B", "C", 2]]
+    }), encoding="utf-8")
+
+    errors = validate_vertex_pairs(str(file), [("A", "C"), ("X", "B"), ("C", "A"), ("A", "Y")])
+
+    assert errors == [(1, "Node X not found!"), (3, "Node Y not found!")]
+    assert validate_vertex_pairs(str(file), [("A", "B")]) == []
+
+def test_node_index_cached_until_file_changes(tmp_path, monkeypatch):
+    """Testa se o índice de nós é lido uma vez e refeito quando o arquivo muda."""
+    file = tmp_path / "index.json"
+    file.write_text(json.dumps({"edges": [["A", "B", 1]]}), encoding="utf-8")
+    assert node_index(str(file)) == {"A", "B"}
+
+    monkeypatch.setattr("util.validator.iter_valid_edges",
+                        lambda path: pytest.fail("file parsed again"))
+    validate_entries(str(file), "A", "B")
+    validate_vertices_entry(str(file), "B", "A")
+    monkeypatch.undo()
+
+    file.write_text(json.dumps({"edges": [["A", "B", 1], ["B", "C", 1]]}), encoding="utf-8")
+    assert node_index(str(file)) == {"A", "B", "C"}
@@ -0,0 +1,73 @@
+"""
+Testes para os k caminhos mínimos core.yen.
+Compara as distâncias com a enumeração de caminhos simples do networkx e
+verifica que os caminhos são distintos, sem ciclos e com a distância informada.
+"""
+
+import itertools
+import random
+
+import networkx as nx
+import pytest
+
+from core.csr_graph import CSRGraph
+from core.yen import k_shortest_paths
+
+def test_matches_networkx_simple_paths():
+    """
+    GIVEN grafos aleatórios com pesos inteiros (inclusive zero), nx e CSR
+    WHEN k_shortest_paths for chamado com k = 6
+    THEN as distâncias devem ser as mesmas de nx.shortest_simple_paths, em ordem,
+    com caminhos distintos, sem ciclos e de mesma distância
+    """
+    for seed in range(10):
+        rng = random.Random(seed)
+        graph = nx.DiGraph()
+        names = [f"N{i}" for i in range(12)]
+        for _ in range(40):
+            u, v = rng.sample(names, 2)
+            graph.add_edge(u, v, weight=rng.randint(0, 6))
+        compact = CSRGraph.from_networkx(graph)
+
+        for start, end in (rng.sample(names, 2) for _ in range(4)):
+            try:
+                expected = [nx.path_weight(graph, path, "weight") for path in
+                            itertools.islice(nx.shortest_simple_paths(graph, start, end, "weight"), 6)]
+            except nx.NetworkXNoPath:
+                expected = []
+            for candidate in (graph, compact):
+                result = k_shortest_paths(candidate, start, end, 6)
+                assert [dist for dist, _ in result] == expected
+                assert len({tuple(path) for _, path in result}) == len(result)
+                for dist, path in result:
+                    assert path[0] == start and path[-1] == end
+                    assert len(set(path)) == len(path)
+                    assert nx.path_weight(graph, path, "weight") == dist
+
+def test_alternatives_in_order():
+    """
+    GIVEN um grafo com três rotas de A até D
+    WHEN k_shortest_paths for chamado com k maior que o número de rotas
+    THEN deve retornar as três rotas em ordem crescente de distância
+    """
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([("A", "B", 1), ("B", "D", 1), ("A", "C", 2),
+                                   ("C", "D", 2), ("A", "D", 5), ("D", "A", 1)])
+
+    assert k_shortest_paths(graph, "A", "D", 5) == [
+        (2, ["A", "B", "D"]), (4, ["A", "C", "D"]), (5, ["A", "D"])]
+    assert k_shortest_paths(graph, "A", "D", 1) == [(2, ["A", "B", "D"])]
+
+def test_no_path_same_node_and_invalid_k():
+    """
+    GIVEN um grafo sem caminho de B até A
+    WHEN k_shortest_paths for chamado sem caminho, com start = end ou com k < 1
+    THEN deve retornar lista vazia, apenas [start] ou lançar ValueError
+    """
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", weight=3)
+
+    assert k_shortest_paths(graph, "B", "A", 3) == []
+    assert k_shortest_paths(graph, "A", "A", 3) == [(0, ["A"])]
+    with pytest.raises(ValueError):
+        k_shortest_paths(graph, "A", "B", 0)
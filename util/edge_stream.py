@@ -0,0 +1,234 @@
+"""
+Incremental reader for the graph JSON files.
+
+The file is read in chunks and the "edges" array is decoded one element at
+a time, so the edge list is never held in memory as a whole.
+"""
+import json
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = ' \t\n\r'
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    """Sliding text window over a file opened in text mode."""
+
+    def __init__(self, file, path: str, chunk_size: int):
+        self.file = file
+        self.path = path
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.pos = 0
+        self.consumed = 0  # characters dropped from the front of the window
+        self.eof = False
+
+    def fill(self, size: int = 0) -> bool:
+        """Read at least one more chunk. Returns False when the file is exhausted."""
+        if self.eof:
+            return False
+        chunk = self.file.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > len(self.text) // 2:
+            self.consumed += self.pos
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        self.text += chunk
+        return True
+
+    def error(self, msg: str, pos: int | None = None):
+        """Build a JSONDecodeError in the same format used by the validator."""
+        offset = self.consumed + (self.pos if pos is None else pos)
+        return json.JSONDecodeError(msg=f'{msg}. Please check the path and try again',
+                                    doc=self.path,
+                                    pos=offset)
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at the end of the file)."""
+        while True:
+            text = self.text
+            pos = self.pos
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(text):
+                return text[pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        """Consume the character ``char`` or raise JSONDecodeError."""
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more chunks when needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as exc:
+                # grow the window geometrically so long values are not re-decoded
+                # once per chunk
+                if self.fill(len(self.text) - self.pos):
+                    continue
+                raise self.error(exc.msg, exc.pos) from exc
+            # a number at the end of the window may continue in the next chunk
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_edges(path: str, extras: dict | None = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the raw elements of the "edges" array of a graph JSON file.
+
+    The document is parsed once, incrementally. Elements are yielded as soon
+    as they are decoded and are not validated here.
+
+    Parameters
+    ----------
+    path : str
+        Path to the JSON file.
+    extras : dict, optional
+        When given, receives every other top-level key of the document.
+    chunk_size : int
+        Number of characters read from the file at a time.
+
+    Yields
+    ------
+    object
+        Each element of the "edges" array, usually ``[node, terminal, weight]``.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file cannot be found.
+    JSONDecodeError
+        If the file is not valid JSON.
+    """
+    for block in iter_edge_blocks(path, extras, chunk_size):
+        yield from block
+
+
+def iter_edge_blocks(path: str, extras: dict | None = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the elements of the "edges" array in lists (blocks), in file order.
+
+    Runs of flat elements (``[node, terminal, weight]``) are decoded with a
+    single call to the C JSON decoder per chunk instead of one call per edge;
+    anything else (nested values, syntax errors, the end of the array) is
+    decoded one element at a time, so the elements and the errors are the
+    same as in iter_edges.
+
+    Parameters
+    ----------
+    path : str
+        Path to the JSON file.
+    extras : dict, optional
+        When given, receives every other top-level key of the document.
+    chunk_size : int
+        Number of characters read from the file at a time, which is also
+        the approximate size of the text decoded in one call.
+
+    Yields
+    ------
+    list
+        Consecutive elements of the "edges" array.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file cannot be found.
+    JSONDecodeError
+        If the file is not valid JSON.
+    """
+    try:
+        file = open(path, 'r', encoding='utf-8')  # pylint: disable=consider-using-with
+    except FileNotFoundError as e:
+        raise FileNotFoundError('Please check the path and try again') from e
+
+    with file:
+        buf = _Buffer(file, path, chunk_size)
+        if buf.peek() != '{':
+            # not an object: decode it anyway so syntax errors are reported
+            buf.value()
+        else:
+            buf.expect('{')
+            if buf.peek() == '}':
+                buf.pos += 1
+            else:
+                while True:
+                    if buf.peek() != '"':
+                        raise buf.error('Expecting property name enclosed in double quotes')
+                    key = buf.value()
+                    buf.expect(':')
+                    if key == 'edges' and buf.peek() == '[':
+                        yield from _iter_array_blocks(buf)
+                    else:
+                        value = buf.value()
+                        if extras is not None:
+                            extras[key] = value
+                    char = buf.peek()
+                    buf.pos += 1
+                    if char == '}':
+                        break
+                    if char != ',':
+                        raise buf.error("Expecting ',' delimiter", buf.pos - 1)
+        if buf.peek() != '':
+            raise buf.error('Extra data')
+
+
+def _decode_run(buf: _Buffer) -> list | None:
+    """
+    Decode, with one call to the decoder, the flat elements between the current
+    position and the last "]," of the window. Returns None (without consuming
+    anything) when that is not possible or not safe.
+    """
+    text = buf.text
+    start = buf.pos
+    end = len(text)
+    for _ in range(2):
+        cut = text.rfind('],', start, end)
+        if cut < 0:
+            return None
+        run = text[start:cut + 1]
+        try:
+            items = _DECODER.decode('[' + run + ']')
+        except json.JSONDecodeError as exc:
+            # retry once, stopping before the first error (e.g. the end of the array)
+            end = start + exc.pos - 1
+            continue
+        # a cut in the middle of an element only decodes if the element has nested
+        # lists or objects: accept the run only when every element is a flat list
+        if set(map(type, items)) != {list} or run.count('[') != len(items) or '{' in run:
+            return None
+        buf.pos = cut + 1
+        return items
+    return None
+
+
+def _iter_array_blocks(buf: _Buffer):
+    """Yield blocks of elements of the JSON array that starts at the current position."""
+    buf.expect('[')
+    if buf.peek() == ']':
+        buf.pos += 1
+        return
+    while True:
+        missing = buf.chunk_size - (len(buf.text) - buf.pos)
+        if missing > 0:
+            buf.fill(missing)
+        block = _decode_run(buf)
+        if block is None:
+            block = [buf.value()]
+        yield block
+        char = buf.peek()
+        buf.pos += 1
+        if char == ']':
+            return
+        if char != ',':
+            raise buf.error("Expecting ',' delimiter", buf.pos - 1)
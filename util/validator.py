@@ -2,6 +2,12 @@
 That file has functions that perform validations overall the code
 """
 import json
+import os
+from functools import lru_cache
+
+from util.edge_stream import iter_edge_blocks
+
+_NUMBER_TYPES = (int, float)
 
 def validate_entries(path: str, v_a: str, v_b: str):
     """
@@ -16,19 +22,9 @@ def validate_entries(path: str, v_a: str, v_b: str):
     Exceptions if the graph and the vertices are not valid.
     """
 
-    try:
-        # valida o caminho se existe, se o arquivo é .json
-        validate_path(path)
-
-        # valida se é possível gerar um grafo com o path, se o grafo é nulo e
-        # checa se as arestas contém peso negativo
-        validate_graph_entry(path)
-
-        # valida se os vertices passados estao no grafo
-        validate_vertices_entry(path, v_a, v_b)
-
-    except Exception as e:
-        raise e
+    # uma única leitura do arquivo valida o JSON e as arestas e monta o índice
+    # de nós, reaproveitado nas chamadas seguintes enquanto o arquivo não mudar
+    _check_vertices(node_index(path), v_a, v_b)
 
 
 def validate_path(path: str):
@@ -88,35 +84,242 @@ def validate_graph_entry(path: str):
     ValueError
         If the graph is invalid.
     """
-    data = validate_path(path)
-    edges = []
-
-    if data is not None:
-        for v_a, v_b, w in data["edges"]:
-            if not v_a:
-                raise ValueError("The value of vertixA is empty")
-            if not v_b:
-                raise ValueError("The value of vertixB is empty")
-            if not isinstance(w, (int, float)):
-                raise ValueError(
-                    f"The value of Weight between {v_a} and {v_b} needs to be a number"
-                )
-            if w < 0:
-                raise ValueError(
-                    f"The value of Weight between {v_a} and {v_b} needs to be positive"
-                )
-            if w > 0 and v_a == v_b:
-                raise ValueError(
-                    f"The value of Weight between {v_a} and {v_b} needs to be zero!(loop)"
-                )
-
-            edges.append([v_a, v_b])
-
-    if len(edges) == 0:
+    return [[v_a, v_b] for v_a, v_b, _ in iter_valid_edges(path)]
+
+
+def validate_edge(v_a, v_b, w):
+    """
+    Validate a single edge of the graph.
+
+    Parameters
+    ----------
+    v_a : str
+        Origin vertex.
+    v_b : str
+        Destination vertex.
+    w : int | float
+        Weight of the edge.
+
+    Raises
+    ------
+    ValueError
+        If the edge is invalid.
+    """
+    if not v_a:
+        raise ValueError("The value of vertixA is empty")
+    if not v_b:
+        raise ValueError("The value of vertixB is empty")
+    if not isinstance(w, (int, float)):
+        raise ValueError(
+            f"The value of Weight between {v_a} and {v_b} needs to be a number"
+        )
+    if w < 0:
+        raise ValueError(
+            f"The value of Weight between {v_a} and {v_b} needs to be positive"
+        )
+    if w > 0 and v_a == v_b:
+        raise ValueError(
+            f"The value of Weight between {v_a} and {v_b} needs to be zero!(loop)"
+        )
+
+
+def _suspect_edges(block: list):
+    """
+    Positions of the edges of a block that may be invalid, in one cheap pass.
+    Every edge rejected by validate_edge is included (exact int/float types
+    only, so e.g. bools are rechecked); the positions still need validate_edge.
+    """
+    try:
+        return [i for i, (v_a, v_b, w) in enumerate(block)
+                if not v_a or not v_b or w.__class__ not in _NUMBER_TYPES
+                or w < 0 or (w > 0 and v_a == v_b)]
+    except (TypeError, ValueError):
+        # some element isn't a sequence of three values: check them all one by one
+        return range(len(block))
+
+
+def iter_valid_edges(path: str, extras: dict | None = None):
+    """
+    Read the edges of a JSON file in a single incremental pass, validating
+    each one before it is yielded.
+
+    Parameters
+    ----------
+    path : str
+        Path to the JSON file.
+    extras : dict, optional
+        When given, receives the other top-level keys of the document.
+
+    Yields
+    ------
+    tuple
+        ``(node, terminal, weight)`` for each valid edge.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file cannot be found.
+    JSONDecodeError
+        If the file is not valid JSON.
+    ValueError
+        If an edge is invalid or the graph is empty.
+    """
+    empty = True
+    for block in iter_edge_blocks(path, extras):
+        for i in _suspect_edges(block):
+            v_a, v_b, w = block[i]
+            validate_edge(v_a, v_b, w)
+        empty = empty and not block
+        yield from block
+    if empty:
+        raise ValueError("Graph can't be empty")
+
+
+def find_edge_violations(path: str, limit: int = 10) -> list[tuple[int, str]]:
+    """
+    Validate every edge of a JSON file and report the first ``limit``
+    invalid ones instead of stopping at the first.
+
+    The edges are decoded and checked in blocks (see iter_edge_blocks);
+    the messages are the ones raised by validate_edge and by the unpacking
+    of malformed edges in iter_valid_edges.
+
+    Parameters
+    ----------
+    path : str
+        Path to the JSON file.
+    limit : int
+        Maximum number of violations reported; the file is read only up
+        to the last one.
+
+    Returns
+    -------
+    list[tuple[int, str]]
+        ``(edge index, message)`` for each invalid edge, in file order;
+        empty when the graph is valid.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file cannot be found.
+    JSONDecodeError
+        If the file is not valid JSON (up to the last reported violation).
+    ValueError
+        If the graph is empty or limit is not positive.
+    """
+    if limit < 1:
+        raise ValueError("The limit of violations needs to be positive")
+    violations = []
+    offset = 0
+    for block in iter_edge_blocks(path):
+        for i in _suspect_edges(block):
+            try:
+                v_a, v_b, w = block[i]
+                validate_edge(v_a, v_b, w)
+            except (TypeError, ValueError) as e:
+                violations.append((offset + i, str(e)))
+                if len(violations) >= limit:
+                    return violations
+        offset += len(block)
+    if offset == 0:
         raise ValueError("Graph can't be empty")
+    return violations
+
+
+def validate_coordinates(coordinates) -> list[tuple]:
+    """
+    Validate the optional "coordinates" entry of the graph JSON, a list of
+    ``[node, latitude, longitude]`` triples in degrees.
+
+    Parameters
+    ----------
+    coordinates : list | None
+        Value of the "coordinates" key (None when the key is absent).
+
+    Returns
+    -------
+    list[tuple]
+        List of ``(node, lat, lon)``.
 
-    return edges
+    Raises
+    ------
+    ValueError
+        If an entry is malformed or out of range.
+    """
+    if coordinates is None:
+        return []
+    if not isinstance(coordinates, list):
+        raise ValueError("The coordinates need to be a list of [node, lat, lon]")
+
+    result = []
+    for entry in coordinates:
+        if not isinstance(entry, list) or len(entry) != 3:
+            raise ValueError(f"The coordinate {entry} needs to be [node, lat, lon]")
+        node, lat, lon = entry
+        if not node:
+            raise ValueError("The node of a coordinate is empty")
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (lat, lon)):
+            raise ValueError(f"The coordinates of {node} need to be numbers")
+        if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+            raise ValueError(f"The coordinates of {node} are out of range")
+        result.append((node, lat, lon))
+    return result
+
+
+def node_index(path: str) -> frozenset:
+    """
+    Return the set of nodes of a graph JSON file, validating the file on the
+    first call. The index is cached by path, modification time and size, so
+    it is rebuilt only when the file changes.
 
+    Parameters
+    ----------
+    path : str
+        JSON file path.
+
+    Returns
+    -------
+    frozenset
+        Every node that appears in an edge of the graph.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file cannot be found.
+    JSONDecodeError
+        If the file is not valid JSON.
+    ValueError
+        If the graph is invalid.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError as e:
+        raise FileNotFoundError('Please check the path and try again') from e
+    return _load_node_index(os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _load_node_index(path: str, mtime_ns: int, size: int) -> frozenset: # pylint: disable=unused-argument
+    # mtime_ns e size fazem parte da chave do cache: um arquivo alterado gera um novo índice
+    nodes = set()
+    for v_a, v_b, _ in iter_valid_edges(path):
+        nodes.add(v_a)
+        nodes.add(v_b)
+    return frozenset(nodes)
+
+
+def _vertices_error(nodes: frozenset, v_a: str, v_b: str) -> str | None:
+    if v_a not in nodes:
+        return f"Node {v_a} not found!"
+    if v_b not in nodes:
+        return f"Node {v_b} not found!"
+    return None
+
+
+def _check_vertices(nodes: frozenset, v_a: str, v_b: str):
+    message = _vertices_error(nodes, v_a, v_b)
+    if message is not None:
+        raise ValueError(message)
 
 
 def validate_vertices_entry(path: str, v_a: str, v_b: str):
@@ -137,22 +340,39 @@ def validate_vertices_entry(path: str, v_a: str, v_b: str):
     ValueError
         If one or both vertices are not found.
     """
-    edges = validate_graph_entry(path)
-
-    if edges is not None:
-        found_a = False
-        found_b = False
-        for edge in edges:
-            if v_a in edge:
-                found_a = True
-            if v_b in edge:
-                found_b = True
-            if found_a and found_b:
-                break
-        if not found_a:
-            raise ValueError(f"Node {v_a} not found!")
-        if not found_b:
-            raise ValueError(f"Node {v_b} not found!")
+    _check_vertices(node_index(path), v_a, v_b)
+
+
+def validate_vertex_pairs(path: str, pairs) -> list[tuple[int, str]]:
+    """
+    Validate many ``(v_a, v_b)`` query pairs against the same graph file,
+    at O(1) per pair after the node index is built.
+
+    Parameters
+    ----------
+    path : str
+        JSON file path.
+    pairs : iterable
+        ``(v_a, v_b)`` pairs.
+
+    Returns
+    -------
+    list[tuple[int, str]]
+        ``(position, message)`` for each invalid pair, in order; empty when
+        every pair is valid.
+
+    Raises
+    ------
+    FileNotFoundError, JSONDecodeError, ValueError
+        If the graph file itself is invalid (see node_index).
+    """
+    nodes = node_index(path)
+    errors = []
+    for i, (v_a, v_b) in enumerate(pairs):
+        message = _vertices_error(nodes, v_a, v_b)
+        if message is not None:
+            errors.append((i, message))
+    return errors
 
 def has_negative_weight(graph) -> bool:
     """
@@ -174,10 +394,52 @@ def has_negative_weight(graph) -> bool:
     return False
 
 
+def is_validated(graph) -> bool:
+    """
+    Check whether the graph passed the whole-graph checks (not empty, no
+    negative weights) and has not been mutated since.
+
+    Only graphs with a ``version`` mutation counter (TrackedDiGraph, and the
+    immutable CSRGraph) can keep this state; other graphs are never validated.
+
+    Parameters
+    ----------
+    graph : networkx.Graph | CSRGraph
+        Graph to be checked.
+
+    Returns
+    -------
+    bool
+        True if the graph is known to be valid at its current version.
+    """
+    version = getattr(graph, 'version', None)
+    return version is not None and getattr(graph, 'validated_version', None) == version
+
+
+def mark_validated(graph):
+    """
+    Record that the graph is valid at its current version, so that
+    validate_objects skips the O(E) checks until the graph changes.
+    Graphs without a ``version`` counter are left untouched.
+
+    Parameters
+    ----------
+    graph : networkx.Graph | CSRGraph
+        Graph known to be non-empty and without negative weights.
+    """
+    version = getattr(graph, 'version', None)
+    if version is not None:
+        graph.validated_version = version
+
+
 def validate_objects(graph, start: str, end: str):
     """
     Validate graph object and nodes used for pathfinding.
 
+    The whole-graph checks (empty graph, negative weights) run once per
+    graph version: afterwards only the O(1) node-membership tests remain.
+    See is_validated.
+
     Parameters
     ----------
     graph : networkx.Graph
@@ -196,9 +458,12 @@ def validate_objects(graph, start: str, end: str):
     """
     if graph is None or start is None or end is None:
         raise AttributeError("Graph and nodes can't be None")
-    if graph.number_of_edges() == 0:
+    validated = is_validated(graph)
+    if not validated and graph.number_of_edges() == 0:
         raise ValueError("Graph can't be empty")
     if not graph.has_node(start) or not graph.has_node(end):
         raise ValueError("Graph must contain the specified nodes")
-    if has_negative_weight(graph):
-        raise ValueError("Graph can't contain edges with negative weight")
+    if not validated:
+        if has_negative_weight(graph):
+            raise ValueError("Graph can't contain edges with negative weight")
+        mark_validated(graph)